@@ -284,7 +284,7 @@ def hashCustomerLookup(hashTable, heap, graph):
                         break
                     # There is a sanity check here too to see if there is a valid destination. It does this by checking to see if the destination
                     # is an element by using the "getVertex" function in the graphs.py file, and it then confirms it is reachable from the starting node
-                    # by using dijkstra's shortest path algorithm nd checking if the time is not equal to infinity, which indicates no connection.
+                    # by checking that both are in the same connected component of the graph (graph.isConnected) before the shortest path tree from the start node is used (dijkstra's algorithm, cached by the graph).
                     # it also outputs the time taken to reach the destination which goes into the hashtable put function
                     # if the checks fail then it outputs an error via exception handling
                     targetVertex = graph.getVertex(address)
@@ -296,13 +296,15 @@ def hashCustomerLookup(hashTable, heap, graph):
                         print(f"Address cannot be start hub {startNode}. Please choose a destination")
                         continue
                     try:
-                        graph.dijkstra(startNode)
-                        time = targetVertex.distance
-
-                        if time == float('inf'):
+                        # the graph keeps track of its connected components, so an unreachable address is caught without running Dijkstra's algorithm
+                        if not graph.isConnected(startNode, address):
                             print(f"Address: {address} is unreachable from {startNode}. Please choose a reachable destintion.")
                             continue
+                        # the shortest path tree from the start hub is cached by the graph so routing more parcels from the same hub does not search again
+                        route = graph.shortestPaths(startNode)
+                        time = route.getDistance(address)
                         print(f"Calculated Time: {time} minutes.")
+                        print(f"Path: {','.join(str(label) for label in route.getPath(address))}")
                     except Exception as e:
                         print(f"Error during route calculation: {e}")
                         continue
@@ -450,13 +452,15 @@ def heapParcelScheduling(heap, hashTable, graph):
                         print(f"Address cannot be start hub {startNode}. Please choose a destination")
                         continue
                     try:
-                        graph.dijkstra(startNode)
-                        time = targetVertex.distance
-
-                        if time == float('inf'):
+                        # the graph keeps track of its connected components, so an unreachable address is caught without running Dijkstra's algorithm
+                        if not graph.isConnected(startNode, address):
                             print(f"Address: {address} is unreachable from {startNode}. Please choose a reachable destintion.")
                             continue
+                        # the shortest path tree from the start hub is cached by the graph so routing more parcels from the same hub does not search again
+                        route = graph.shortestPaths(startNode)
+                        time = route.getDistance(address)
                         print(f"Calculated Time: {time} minutes.")
+                        print(f"Path: {','.join(str(label) for label in route.getPath(address))}")
                     except Exception as e:
                         print(f"Error during route calculation: {e}")
                         continue
@@ -0,0 +1,1095 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import heapq
+import math
+import random
+import tempfile
+import time as tme
+import tracemalloc
+import numpy as np
+from graphs import DSAGraph, DSAGraphEdge, DSAGraphSnapshot, euclideanHeuristic, sortAdjacentList
+from contraction import DSAContractionHierarchy
+from heaps import DijkstraHeap, DSAIndexedMinHeap
+from tours import DSATourPlanner
+from dispatch import DSADispatchPlanner
+from heaps import DSAHeap
+
+'''
+    This is the benchmarks.py module.
+    It contains timing runs for the graph used by the Graph Based Route Planning module on networks that are much larger
+    than the 8 vertex test graph in DSAAssignment.py.
+
+    Each benchmark prints a table of results so that the scaling of an operation can be checked by eye.
+
+    The functions in this file include:
+    - randomEdgeList: Generates a random list of unique undirected edges between integer labelled vertices
+    - gridGraph: Builds a city grid DSAGraph where each intersection stores its (x, y) position as its value
+    - randomGridQueries: Picks random (source, target) label pairs on a city grid
+    - gridNetwork/randomGeometricNetwork/scaleFreeNetwork: Generate the vertices and edges of synthetic city networks of a given size
+      (a street grid, intersections joined to every other intersection within a radius, and hub and spoke networks grown by preferential attachment)
+    - benchmarkBulkLoad: Times loading vertices and edges into a DSAGraph one addVertex/addEdge call at a time
+    - benchmarkEdgeListLoad: Times building a DSAGraph with fromEdgeList from an edge list CSV and from arrays, and writing it back with exportEdgeList
+    - benchmarkBinaryLoad: Times saving city grids to the binary graph format and loading them back as a memory mapped snapshot and as a DSAGraph
+    - benchmarkHubVertices: Times sorting the edges of a high degree hub vertex, freezing the graph and traversing it from the hub
+    - benchmarkCycleAnalysis: Times hasCycle and cycleBasis on city grids and a cycle free spanning tree of each grid
+    - benchmarkDeliveryZones: Compares assigning every intersection to its nearest hub with one multi-source search against one search per hub
+    - benchmarkBatchRouting: Times routeBatch on a city grid with different numbers of worker processes
+    - benchmarkDijkstraHeaps: Compares the peak heap size and run time of Dijkstra's algorithm with the indexed decrease-key heap against a lazy deletion heapq
+    - benchmarkDijkstraHeapOperations: Counts the heap operations per query of Dijkstra's algorithm with DijkstraHeap in min heap order against the old max heap order
+    - benchmarkPointToPoint: Compares a full single source Dijkstra against the early exit and bidirectional point to point queries
+    - benchmarkAStar: Compares the settled vertices and time of A* with the euclidean heuristic against Dijkstra's algorithm
+    - benchmarkContractionHierarchy: Reports the preprocessing time, index size and query speed up of a DSAContractionHierarchy
+    - benchmarkEdgeUpdates: Compares repairing retained shortest path trees after random edge weight changes against recomputing them
+    - benchmarkAdjacencyMatrix: Times building the sparse and dense adjacency matrix of city grids up to 50k intersections and printing a small one in pages
+    - benchmarkResilience: Times component lookups against a search to an unreachable vertex and finds the articulation points and bridges of city grids with cul-de-sacs
+    - directedGridGraph: Builds a directed city grid where a share of the streets are one way
+    - benchmarkDirectedRouting: Compares point to point queries on directed city grids and reports the size of the reverse CSR arrays backward searches use
+    - rushHourProfiles: Gives a share of the roads of a graph a travel time profile with morning and evening peaks
+    - benchmarkTourPlanning: Reports the tour travel time against the planning time budget of DSATourPlanner for 50 to 500 stops on a city grid
+    - benchmarkDispatch: Times planning the routes of a fleet of vans for up to 10k parcels from a DSAHeap with DSADispatchPlanner
+    - benchmarkTimeDependentRouting: Compares time dependent Dijkstra's algorithm at different departure times against static Dijkstra and evaluating each profile as it is reached
+
+    - benchmarkSuite: Times the addVertex/addEdge bulk load, freeze, BFS, DFS and Dijkstra's algorithm and measures the memory of each generated network,
+      and writes the results to JSON and/or CSV files so runs on different versions of the code can be compared
+
+    Run this file directly to run every benchmark with its default sizes, or with --suite to run only benchmarkSuite
+    (see python benchmarks.py --help for the sizes, generators and output files).
+'''
+
+
+# this function generates a random list of unique undirected edges for a graph with vertexCount vertices
+# self loops and duplicate edges (in either direction) are skipped so every edge can be passed to addEdge
+# it returns a list of (fromLabel, toLabel, weight) tuples where the labels are strings
+def randomEdgeList(vertexCount, edgeCount, seed=1002, maxWeight=20):
+    rng = random.Random(seed)
+    seen = set()
+    edges = []
+    while len(edges) < edgeCount:
+        u = rng.randrange(vertexCount)
+        v = rng.randrange(vertexCount)
+        if u == v:
+            continue
+        pair = (u, v) if u < v else (v, u)
+        if pair in seen:
+            continue
+        seen.add(pair)
+        edges.append((str(u), str(v), rng.randint(1, maxWeight)))
+    return edges
+
+
+# this function builds a rows x cols city grid where each intersection is joined to the intersections next to it
+# the intersection in row r and column c is labelled "r_c" and its value is its (x, y) = (c, r) position on the grid
+# each road is given a random travel time from 1 to maxWeight, so travel times are never shorter than the straight line distance
+def gridGraph(rows, cols, seed=1002, maxWeight=5):
+    rng = random.Random(seed)
+    graph = DSAGraph()
+    for r in range(rows):
+        for c in range(cols):
+            graph.addVertex(f"{r}_{c}", (c, r))
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                graph.addEdge(f"{r}_{c}", f"{r}_{c + 1}", rng.randint(1, maxWeight))
+            if r + 1 < rows:
+                graph.addEdge(f"{r}_{c}", f"{r + 1}_{c}", rng.randint(1, maxWeight))
+    return graph
+
+
+# this function picks queryCount random (source, target) pairs of vertex labels from a rows x cols grid
+def randomGridQueries(rows, cols, queryCount, seed=1002):
+    rng = random.Random(seed)
+    return [(f"{rng.randrange(rows)}_{rng.randrange(cols)}", f"{rng.randrange(rows)}_{rng.randrange(cols)}") for _ in range(queryCount)]
+
+
+# the network generators below each return a list of (label, value) vertices and a list of (fromLabel, toLabel, weight) edges
+# so the graph can be built with addVertex/addEdge (or fromEdgeList) by the caller, labels are strings and the value is the (x, y) position
+# of the vertex where it has one, the same seed always gives the same network
+
+# this function generates a street grid with about vertexCount intersections (the closest square), see gridGraph
+def gridNetwork(vertexCount, seed=1002, maxWeight=5):
+    rng = random.Random(seed)
+    side = max(1, round(math.sqrt(vertexCount)))
+    vertices = [(f"{r}_{c}", (c, r)) for r in range(side) for c in range(side)]
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                edges.append((f"{r}_{c}", f"{r}_{c + 1}", rng.randint(1, maxWeight)))
+            if r + 1 < side:
+                edges.append((f"{r}_{c}", f"{r + 1}_{c}", rng.randint(1, maxWeight)))
+    return vertices, edges
+
+
+# this function generates a random geometric network, vertexCount intersections scattered over a square with each one joined to
+# every intersection within radius of it, the travel time of a road is its length rounded up (at least 1)
+# the square is sized so that each intersection has about averageDegree roads whatever the size (less near the edges of the square)
+# the points are put into radius sized cells with numpy so only pairs in neighbouring cells are compared
+def randomGeometricNetwork(vertexCount, radius=2.0, averageDegree=6, seed=1002):
+    rng = np.random.default_rng(seed)
+    width = math.sqrt(vertexCount * math.pi * radius ** 2 / averageDegree)
+    points = rng.random((vertexCount, 2)) * width
+    cells = np.floor(points / radius).astype(np.int64)
+    cellCount = int(cells.max()) + 2
+    cellKeys = cells[:, 0] * cellCount + cells[:, 1]
+    order = np.argsort(cellKeys, kind='stable')
+    sortedKeys = cellKeys[order]
+
+    fromIds = []
+    toIds = []
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        # each pair of neighbouring cells is only looked at once, (0, 0) pairs the points of a cell with each other
+        neighbourKeys = (cells[:, 0] + dx) * cellCount + (cells[:, 1] + dy)
+        starts = np.searchsorted(sortedKeys, neighbourKeys, side='left')
+        ends = np.searchsorted(sortedKeys, neighbourKeys, side='right')
+        counts = ends - starts
+        sources = np.repeat(np.arange(vertexCount), counts)
+        targets = order[np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))]
+        keep = sources < targets if (dx, dy) == (0, 0) else np.ones(len(sources), dtype=bool)
+        fromIds.append(sources[keep])
+        toIds.append(targets[keep])
+    fromIds = np.concatenate(fromIds)
+    toIds = np.concatenate(toIds)
+    lengths = np.hypot(*(points[fromIds] - points[toIds]).T)
+    close = lengths <= radius
+
+    vertices = [(str(i), (x, y)) for i, (x, y) in enumerate(points.tolist())]
+    edges = [(str(u), str(v), max(1, math.ceil(length))) for u, v, length in zip(fromIds[close].tolist(), toIds[close].tolist(), lengths[close].tolist())]
+    return vertices, edges
+
+
+# this function generates a scale free hub and spoke network with the Barabasi-Albert model
+# every new vertex is joined to edgesPerVertex different existing vertices picked in proportion to their degree,
+# so a few hubs end up with a very high degree while most vertices only have edgesPerVertex roads
+# the vertices have no position (value None) and each road gets a random travel time from 1 to maxWeight
+def scaleFreeNetwork(vertexCount, edgesPerVertex=2, seed=1002, maxWeight=20):
+    rng = random.Random(seed)
+    vertices = [(str(i), None) for i in range(vertexCount)]
+    edges = []
+    # ends holds each vertex once for every road it has, so a uniform pick from it is a pick in proportion to degree
+    ends = list(range(min(edgesPerVertex, vertexCount)))
+    for v in range(len(ends), vertexCount):
+        chosen = set()
+        while len(chosen) < min(edgesPerVertex, v):
+            chosen.add(ends[rng.randrange(len(ends))])
+        for u in chosen:
+            edges.append((str(u), str(v), rng.randint(1, maxWeight)))
+            ends.append(u)
+            ends.append(v)
+    return vertices, edges
+
+
+# the generators benchmarkSuite can run, by name
+NETWORK_GENERATORS = {"grid": gridNetwork, "geometric": randomGeometricNetwork, "scaleFree": scaleFreeNetwork}
+
+
+# this function times loading a graph through addVertex and addEdge for each of the given sizes
+# each size is a (vertexCount, edgeCount) tuple and the default goes up to 100k vertices and 300k edges
+# the time per vertex and per edge should stay roughly constant as the graph grows if loading is linear
+def benchmarkBulkLoad(sizes=((12500, 37500), (25000, 75000), (50000, 150000), (100000, 300000))):
+    print("\n=======================================\nBulk Load Benchmark (addVertex/addEdge):\n=======================================")
+    print(f"{'Vertices':>10} {'Edges':>10} {'Vertex Time (s)':>16} {'Edge Time (s)':>14} {'us/Vertex':>10} {'us/Edge':>10}")
+    for vertexCount, edgeCount in sizes:
+        edges = randomEdgeList(vertexCount, edgeCount)
+        graph = DSAGraph()
+
+        startTime = tme.perf_counter()
+        for i in range(vertexCount):
+            graph.addVertex(str(i))
+        vertexTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        for fromLabel, toLabel, weight in edges:
+            graph.addEdge(fromLabel, toLabel, weight)
+        edgeTime = tme.perf_counter() - startTime
+
+        print(f"{vertexCount:>10} {edgeCount:>10} {vertexTime:>16.3f} {edgeTime:>14.3f} {vertexTime / vertexCount * 1e6:>10.2f} {edgeTime / edgeCount * 1e6:>10.2f}")
+    print("=======================================")
+
+
+# this function times DSAGraph.fromEdgeList on random edge lists written to a temporary CSV file and passed in as arrays
+# the time to write the graph back out with exportEdgeList is also shown
+def benchmarkEdgeListLoad(sizes=((50000, 150000), (100000, 300000), (200000, 1000000))):
+    print("\n=======================================\nEdge List Load Benchmark (fromEdgeList/exportEdgeList):\n=======================================")
+    print(f"{'Vertices':>10} {'Edges':>10} {'CSV Load (s)':>13} {'Array Load (s)':>15} {'Export (s)':>11} {'us/Edge (CSV)':>14}")
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, "edges.csv")
+    try:
+        for vertexCount, edgeCount in sizes:
+            edges = randomEdgeList(vertexCount, edgeCount)
+            with open(filename, 'w') as file:
+                for fromLabel, toLabel, weight in edges:
+                    file.write(f"{fromLabel},{toLabel},{weight}\n")
+            arrays = tuple(zip(*edges))
+            del edges
+
+            startTime = tme.perf_counter()
+            graph = DSAGraph.fromEdgeList(filename)
+            csvTime = tme.perf_counter() - startTime
+
+            startTime = tme.perf_counter()
+            graph.exportEdgeList(filename)
+            exportTime = tme.perf_counter() - startTime
+            del graph
+
+            startTime = tme.perf_counter()
+            DSAGraph.fromEdgeList(arrays)
+            arrayTime = tme.perf_counter() - startTime
+
+            print(f"{vertexCount:>10} {edgeCount:>10} {csvTime:>13.3f} {arrayTime:>15.3f} {exportTime:>11.3f} {csvTime / edgeCount * 1e6:>14.2f}")
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rmdir(directory)
+    print("=======================================")
+
+
+# this function times DSAGraph.save on city grids and loading the file back both as a memory mapped DSAGraphSnapshot
+# (what a routing worker process would do) and as a full DSAGraph, along with the size of the file
+def benchmarkBinaryLoad(sizes=((100, 100), (300, 300), (500, 500))):
+    print("\n=======================================\nBinary Graph Load Benchmark (save/load):\n=======================================")
+    print(f"{'Grid':>10} {'File (MB)':>10} {'Save (s)':>9} {'Snapshot Load (ms)':>19} {'Graph Load (s)':>15}")
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, "graph.bin")
+    try:
+        for rows, cols in sizes:
+            graph = gridGraph(rows, cols)
+            graph.freeze()
+            startTime = tme.perf_counter()
+            graph.save(filename)
+            saveTime = tme.perf_counter() - startTime
+            del graph
+
+            startTime = tme.perf_counter()
+            snapshot = DSAGraphSnapshot.load(filename)
+            snapshotTime = tme.perf_counter() - startTime
+            del snapshot
+
+            startTime = tme.perf_counter()
+            DSAGraph().load(filename)
+            graphTime = tme.perf_counter() - startTime
+
+            print(f"{f'{rows}x{cols}':>10} {os.path.getsize(filename) / 1e6:>10.2f} {saveTime:>9.3f} {snapshotTime * 1e3:>19.2f} {graphTime:>15.3f}")
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rmdir(directory)
+    print("=======================================")
+
+
+# this function builds star shaped networks where one hub vertex has degree edges to delivery points added in random label order
+# and times sortAdjacentList on the hub's edges, the first freeze (which sorts the hub's cached edge view),
+# a freeze after an edge between two delivery points is added (the hub's sorted edges are reused) and BFS/DFS from the hub on the snapshot
+def benchmarkHubVertices(degrees=(1000, 5000, 20000, 100000)):
+    print("\n=======================================\nHub Vertex Benchmark (high degree sorting and traversal):\n=======================================")
+    print(f"{'Degree':>8} {'sortAdjacentList (ms)':>22} {'First Freeze (ms)':>18} {'Refreeze (ms)':>14} {'BFS (ms)':>9} {'DFS (ms)':>9}")
+    for degree in degrees:
+        labels = [f"D{i}" for i in range(degree)]
+        random.Random(degree).shuffle(labels)
+        graph = DSAGraph()
+        graph.addVertex("HUB")
+        for label in labels:
+            graph.addVertex(label)
+        # the hub's edges are added on the vertices directly as addEdge checks the hub's whole edge list for a duplicate each time
+        hub = graph.getVertex("HUB")
+        for label in labels:
+            hub.addEdge(DSAGraphEdge(hub, graph.getVertex(label), 1))
+            graph.getVertex(label).addEdge(DSAGraphEdge(graph.getVertex(label), hub, 1))
+
+        startTime = tme.perf_counter()
+        sortAdjacentList(hub.getEdges())
+        sortTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        snapshot = graph.freeze()
+        freezeTime = tme.perf_counter() - startTime
+
+        graph.addEdge(labels[0], labels[1], 1)
+        startTime = tme.perf_counter()
+        snapshot = graph.freeze()
+        refreezeTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        snapshot.bfs(hub.vertexId)
+        bfsTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        snapshot.dfs(hub.vertexId)
+        dfsTime = tme.perf_counter() - startTime
+
+        print(f"{degree:>8} {sortTime * 1e3:>22.2f} {freezeTime * 1e3:>18.2f} {refreezeTime * 1e3:>14.2f} {bfsTime * 1e3:>9.2f} {dfsTime * 1e3:>9.2f}")
+    print("=======================================")
+
+
+# this function times hasCycle and cycleBasis on city grids, along with the number and average length of the basis cycles
+# hasCycle is also timed on a spanning tree of each grid (a grid with every cycle broken) where it has to search the whole graph
+def benchmarkCycleAnalysis(sizes=((100, 100), (200, 200), (300, 300))):
+    print("\n=======================================\nCycle Analysis Benchmark (city grids):\n=======================================")
+    print(f"{'Grid':>10} {'hasCycle (ms)':>14} {'Tree hasCycle (ms)':>19} {'cycleBasis (s)':>15} {'Cycles':>8} {'Avg Length':>11}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        snapshot = graph.freeze()
+
+        startTime = tme.perf_counter()
+        graph.hasCycle()
+        cycleTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        cycles = graph.cycleBasis()
+        basisTime = tme.perf_counter() - startTime
+        averageLength = sum(len(cycle) for cycle in cycles) / max(1, len(cycles))
+
+        # keeps only the edges of the breadth-first spanning tree of the grid
+        parent, _, _ = snapshot.spanningForest()
+        tree = DSAGraph()
+        for vertexId in range(snapshot.vertexCount):
+            tree.addVertex(snapshot.getLabel(vertexId))
+        for vertexId in range(snapshot.vertexCount):
+            if parent[vertexId] != -1:
+                tree.addEdge(snapshot.getLabel(parent[vertexId]), snapshot.getLabel(vertexId))
+        tree.freeze()
+        startTime = tme.perf_counter()
+        tree.hasCycle()
+        treeTime = tme.perf_counter() - startTime
+
+        print(f"{f'{rows}x{cols}':>10} {cycleTime * 1e3:>14.2f} {treeTime * 1e3:>19.2f} {basisTime:>15.3f} {len(cycles):>8} {averageLength:>11.1f}")
+    print("=======================================")
+
+
+# this function times making delivery zones on city grids with hubCount hubs spread evenly over the grid
+# the multi-source BFS and multi-source Dijkstra are compared against running a single source Dijkstra from every hub
+def benchmarkDeliveryZones(sizes=((100, 100), (200, 200), (300, 300)), hubCount=25):
+    print("\n=======================================\nDelivery Zone Benchmark (nearest hub for every intersection):\n=======================================")
+    print(f"{'Grid':>10} {'Hubs':>6} {'Multi BFS (ms)':>15} {'Multi Dijkstra (ms)':>20} {'Per Hub Dijkstra (ms)':>22} {'Speed Up':>9}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        snapshot = graph.freeze()
+        side = int(hubCount ** 0.5)
+        hubs = [f"{r * rows // side}_{c * cols // side}" for r in range(side) for c in range(side)]
+
+        startTime = tme.perf_counter()
+        graph.multiSourceBFS(hubs)
+        bfsTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        graph.multiSourceDijkstra(hubs)
+        multiTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        for hub in hubs:
+            snapshot.dijkstra(snapshot.getId(hub))
+        perHubTime = tme.perf_counter() - startTime
+
+        print(f"{f'{rows}x{cols}':>10} {len(hubs):>6} {bfsTime * 1e3:>15.2f} {multiTime * 1e3:>20.2f} {perHubTime * 1e3:>22.2f} {perHubTime / multiTime:>8.1f}x")
+    print("=======================================")
+
+
+# this function times routing a batch of parcels from a few hubs with DSAGraph.routeBatch using different numbers of worker processes
+# the speed up is against routing the batch in this process (1 worker), it can be no more than the number of CPUs
+def benchmarkBatchRouting(rows=200, cols=200, hubCount=64, queryCount=2000, workerCounts=(1, 2, 4, 8)):
+    print("\n=======================================\nBatch Routing Benchmark (routeBatch):\n=======================================")
+    print(f"CPUs: {os.cpu_count()}, Grid: {rows}x{cols}, Hubs: {hubCount}, Queries: {queryCount}")
+    print(f"{'Workers':>8} {'Time (s)':>9} {'Queries/s':>10} {'Speed Up':>9}")
+    graph = gridGraph(rows, cols)
+    rng = random.Random(1002)
+    hubs = [f"{rng.randrange(rows)}_{rng.randrange(cols)}" for _ in range(hubCount)]
+    queries = [(rng.choice(hubs), f"{rng.randrange(rows)}_{rng.randrange(cols)}") for _ in range(queryCount)]
+    graph.freeze()
+    serialTime = None
+    for workers in workerCounts:
+        startTime = tme.perf_counter()
+        graph.routeBatch(queries, workers=workers)
+        batchTime = tme.perf_counter() - startTime
+        if serialTime is None:
+            serialTime = batchTime
+        print(f"{workers:>8} {batchTime:>9.3f} {queryCount / batchTime:>10.1f} {serialTime / batchTime:>8.2f}x")
+    print("=======================================")
+
+
+# this function is Dijkstra's algorithm with a heapq of (distance, vertex id) tuples where a shorter distance adds a duplicate entry
+# and entries of settled vertices are skipped when they are removed (lazy deletion), it is what DSAGraphSnapshot.dijkstra used before the indexed heap
+# it returns the distances and the largest number of entries the heap held
+def lazyHeapDijkstra(snapshot, sourceId):
+    indptr, indices, weights = snapshot.adjacencyLists()
+    distance = [float('inf')] * snapshot.vertexCount
+    settled = bytearray(snapshot.vertexCount)
+    distance[sourceId] = 0.0
+    heap = [(0.0, sourceId)]
+    peak = 1
+    while heap:
+        d, u = heapq.heappop(heap)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if settled[v]:
+                continue
+            newDistance = d + weights[k]
+            if newDistance < distance[v]:
+                distance[v] = newDistance
+                heapq.heappush(heap, (newDistance, v))
+                if len(heap) > peak:
+                    peak = len(heap)
+    return distance, peak
+
+
+# this function compares DSAGraphSnapshot.dijkstra (indexed heap with decrease-key) against lazyHeapDijkstra on city grids and denser random graphs
+# the peak heap size of the indexed heap can never be more than the number of vertices, the lazy heap can hold one entry per edge relaxation
+def benchmarkDijkstraHeaps(grids=((100, 100), (300, 300)), randomGraphs=((20000, 100000), (20000, 400000)), runs=3):
+    print("\n=======================================\nDijkstra Heap Benchmark (indexed decrease-key vs lazy deletion):\n=======================================")
+    print(f"{'Graph':>16} {'Vertices':>9} {'Lazy Peak':>10} {'Indexed Peak':>13} {'Lazy (ms)':>10} {'Indexed (ms)':>13}")
+    graphs = [(f"grid {rows}x{cols}", gridGraph(rows, cols)) for rows, cols in grids]
+    for vertexCount, edgeCount in randomGraphs:
+        edges = randomEdgeList(vertexCount, edgeCount)
+        graphs.append((f"random E={edgeCount}", DSAGraph.fromEdgeList(tuple(zip(*edges)))))
+    for name, graph in graphs:
+        snapshot = graph.freeze()
+        snapshot.adjacencyLists()
+        rng = random.Random(1002)
+        lazyPeak = 0
+        indexedPeak = 0
+        lazyTime = 0.0
+        indexedTime = 0.0
+        for _ in range(runs):
+            sourceId = rng.randrange(snapshot.vertexCount)
+            startTime = tme.perf_counter()
+            _, peak = lazyHeapDijkstra(snapshot, sourceId)
+            lazyTime += tme.perf_counter() - startTime
+            lazyPeak = max(lazyPeak, peak)
+
+            # the same search as DSAGraphSnapshot.dijkstra, run here to read the peak size of its heap
+            startTime = tme.perf_counter()
+            snapshot.dijkstra(sourceId)
+            indexedTime += tme.perf_counter() - startTime
+            indexedPeak = max(indexedPeak, _indexedPeak(snapshot, sourceId))
+        print(f"{name:>16} {snapshot.vertexCount:>9} {lazyPeak:>10} {indexedPeak:>13} {lazyTime / runs * 1e3:>10.1f} {indexedTime / runs * 1e3:>13.1f}")
+    print("=======================================")
+
+# helper function that repeats the search of DSAGraphSnapshot.dijkstra with its own DSAIndexedMinHeap and returns the heap's peakCount
+def _indexedPeak(snapshot, sourceId):
+    indptr, indices, weights = snapshot.adjacencyLists()
+    distance = [float('inf')] * snapshot.vertexCount
+    heap = DSAIndexedMinHeap(snapshot.vertexCount)
+    distance[sourceId] = 0.0
+    heap.add(sourceId, 0.0)
+    while not heap.isEmpty():
+        u, d = heap.remove()
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if heap.wasRemoved(v):
+                continue
+            newDistance = d + weights[k]
+            if newDistance < distance[v]:
+                distance[v] = newDistance
+                if heap.contains(v):
+                    heap.decreaseKey(v, newDistance)
+                else:
+                    heap.add(v, newDistance)
+    return heap.peakCount
+
+
+# this function is the original DSAGraph.dijkstra loop (settle a vertex the first time it is removed, skip it after that) on a snapshot using DijkstraHeap
+# with maxOrder the keys are stored as -int(distance) which removes the largest truncated distance first, the way DijkstraHeap behaved when it used
+# the max heap trickleUp/trickleDown of DSAHeap and truncated its priorities to ints
+# it returns the distances and the heap so its operation counters can be read
+def heapDijkstra(snapshot, sourceId, maxOrder=False):
+    indptr, indices, weights = snapshot.adjacencyLists()
+    distance = [float('inf')] * snapshot.vertexCount
+    settled = bytearray(snapshot.vertexCount)
+    heap = DijkstraHeap()
+    distance[sourceId] = 0.0
+    heap.add(0.0, sourceId)
+    while not heap.isEmpty():
+        _, u = heap.remove()
+        u = int(u)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if settled[v]:
+                continue
+            newDistance = distance[u] + weights[k]
+            if newDistance < distance[v]:
+                distance[v] = newDistance
+                heap.add(-int(newDistance) if maxOrder else newDistance, v)
+    return distance, heap
+
+
+# this function counts the heap adds, removes and sift steps per query of heapDijkstra with the min heap order and the old max heap order
+# the min heap total is compared with E log2 V, and the number of vertices given the wrong distance by the old order is shown against DSAGraphSnapshot.dijkstra
+def benchmarkDijkstraHeapOperations(sizes=((50, 50), (100, 100), (200, 200)), queryCount=5):
+    print("\n=======================================\nDijkstra Heap Operations Benchmark (DijkstraHeap per query):\n=======================================")
+    print(f"{'Grid':>10} {'Order':>6} {'Adds':>9} {'Removes':>9} {'Sift Steps':>11} {'Total Ops':>10} {'E log2 V':>10} {'Wrong Distances':>16}")
+    for rows, cols in sizes:
+        snapshot = gridGraph(rows, cols).freeze()
+        edgeLogV = snapshot.edgeCount * math.log2(snapshot.vertexCount)
+        rng = random.Random(1002)
+        sourceIds = [rng.randrange(snapshot.vertexCount) for _ in range(queryCount)]
+        for order, maxOrder in (("min", False), ("max", True)):
+            adds = 0
+            removes = 0
+            siftSteps = 0
+            wrong = 0
+            for sourceId in sourceIds:
+                distance, heap = heapDijkstra(snapshot, sourceId, maxOrder)
+                adds += heap.addCount
+                removes += heap.removeCount
+                siftSteps += heap.siftSteps
+                expected = snapshot.dijkstra(sourceId)[0].tolist()
+                wrong += sum(1 for found, correct in zip(distance, expected) if found != correct)
+            total = (adds + removes + siftSteps) // queryCount
+            print(f"{f'{rows}x{cols}':>10} {order:>6} {adds // queryCount:>9} {removes // queryCount:>9} {siftSteps // queryCount:>11} {total:>10} {int(edgeLogV):>10} {wrong // queryCount:>16}")
+    print("=======================================")
+
+
+# this function compares the time per query of answering random point to point queries on city grids with
+# a full single source shortestPaths, the early exit shortestPath and the bidirectional shortestPath
+# the average number of settled vertices is also shown for the two point to point queries
+def benchmarkPointToPoint(sizes=((100, 100), (200, 200), (300, 300)), queryCount=50):
+    print("\n=======================================\nPoint to Point Query Benchmark (city grids):\n=======================================")
+    print(f"{'Grid':>10} {'Full (ms)':>10} {'Early Exit (ms)':>16} {'Settled':>9} {'Bidirectional (ms)':>19} {'Settled':>9}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        queries = randomGridQueries(rows, cols, queryCount)
+        graph.freeze()
+
+        startTime = tme.perf_counter()
+        for source, target in queries:
+            graph.shortestPaths(source).getDistance(target)
+        fullTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        earlySettled = 0
+        for source, target in queries:
+            earlySettled += graph.shortestPath(source, target).getSettled()
+        earlyTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        bidirectionalSettled = 0
+        for source, target in queries:
+            bidirectionalSettled += graph.shortestPath(source, target, bidirectional=True).getSettled()
+        bidirectionalTime = tme.perf_counter() - startTime
+
+        print(f"{f'{rows}x{cols}':>10} {fullTime / queryCount * 1e3:>10.2f} {earlyTime / queryCount * 1e3:>16.2f} {earlySettled // queryCount:>9} {bidirectionalTime / queryCount * 1e3:>19.2f} {bidirectionalSettled // queryCount:>9}")
+    print("=======================================")
+
+
+# this function compares A* with the euclidean heuristic against Dijkstra's algorithm on city grids
+# both the full single source dijkstra and the early exit shortestPath (plain dijkstra stopped at the target) are timed
+# the settled columns are the average number of vertices each search settled per query
+def benchmarkAStar(sizes=((100, 100), (200, 200), (300, 300)), queryCount=50):
+    print("\n=======================================\nA* Benchmark (city grids, euclidean heuristic):\n=======================================")
+    print(f"{'Grid':>10} {'Full Dijkstra (ms)':>19} {'Settled':>9} {'Dijkstra (ms)':>14} {'Settled':>9} {'A* (ms)':>9} {'Settled':>9}")
+    heuristic = euclideanHeuristic(speed=1.0)
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        queries = randomGridQueries(rows, cols, queryCount)
+        graph.freeze()
+
+        startTime = tme.perf_counter()
+        for source, target in queries:
+            graph.shortestPaths(source)
+        fullTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        dijkstraSettled = 0
+        for source, target in queries:
+            dijkstraSettled += graph.shortestPath(source, target).getSettled()
+        dijkstraTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        aStarSettled = 0
+        for source, target in queries:
+            aStarSettled += graph.aStar(source, target, heuristic).getSettled()
+        aStarTime = tme.perf_counter() - startTime
+
+        print(f"{f'{rows}x{cols}':>10} {fullTime / queryCount * 1e3:>19.2f} {rows * cols:>9} {dijkstraTime / queryCount * 1e3:>14.2f} {dijkstraSettled // queryCount:>9} {aStarTime / queryCount * 1e3:>9.2f} {aStarSettled // queryCount:>9}")
+    print("=======================================")
+
+
+# this function builds a DSAContractionHierarchy for city grids and reports the preprocessing time, the number of shortcuts and the index size
+# the query time is compared against the early exit shortestPath (Dijkstra's algorithm stopped at the target) on the same queries
+# every query is also checked to give the same travel time as Dijkstra's algorithm
+# the defaults are 10k and 40k intersections, larger grids (up to 1000x1000 = 1M) can be passed in but take a long time to preprocess in pure python
+def benchmarkContractionHierarchy(sizes=((100, 100), (200, 200)), queryCount=100):
+    print("\n=======================================\nContraction Hierarchy Benchmark (city grids):\n=======================================")
+    print(f"{'Grid':>10} {'Build (s)':>10} {'Shortcuts':>10} {'Index (MB)':>11} {'Dijkstra (ms)':>14} {'CH (ms)':>9} {'Settled':>8} {'Speed Up':>9}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        queries = randomGridQueries(rows, cols, queryCount)
+        graph.freeze()
+
+        startTime = tme.perf_counter()
+        hierarchy = DSAContractionHierarchy(graph)
+        buildTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        expected = [graph.shortestPath(source, target).getDistance() for source, target in queries]
+        dijkstraTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        routes = [hierarchy.shortestPath(source, target) for source, target in queries]
+        hierarchyTime = tme.perf_counter() - startTime
+
+        if [route.getDistance() for route in routes] != expected:
+            raise Exception("Contraction hierarchy travel times do not match Dijkstra's algorithm")
+        settled = sum(route.getSettled() for route in routes) // queryCount
+        print(f"{f'{rows}x{cols}':>10} {buildTime:>10.2f} {hierarchy.shortcutCount:>10} {hierarchy.getIndexSize() / 1e6:>11.2f} {dijkstraTime / queryCount * 1e3:>14.2f} {hierarchyTime / queryCount * 1e3:>9.3f} {settled:>8} {dijkstraTime / hierarchyTime:>9.1f}")
+    print("=======================================")
+
+
+# this function retains the shortest path trees of hubCount random hubs on city grids and then applies updateCount random edge weight changes
+# each change scales the travel time of a random road by a random factor from 0.5 to 2 (and at least 1), like congestion updates
+# the time per update of repairing the retained trees is compared against recomputing every tree with shortestPaths
+# the repaired trees are checked against freshly computed ones at the end
+def benchmarkEdgeUpdates(sizes=((100, 100), (200, 200)), hubCount=5, updateCount=200, seed=1002):
+    print("\n=======================================\nEdge Weight Update Benchmark (city grids):\n=======================================")
+    print(f"{'Grid':>10} {'Hubs':>5} {'Repair (ms)':>12} {'Recompute (ms)':>15} {'Speed Up':>9}")
+    for rows, cols in sizes:
+        rng = random.Random(seed)
+        graph = gridGraph(rows, cols)
+        roads = []
+        for vertex in graph.vertex:
+            for edge in vertex.getEdges():
+                roads.append((vertex.getLabel(), edge.getToVertex().getLabel(), edge))
+        hubs = [f"{rng.randrange(rows)}_{rng.randrange(cols)}" for _ in range(hubCount)]
+        for hub in hubs:
+            graph.retainShortestPathTree(hub)
+        updates = []
+        for _ in range(updateCount):
+            fromLabel, toLabel, edge = rng.choice(roads)
+            updates.append((fromLabel, toLabel, max(1, round(edge.getWeight() * rng.uniform(0.5, 2.0)))))
+
+        startTime = tme.perf_counter()
+        for fromLabel, toLabel, weight in updates:
+            graph.updateEdgeWeight(fromLabel, toLabel, weight)
+        repairTime = tme.perf_counter() - startTime
+
+        # recomputing is timed on a sample of the updates as it is much slower
+        sample = updates[:max(1, updateCount // 10)]
+        startTime = tme.perf_counter()
+        for fromLabel, toLabel, weight in sample:
+            graph.updateEdgeWeight(fromLabel, toLabel, weight)
+            for hub in hubs:
+                graph.shortestPaths(hub)
+        recomputeTime = tme.perf_counter() - startTime
+
+        for hub in hubs:
+            if list(graph.getRetainedTree(hub).distance) != list(graph.shortestPaths(hub).distance):
+                raise Exception("Repaired shortest path tree does not match a recomputed one")
+        repairPerUpdate = repairTime / updateCount * 1e3
+        recomputePerUpdate = recomputeTime / len(sample) * 1e3
+        print(f"{f'{rows}x{cols}':>10} {hubCount:>5} {repairPerUpdate:>12.3f} {recomputePerUpdate:>15.2f} {recomputePerUpdate / repairPerUpdate:>9.1f}")
+    print("=======================================")
+
+
+# this function times toAdjacencyMatrix on city grids, as sparse CSR arrays and (for grids small enough to fit in memory) as a dense array
+# the size of each is shown, the dense matrix takes 8 V^2 bytes so it is skipped past denseLimit vertices
+# a matrix-vector product (the total travel time of the roads out of each intersection) is done on the CSR arrays with np.add.reduceat
+# then a small grid is printed with displayAsMatrix in pageSize x pageSize pages
+def benchmarkAdjacencyMatrix(sizes=((50, 50), (100, 100), (224, 224)), denseLimit=5000, pageSize=20, renderSide=20):
+    print("\n=======================================\nAdjacency Matrix Benchmark (city grids):\n=======================================")
+    print(f"{'Grid':>10} {'Vertices':>9} {'CSR (ms)':>9} {'CSR (KB)':>9} {'Dense (ms)':>11} {'Dense (MB)':>11} {'Mat-Vec (ms)':>13}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        vertexCount = rows * cols
+        graph.freeze()
+
+        startTime = tme.perf_counter()
+        indptr, indices, weights = graph.toAdjacencyMatrix()
+        csrTime = tme.perf_counter() - startTime
+        csrBytes = indptr.nbytes + indices.nbytes + weights.nbytes
+
+        denseTime = float('nan')
+        denseBytes = float('nan')
+        if vertexCount <= denseLimit:
+            startTime = tme.perf_counter()
+            dense = graph.toAdjacencyMatrix(sparse=False)
+            denseTime = tme.perf_counter() - startTime
+            denseBytes = dense.nbytes
+            del dense
+
+        startTime = tme.perf_counter()
+        np.add.reduceat(weights * np.ones(vertexCount)[indices], indptr[:-1])
+        matVecTime = tme.perf_counter() - startTime
+
+        print(f"{f'{rows}x{cols}':>10} {vertexCount:>9} {csrTime * 1e3:>9.1f} {csrBytes // 1024:>9} {denseTime * 1e3:>11.1f} {denseBytes / 2 ** 20:>11.1f} {matVecTime * 1e3:>13.2f}")
+
+    # displayAsMatrix prints every page so it is rendered to a string for a small grid only
+    graph = gridGraph(renderSide, renderSide)
+    output = io.StringIO()
+    startTime = tme.perf_counter()
+    with contextlib.redirect_stdout(output):
+        graph.displayAsMatrix(pageSize)
+    renderTime = tme.perf_counter() - startTime
+    pageCount = output.getvalue().count("Rows ")
+    print(f"displayAsMatrix of a {renderSide}x{renderSide} grid: {pageCount} pages of {pageSize}x{pageSize} in {renderTime * 1e3:.1f} ms")
+    print("=======================================")
+
+
+# this function adds spurCount cul-de-sacs (dead end chains of three intersections) to random intersections of a city grid and a separate island of islandSize intersections
+# every road of a cul-de-sac is a bridge and every intersection it hangs from is an articulation point, the island is its own component
+# benchmarkResilience times the component lookups against searching to the island and finds the articulation points and bridges
+# a component rebuild is also timed, it is only needed after a vertex or edge is deleted
+def benchmarkResilience(sizes=((100, 100), (200, 200), (300, 300)), spurCount=50, islandSize=5, queryCount=20):
+    print("\n=======================================\nNetwork Resilience Benchmark (city grids with cul-de-sacs and an island):\n=======================================")
+    print(f"{'Grid':>10} {'Components':>11} {'isConnected (us)':>17} {'Search (ms)':>12} {'Rebuild (ms)':>13} {'Cuts (ms)':>10} {'Articulation':>13} {'Bridges':>8}")
+    for rows, cols in sizes:
+        rng = random.Random(1002)
+        graph = gridGraph(rows, cols)
+        for spur in range(spurCount):
+            previous = f"{rng.randrange(rows)}_{rng.randrange(cols)}"
+            for step in range(3):
+                label = f"spur{spur}_{step}"
+                graph.addVertex(label)
+                graph.addEdge(previous, label, rng.randint(1, 5))
+                previous = label
+        for i in range(islandSize):
+            graph.addVertex(f"island{i}")
+            if i > 0:
+                graph.addEdge(f"island{i - 1}", f"island{i}", 1)
+        sources = [f"{rng.randrange(rows)}_{rng.randrange(cols)}" for _ in range(queryCount)]
+        graph.freeze()
+
+        startTime = tme.perf_counter()
+        for source in sources:
+            graph.isConnected(source, "island0")
+        connectedTime = tme.perf_counter() - startTime
+
+        # the search the component check saves, a Dijkstra's algorithm that has to settle the whole component of the source before it knows
+        snapshot = graph.freeze()
+        islandId = snapshot.getId("island0")
+        startTime = tme.perf_counter()
+        for source in sources[:5]:
+            snapshot.pointToPoint(snapshot.getId(source), islandId)
+        searchTime = tme.perf_counter() - startTime
+
+        graph.deleteEdge("spur0_1", "spur0_2")
+        startTime = tme.perf_counter()
+        components = graph.getComponentCount()
+        rebuildTime = tme.perf_counter() - startTime
+
+        snapshot = graph.freeze()
+        startTime = tme.perf_counter()
+        articulation = snapshot.articulationPoints()
+        bridges = snapshot.bridges()
+        cutTime = tme.perf_counter() - startTime
+        print(f"{f'{rows}x{cols}':>10} {components:>11} {connectedTime / queryCount * 1e6:>17.1f} {searchTime / 5 * 1e3:>12.1f} {rebuildTime * 1e3:>13.1f} {cutTime * 1e3:>10.1f} {len(articulation):>13} {len(bridges):>8}")
+    print("=======================================")
+
+
+# this function builds a directed rows x cols city grid the same way as gridGraph where oneWayShare of the streets are one way
+# each one way street runs in a random direction, every other street is a two way street
+def directedGridGraph(rows, cols, oneWayShare=0.3, seed=1002, maxWeight=5):
+    rng = random.Random(seed)
+    graph = DSAGraph(directed=True)
+    for r in range(rows):
+        for c in range(cols):
+            graph.addVertex(f"{r}_{c}", (c, r))
+    for r in range(rows):
+        for c in range(cols):
+            for neighbour in ((r, c + 1), (r + 1, c)):
+                if neighbour[0] >= rows or neighbour[1] >= cols:
+                    continue
+                ends = [f"{r}_{c}", f"{neighbour[0]}_{neighbour[1]}"]
+                oneWay = rng.random() < oneWayShare
+                if oneWay:
+                    rng.shuffle(ends)
+                graph.addEdge(ends[0], ends[1], rng.randint(1, maxWeight), oneWay=oneWay)
+    return graph
+
+
+# this function times random point to point queries on directed city grids (see directedGridGraph) with the early exit and bidirectional shortestPath
+# the backward search of the bidirectional query follows the reverse CSR arrays of the snapshot, their size is shown next to the forward CSR arrays
+# the reverse arrays are built the first time a backward search needs them, that time is shown on its own
+def benchmarkDirectedRouting(sizes=((100, 100), (200, 200), (300, 300)), queryCount=50):
+    print("\n=======================================\nDirected Routing Benchmark (city grids, 30% one way streets):\n=======================================")
+    print(f"{'Grid':>10} {'Arcs':>8} {'CSR (KB)':>9} {'Reverse (KB)':>13} {'Reverse Build (ms)':>19} {'Early Exit (ms)':>16} {'Bidirectional (ms)':>19} {'Unreachable':>12}")
+    for rows, cols in sizes:
+        graph = directedGridGraph(rows, cols)
+        queries = randomGridQueries(rows, cols, queryCount)
+        snapshot = graph.freeze()
+        snapshot.adjacencyLists()
+
+        startTime = tme.perf_counter()
+        snapshot.reverseAdjacencyLists()
+        reverseTime = tme.perf_counter() - startTime
+        forwardBytes = snapshot.indptr.nbytes + snapshot.indices.nbytes + snapshot.weights.nbytes
+        reverseBytes = sum(array.nbytes for array in snapshot.reverse)
+
+        startTime = tme.perf_counter()
+        early = [graph.shortestPath(source, target).getDistance() for source, target in queries]
+        earlyTime = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        bidirectional = [graph.shortestPath(source, target, bidirectional=True).getDistance() for source, target in queries]
+        bidirectionalTime = tme.perf_counter() - startTime
+        if early != bidirectional:
+            raise Exception("Bidirectional search does not match the early exit search on a directed graph")
+
+        unreachable = sum(1 for distance in early if distance == float('inf'))
+        print(f"{f'{rows}x{cols}':>10} {snapshot.edgeCount:>8} {forwardBytes // 1024:>9} {reverseBytes // 1024:>13} {reverseTime * 1e3:>19.1f} {earlyTime / queryCount * 1e3:>16.2f} {bidirectionalTime / queryCount * 1e3:>19.2f} {unreachable:>12}")
+    print("=======================================")
+
+
+# this function gives profileShare of the roads of a graph a travel time profile over a day in minutes
+# the travel time is the static weight off peak and rises to peakFactor times it in the morning (07:00 to 09:00) and evening (16:00 to 18:00) peaks
+# the peak factor of each road is random so roads are not all slowed down the same way
+def rushHourProfiles(graph, profileShare=0.5, seed=1002):
+    rng = random.Random(seed)
+    times = [0, 420, 480, 540, 960, 1020, 1080, 1440]
+    roads = []
+    for vertex in graph.vertex:
+        for edge in vertex.getEdges():
+            if str(vertex.getLabel()) < str(edge.getToVertex().getLabel()):
+                roads.append((vertex.getLabel(), edge.getToVertex().getLabel(), edge.getWeight()))
+    for fromLabel, toLabel, weight in roads:
+        if rng.random() < profileShare:
+            morning = rng.uniform(1.5, 3.0)
+            evening = rng.uniform(1.5, 3.0)
+            graph.setEdgeProfile(fromLabel, toLabel, times, [weight, weight, weight * morning, weight, weight, weight * evening, weight, weight])
+
+
+# this function is time dependent Dijkstra's algorithm without the vectorised profile pieces, every arc with a profile is evaluated with np.interp when it is reached
+# it is the baseline DSAGraphSnapshot.timeDependentDijkstra is compared against and returns the travel time to each vertex the same way
+def perArcProfileDijkstra(snapshot, sourceId, departureTime):
+    indptr, indices, weights = snapshot.adjacencyLists()
+    profilePtr = snapshot.profilePtr.tolist()
+    profileTimes = snapshot.profileTimes
+    profileTravelTimes = snapshot.profileTravelTimes
+    arrival = [float('inf')] * snapshot.vertexCount
+    settled = bytearray(snapshot.vertexCount)
+    arrival[sourceId] = float(departureTime)
+    heap = [(float(departureTime), sourceId)]
+    while heap:
+        t, u = heapq.heappop(heap)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if settled[v]:
+                continue
+            if profilePtr[k] == profilePtr[k + 1]:
+                newArrival = t + weights[k]
+            else:
+                newArrival = t + float(np.interp(t, profileTimes[profilePtr[k]:profilePtr[k + 1]], profileTravelTimes[profilePtr[k]:profilePtr[k + 1]]))
+            if newArrival < arrival[v]:
+                arrival[v] = newArrival
+                heapq.heappush(heap, (newArrival, v))
+    return [value - departureTime for value in arrival]
+
+
+# this function times single source queries on city grids where half of the roads have a rush hour profile (see rushHourProfiles)
+# static Dijkstra's algorithm is compared against time dependent Dijkstra's algorithm leaving at 12:00 (off peak) and 08:00 (morning peak)
+# and against evaluating each profile with np.interp as it is reached, the per-arc column
+# the last column is how much longer the average travel time is when leaving in the morning peak than off peak
+def benchmarkTimeDependentRouting(sizes=((100, 100), (200, 200), (300, 300)), queryCount=10):
+    print("\n=======================================\nTime Dependent Routing Benchmark (city grids, half of the roads with rush hour profiles):\n=======================================")
+    print(f"{'Grid':>10} {'Static (ms)':>12} {'TD 12:00 (ms)':>14} {'TD 08:00 (ms)':>14} {'Per-Arc (ms)':>13} {'Peak Slowdown':>14}")
+    for rows, cols in sizes:
+        graph = gridGraph(rows, cols)
+        rushHourProfiles(graph)
+        snapshot = graph.freeze()
+        rng = random.Random(1002)
+        sourceIds = [rng.randrange(snapshot.vertexCount) for _ in range(queryCount)]
+        snapshot.adjacencyLists()
+
+        startTime = tme.perf_counter()
+        for sourceId in sourceIds:
+            snapshot.dijkstra(sourceId)
+        staticTime = tme.perf_counter() - startTime
+
+        results = {}
+        times = {}
+        for departureTime in (720, 480):
+            startTime = tme.perf_counter()
+            results[departureTime] = [snapshot.timeDependentDijkstra(sourceId, departureTime)[0] for sourceId in sourceIds]
+            times[departureTime] = tme.perf_counter() - startTime
+
+        startTime = tme.perf_counter()
+        perArc = [perArcProfileDijkstra(snapshot, sourceId, 480) for sourceId in sourceIds]
+        perArcTime = tme.perf_counter() - startTime
+        for found, expected in zip(perArc, results[480]):
+            if max(abs(a - b) for a, b in zip(found, expected.tolist())) > 1e-6:
+                raise Exception("Time dependent Dijkstra's algorithm does not match the per-arc evaluation")
+
+        slowdown = sum(result.mean() for result in results[480]) / sum(result.mean() for result in results[720])
+        print(f"{f'{rows}x{cols}':>10} {staticTime / queryCount * 1e3:>12.1f} {times[720] / queryCount * 1e3:>14.1f} {times[480] / queryCount * 1e3:>14.1f} {perArcTime / queryCount * 1e3:>13.1f} {slowdown:>14.2f}")
+    print("=======================================")
+
+
+
+# this function plans delivery tours of stopCount random addresses on a rows x cols city grid with DSATourPlanner
+# the travel time table is built once per tour and timed on its own, then the tour is planned with each time budget in budgets
+# the nearest neighbour tour (a budget of 0) is the starting point, the saving is how much shorter the improved tour is
+def benchmarkTourPlanning(stopCounts=(50, 100, 200, 500), budgets=(0.0, 0.1, 0.5, 2.0), rows=60, cols=60, seed=1002):
+    print("\n=======================================\nTour Planning Benchmark ({}x{} city grid):\n=======================================".format(rows, cols))
+    graph = gridGraph(rows, cols)
+    graph.freeze()
+    rng = random.Random(seed)
+    labels = [f"{r}_{c}" for r in range(rows) for c in range(cols)]
+    print(f"{'Stops':>6} {'Table (s)':>10} {'Budget (s)':>11} {'Plan (s)':>9} {'Travel Time':>12} {'Saving':>7} {'2-opt':>6} {'Or-opt':>7}")
+    for stopCount in stopCounts:
+        chosen = rng.sample(labels, stopCount + 1)
+        startTime = tme.perf_counter()
+        planner = DSATourPlanner(graph, chosen[0], chosen[1:])
+        tableTime = tme.perf_counter() - startTime
+        for budget in budgets:
+            tour = planner.plan(budget)
+            saving = 1 - tour.cost / tour.initialCost
+            print(f"{stopCount:>6} {tableTime:>10.2f} {budget:>11.1f} {tour.getPlanTime():>9.3f} {tour.getCost():>12} {saving:>7.1%} {tour.twoOptMoves:>6} {tour.orOptMoves:>7}")
+    print("=======================================")
+
+
+# this function fills a DSAHeap with parcelCount parcels for random addresses on a rows x cols city grid and plans their delivery with DSADispatchPlanner
+# the setup (travel times from the depot and between nearby parcels) and the savings heuristic are timed separately
+# the travel time is compared with sending every parcel on a trip of its own, the late parcels are the ones the fleet cannot reach by their deadline
+def benchmarkDispatch(parcelCounts=(1000, 5000, 10000), rows=100, cols=100, vehicleCount=20, capacity=100, shiftLength=2000, seed=1002):
+    print("\n=======================================\nDispatch Planning Benchmark ({}x{} city grid, {} vans of {} parcels):\n=======================================".format(rows, cols, vehicleCount, capacity))
+    graph = gridGraph(rows, cols)
+    graph.freeze()
+    depot = f"{rows // 2}_{cols // 2}"
+    labels = [f"{r}_{c}" for r in range(rows) for c in range(cols)]
+    print(f"{'Parcels':>8} {'Setup (s)':>10} {'Plan (s)':>9} {'Trips':>6} {'Travel Time':>12} {'One Trip Each':>14} {'Late':>6}")
+    for parcelCount in parcelCounts:
+        rng = random.Random(seed)
+        heap = DSAHeap(parcelCount)
+        for k in range(parcelCount):
+            heap.insert(f"ID_{k}", f"Customer_{k}", rng.choice(labels), rng.randint(1, 5), "In-Transit", rng.randint(1, 200))
+
+        startTime = tme.perf_counter()
+        planner = DSADispatchPlanner(graph, depot, heap, vehicleCount, capacity, shiftLength)
+        setupTime = tme.perf_counter() - startTime
+        plan = planner.plan()
+        tripCount = sum(plan.getTripCount(vehicle) for vehicle in range(vehicleCount))
+        oneTripEach = int((planner.fromDepot + planner.toDepot).sum())
+        print(f"{parcelCount:>8} {setupTime:>10.2f} {plan.getPlanTime():>9.2f} {tripCount:>6} {plan.getTotalTravelTime():>12} {oneTripEach:>14} {len(plan.getLateParcels()):>6}")
+    print("=======================================")
+
+
+# helper function for benchmarkSuite that builds a graph one addVertex/addEdge call at a time and times each part and the first freeze
+def _timedBuild(vertices, edges):
+    graph = DSAGraph()
+    startTime = tme.perf_counter()
+    for label, value in vertices:
+        graph.addVertex(label, value)
+    vertexTime = tme.perf_counter() - startTime
+    startTime = tme.perf_counter()
+    for fromLabel, toLabel, weight in edges:
+        graph.addEdge(fromLabel, toLabel, weight)
+    edgeTime = tme.perf_counter() - startTime
+    startTime = tme.perf_counter()
+    graph.freeze()
+    freezeTime = tme.perf_counter() - startTime
+    return graph, vertexTime, edgeTime, freezeTime
+
+
+# this function runs every generator in generators (names in NETWORK_GENERATORS) at each of the sizes (vertex counts)
+# for each network it times the addVertex/addEdge bulk load and the first freeze, then BFS, DFS and Dijkstra's algorithm on the snapshot
+# from sourceCount random vertices (the average time per search is reported)
+# the memory is measured with tracemalloc on a second build of the same network, as tracing slows every allocation down and would skew the times:
+# graphBytes is the memory the graph and its snapshot hold once built and peakBytes is the most that was in use while building it
+# the results are printed as a table and returned as a list of dicts, one per network, which are also written to jsonFile and csvFile if given
+# the JSON file holds the python and numpy versions and the time of the run along with the results so runs can be compared later
+def benchmarkSuite(sizes=(1000, 10000, 50000), generators=("grid", "geometric", "scaleFree"), sourceCount=5, jsonFile=None, csvFile=None, seed=1002):
+    print("\n=======================================\nRouting Benchmark Suite (generated networks):\n=======================================")
+    print(f"{'Network':>10} {'Vertices':>9} {'Edges':>9} {'Vertices (s)':>13} {'Edges (s)':>10} {'Freeze (s)':>11} {'BFS (ms)':>9} {'DFS (ms)':>9} {'Dijkstra (ms)':>14} {'Graph (MB)':>11} {'Peak (MB)':>10}")
+    results = []
+    for name in generators:
+        if name not in NETWORK_GENERATORS:
+            raise Exception(f"Unknown network generator: {name}")
+        for size in sizes:
+            vertices, edges = NETWORK_GENERATORS[name](size, seed=seed)
+            graph, vertexTime, edgeTime, freezeTime = _timedBuild(vertices, edges)
+            snapshot = graph.freeze()
+            rng = random.Random(seed)
+            sourceIds = [rng.randrange(snapshot.vertexCount) for _ in range(sourceCount)]
+            searchTimes = []
+            for search in (snapshot.bfs, snapshot.dfs, snapshot.dijkstra):
+                startTime = tme.perf_counter()
+                for sourceId in sourceIds:
+                    search(sourceId)
+                searchTimes.append((tme.perf_counter() - startTime) / sourceCount)
+            del graph, snapshot
+
+            tracemalloc.start()
+            graph, _, _, _ = _timedBuild(vertices, edges)
+            graphBytes, peakBytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del graph
+
+            result = {
+                "network": name,
+                "vertices": len(vertices),
+                "edges": len(edges),
+                "addVertexSeconds": vertexTime,
+                "addEdgeSeconds": edgeTime,
+                "freezeSeconds": freezeTime,
+                "bfsSeconds": searchTimes[0],
+                "dfsSeconds": searchTimes[1],
+                "dijkstraSeconds": searchTimes[2],
+                "graphBytes": graphBytes,
+                "peakBytes": peakBytes,
+            }
+            results.append(result)
+            print(f"{name:>10} {len(vertices):>9} {len(edges):>9} {vertexTime:>13.3f} {edgeTime:>10.3f} {freezeTime:>11.3f} {searchTimes[0] * 1e3:>9.1f} {searchTimes[1] * 1e3:>9.1f} {searchTimes[2] * 1e3:>14.1f} {graphBytes / 2 ** 20:>11.1f} {peakBytes / 2 ** 20:>10.1f}")
+    print("=======================================")
+
+    if jsonFile is not None:
+        run = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "time": tme.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "sourceCount": sourceCount,
+            "results": results,
+        }
+        with open(jsonFile, 'w') as file:
+            json.dump(run, file, indent=2)
+    if csvFile is not None:
+        with open(csvFile, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(results[0].keys()) if results else [])
+            writer.writeheader()
+            writer.writerows(results)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the graph benchmarks, or only the routing benchmark suite with --suite")
+    parser.add_argument("--suite", action="store_true", help="only run benchmarkSuite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="vertex counts of the generated networks")
+    parser.add_argument("--generators", nargs="+", default=list(NETWORK_GENERATORS), choices=list(NETWORK_GENERATORS), help="networks to generate")
+    parser.add_argument("--sources", type=int, default=5, help="number of sources to time BFS, DFS and Dijkstra's algorithm from")
+    parser.add_argument("--json", help="file to write the suite results to as JSON")
+    parser.add_argument("--csv", help="file to write the suite results to as CSV")
+    parser.add_argument("--seed", type=int, default=1002, help="seed of the generated networks")
+    args = parser.parse_args()
+
+    benchmarkSuite(args.sizes, args.generators, args.sources, args.json, args.csv, args.seed)
+    if args.suite:
+        raise SystemExit
+    benchmarkBulkLoad()
+    benchmarkEdgeListLoad()
+    benchmarkBinaryLoad()
+    benchmarkHubVertices()
+    benchmarkCycleAnalysis()
+    benchmarkDeliveryZones()
+    benchmarkBatchRouting()
+    benchmarkDijkstraHeaps()
+    benchmarkDijkstraHeapOperations()
+    benchmarkPointToPoint()
+    benchmarkAStar()
+    benchmarkContractionHierarchy()
+    benchmarkEdgeUpdates()
+    benchmarkResilience()
+    benchmarkAdjacencyMatrix()
+    benchmarkDirectedRouting()
+    benchmarkTourPlanning()
+    benchmarkDispatch()
+    benchmarkTimeDependentRouting()
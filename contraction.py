@@ -0,0 +1,325 @@
+import heapq
+import numpy as np
+from linkedlists_main import DSALinkedList
+from graphs import DSARoute, _travelTime
+
+'''
+    This is the contraction.py module.
+    It contains the DSAContractionHierarchy class which is an optional routing index built from a DSAGraph.
+
+    A contraction hierarchy ranks every vertex and then removes (contracts) the vertices one at a time from the lowest rank up.
+    When a vertex is contracted, a shortcut edge is added between each pair of its neighbours whose shortest path went through it,
+    unless a witness search finds another path that is just as short. A shortest path query then only ever has to follow edges
+    that go up in rank, searching forwards from the source and backwards from the target until the two searches meet.
+    This settles a few hundred vertices on a city network instead of a large part of the graph, and it gives the same
+    travel times as DSAGraph.dijkstra.
+
+    The vertex order uses the edge difference (shortcuts added minus edges removed) plus the number of contracted neighbours,
+    with lazy updates: a vertex taken off the priority queue has its priority recomputed and goes back on if it is no longer the smallest.
+
+    The in and out edges of each vertex are kept apart while contracting, so the same index works for a directed graph with one way streets.
+
+    The finished index is a pair of CSR arrays (upward edges out of each vertex and upward edges into each vertex) which are saved
+    and loaded with numpy so the preprocessing only has to be done once for a network.
+
+    The functions/methods in this file include:
+    - build: Builds the hierarchy from a DSAGraph
+    - getDistance: Finds the travel time between two vertices
+    - shortestPath: Finds the travel time and path between two vertices as a DSARoute object
+    - getIndexSize: Returns the size of the index arrays in bytes
+    - save: Saves the index to a .npz file
+    - load: Loads an index saved by save
+
+    References:
+
+        Geisberger, R., Sanders, P., Schultes, D., & Delling, D. 2008. "Contraction Hierarchies: Faster and Simpler Hierarchical Routing in Road Networks".
+            Experimental Algorithms (WEA 2008), Lecture Notes in Computer Science, vol 5038. Springer.
+'''
+
+
+class DSAContractionHierarchy:
+    # witnessSettleLimit is the number of vertices a witness search may settle before it gives up
+    # giving up early only adds a shortcut that may not have been needed, it never makes a query wrong
+    def __init__(self, graph=None, witnessSettleLimit=60):
+        self.witnessSettleLimit = witnessSettleLimit
+        self.labels = None
+        self.labelIndex = None
+        self.rank = None
+        self.shortcutCount = 0
+        self.upOut = None
+        self.upIn = None
+        self.adjacency = None
+        if graph is not None:
+            self.build(graph)
+
+    def getLabel(self, vertexId):
+        return self.labels[vertexId]
+
+    def getId(self, label):
+        if self.labelIndex is None:
+            self.labelIndex = dict(zip((str(label) for label in self.labels), range(len(self.labels))))
+        vertexId = self.labelIndex.get(str(label))
+        if vertexId is None:
+            raise Exception("Vertex not found")
+        return vertexId
+
+    # this function builds the hierarchy from the frozen CSR snapshot of a graph
+    # outEdges[v] and inEdges[v] hold the remaining (not yet contracted) edges of v as dicts of neighbour -> (weight, middle vertex)
+    # the middle vertex is -1 for a road of the graph and the contracted vertex for a shortcut, it is used to unpack paths
+    # once v is contracted its remaining edges all lead to higher ranked vertices, they become its upward edges in the index
+    def build(self, graph):
+        snapshot = graph.freeze()
+        vertexCount = snapshot.vertexCount
+        indptr, indices, weights = snapshot.adjacencyLists()
+        outEdges = [dict() for _ in range(vertexCount)]
+        inEdges = [dict() for _ in range(vertexCount)]
+        for u in range(vertexCount):
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if v != u and (v not in outEdges[u] or weights[k] < outEdges[u][v][0]):
+                    outEdges[u][v] = (weights[k], -1)
+                    inEdges[v][u] = (weights[k], -1)
+
+        rank = np.full(vertexCount, -1, dtype=np.int64)
+        deletedNeighbours = [0] * vertexCount
+        upOutLists = [None] * vertexCount
+        upInLists = [None] * vertexCount
+        queue = [(self._priority(v, outEdges, inEdges, deletedNeighbours)[0], v) for v in range(vertexCount)]
+        heapq.heapify(queue)
+        shortcutCount = 0
+        nextRank = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # lazy update: if the recomputed priority is no longer the smallest the vertex goes back on the queue
+            # otherwise the shortcuts found while recomputing it are the ones added when it is contracted
+            priority, shortcuts = self._priority(v, outEdges, inEdges, deletedNeighbours)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, v))
+                continue
+
+            for u, w, weight in shortcuts:
+                if w not in outEdges[u] or weight < outEdges[u][w][0]:
+                    if w not in outEdges[u]:
+                        shortcutCount += 1
+                    outEdges[u][w] = (weight, v)
+                    inEdges[w][u] = (weight, v)
+
+            rank[v] = nextRank
+            nextRank += 1
+            upOutLists[v] = list(outEdges[v].items())
+            upInLists[v] = list(inEdges[v].items())
+            for w in outEdges[v]:
+                del inEdges[w][v]
+                deletedNeighbours[w] += 1
+            for u in inEdges[v]:
+                del outEdges[u][v]
+                deletedNeighbours[u] += 1
+            outEdges[v] = None
+            inEdges[v] = None
+
+        self.labels = snapshot.labels
+        self.labelIndex = None
+        self.rank = rank
+        self.shortcutCount = shortcutCount
+        self.upOut = _toCSR(upOutLists)
+        self.upIn = _toCSR(upInLists)
+        self.adjacency = None
+
+    # the priority of a vertex is its edge difference (shortcuts it would add minus edges it would remove) plus its contracted neighbours
+    # vertices with a small priority are contracted first
+    # it returns the priority and the shortcuts contracting the vertex would add
+    def _priority(self, v, outEdges, inEdges, deletedNeighbours):
+        shortcuts = self._shortcuts(v, outEdges, inEdges)
+        return len(shortcuts) - len(outEdges[v]) - len(inEdges[v]) + deletedNeighbours[v], shortcuts
+
+    # this function finds the shortcuts needed to contract v
+    # for each in neighbour u of v a witness search (Dijkstra's algorithm that avoids v) is run from u
+    # a shortcut u -> w is needed if the path u -> v -> w is shorter than any path the witness search found to w
+    # it returns a list of (u, w, weight) tuples
+    def _shortcuts(self, v, outEdges, inEdges):
+        shortcuts = []
+        outV = outEdges[v]
+        for u, (inWeight, _) in inEdges[v].items():
+            targets = [w for w in outV if w != u]
+            if not targets:
+                continue
+            maxDistance = inWeight + max(outV[w][0] for w in targets)
+            witness = self._witnessSearch(u, v, targets, maxDistance, outEdges)
+            for w in targets:
+                viaV = inWeight + outV[w][0]
+                if witness.get(w, float('inf')) > viaV:
+                    shortcuts.append((u, w, viaV))
+        return shortcuts
+
+    # Dijkstra's algorithm from u over the uncontracted vertices that skips v
+    # it stops once every target is settled, the distance passes maxDistance or witnessSettleLimit vertices are settled
+    def _witnessSearch(self, u, v, targets, maxDistance, outEdges):
+        distance = {u: 0.0}
+        settled = set()
+        remaining = len(targets)
+        targetSet = set(targets)
+        heap = [(0.0, u)]
+        while heap and remaining > 0 and len(settled) < self.witnessSettleLimit:
+            d, x = heapq.heappop(heap)
+            if x in settled:
+                continue
+            if d > maxDistance:
+                break
+            settled.add(x)
+            if x in targetSet:
+                remaining -= 1
+            for y, (weight, _) in outEdges[x].items():
+                if y == v or y in settled:
+                    continue
+                newDistance = d + weight
+                if newDistance < distance.get(y, float('inf')):
+                    distance[y] = newDistance
+                    heapq.heappush(heap, (newDistance, y))
+        return distance
+
+    # returns the upward CSR arrays as python lists for the query searches
+    def _adjacencyLists(self):
+        if self.adjacency is None:
+            self.adjacency = tuple(tuple(array.tolist() for array in csr) for csr in (self.upOut, self.upIn))
+        return self.adjacency
+
+    # this function is the bidirectional upward query between two vertex ids
+    # the forward search only follows upward edges out of each vertex from the source
+    # the backward search only follows upward edges into each vertex from the target
+    # a search stops once the smallest distance left on its heap is at least the best meeting distance found so far
+    # it returns the distance (inf if unreachable), the meeting vertex, the previous (vertex, edge) dicts of both searches and the settled count
+    def _query(self, sourceId, targetId):
+        searches = self._adjacencyLists()
+        distance = ({sourceId: 0.0}, {targetId: 0.0})
+        previous = ({sourceId: (-1, -1)}, {targetId: (-1, -1)})
+        settled = (set(), set())
+        heaps = ([(0.0, sourceId)], [(0.0, targetId)])
+        best = 0.0 if sourceId == targetId else float('inf')
+        meeting = sourceId if sourceId == targetId else -1
+        side = 0
+        while True:
+            active = [i for i in (0, 1) if heaps[i] and heaps[i][0][0] < best]
+            if not active:
+                break
+            side = active[0] if len(active) == 1 else 1 - side
+            d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            otherDistance = distance[1 - side]
+            if u in otherDistance and d + otherDistance[u] < best:
+                best = d + otherDistance[u]
+                meeting = u
+            indptr, indices, weights, _ = searches[side]
+            sideDistance = distance[side]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                newDistance = d + weights[k]
+                if newDistance < sideDistance.get(v, float('inf')):
+                    sideDistance[v] = newDistance
+                    previous[side][v] = (u, k)
+                    heapq.heappush(heaps[side], (newDistance, v))
+        return best, meeting, previous, len(settled[0]) + len(settled[1])
+
+    # finds the travel time between two vertices by label, inf if the target is unreachable
+    def getDistance(self, source, target):
+        return _travelTime(self._query(self.getId(source), self.getId(target))[0])
+
+    # finds the travel time and path between two vertices by label
+    # the path of the query is made of upward edges and shortcuts, each shortcut is unpacked into the roads it stands for
+    # it returns a DSARoute object, the hierarchy stands in for the snapshot as it can also give the label of a vertex id
+    def shortestPath(self, source, target):
+        sourceId = self.getId(source)
+        targetId = self.getId(target)
+        distance, meeting, previous, settled = self._query(sourceId, targetId)
+        if meeting == -1:
+            return DSARoute(self, float('inf'), [], settled)
+
+        # the forward half is a list of upward out edges from the source to the meeting vertex
+        # the backward half is a list of upward in edges from the meeting vertex to the target
+        upOutMiddle = self.upOut[3]
+        upInMiddle = self.upIn[3]
+        hops = DSALinkedList()
+        vertexId = meeting
+        while previous[0][vertexId][0] != -1:
+            u, k = previous[0][vertexId]
+            hops.insertFirst((u, vertexId, int(upOutMiddle[k])))
+            vertexId = u
+        vertexId = meeting
+        while previous[1][vertexId][0] != -1:
+            w, k = previous[1][vertexId]
+            hops.insertLast((vertexId, w, int(upInMiddle[k])))
+            vertexId = w
+
+        pathIds = [sourceId]
+        for u, w, middle in hops:
+            pathIds.extend(self._unpack(u, w, middle)[1:])
+        return DSARoute(self, distance, pathIds, settled)
+
+    # unpacks the edge u -> w into the path of graph vertices it stands for
+    # a shortcut u -> w through middle m is the two lower edges u -> m and m -> w, which are unpacked in turn
+    # an explicit stack is used instead of recursion as long shortcuts can be nested very deeply
+    def _unpack(self, u, w, middle):
+        path = [u]
+        stack = [(u, w, middle)]
+        while stack:
+            a, b, m = stack.pop()
+            if m == -1:
+                path.append(b)
+            else:
+                stack.append((m, b, self._findMiddle(m, b)))
+                stack.append((a, m, self._findMiddle(a, m)))
+        return path
+
+    # finds the middle vertex of the edge a -> b in the index
+    # the edge is stored with whichever of a and b has the lower rank, as an upward out edge of a or an upward in edge of b
+    def _findMiddle(self, a, b):
+        if self.rank[a] < self.rank[b]:
+            indptr, indices, _, middle = self.upOut
+            row, other = a, b
+        else:
+            indptr, indices, _, middle = self.upIn
+            row, other = b, a
+        for k in range(indptr[row], indptr[row + 1]):
+            if indices[k] == other:
+                return int(middle[k])
+        raise Exception("Edge not found in contraction hierarchy")
+
+    # returns the size of the index arrays in bytes
+    def getIndexSize(self):
+        return int(self.rank.nbytes + sum(array.nbytes for csr in (self.upOut, self.upIn) for array in csr))
+
+    # saves the index to filename as a .npz file, labels are saved as strings
+    def save(self, filename):
+        np.savez(filename, labels=np.array([str(label) for label in self.labels]), rank=self.rank,
+                 shortcutCount=np.array([self.shortcutCount]),
+                 upOutIndptr=self.upOut[0], upOutIndices=self.upOut[1], upOutWeights=self.upOut[2], upOutMiddle=self.upOut[3],
+                 upInIndptr=self.upIn[0], upInIndices=self.upIn[1], upInWeights=self.upIn[2], upInMiddle=self.upIn[3])
+
+    # loads an index saved by save, labels are loaded back as strings
+    def load(self, filename):
+        with np.load(filename) as data:
+            self.labels = data["labels"].astype(object)
+            self.rank = data["rank"]
+            self.shortcutCount = int(data["shortcutCount"][0])
+            self.upOut = (data["upOutIndptr"], data["upOutIndices"], data["upOutWeights"], data["upOutMiddle"])
+            self.upIn = (data["upInIndptr"], data["upInIndices"], data["upInWeights"], data["upInMiddle"])
+        self.labelIndex = None
+        self.adjacency = None
+
+
+# helper function that turns a list of (neighbour, (weight, middle)) lists, one per vertex, into CSR arrays
+# it returns (indptr, indices, weights, middle) numpy arrays
+def _toCSR(edgeLists):
+    indptr = [0]
+    indices = []
+    weights = []
+    middle = []
+    for edges in edgeLists:
+        for neighbour, (weight, middleVertex) in edges:
+            indices.append(neighbour)
+            weights.append(weight)
+            middle.append(middleVertex)
+        indptr.append(len(indices))
+    return (np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            np.array(weights, dtype=np.float64), np.array(middle, dtype=np.int64))
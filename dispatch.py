@@ -0,0 +1,293 @@
+import heapq
+import time as tme
+import numpy as np
+from linkedlists_main import DSALinkedList
+from heaps import DSAHeap
+from graphs import DSAUnionFind, _travelTime
+
+'''
+    This is the dispatch.py module.
+    It contains the DSADispatchPlanner class which shares the pending parcels of a DSAHeap out between a fleet of delivery vans
+    and plans the route of each van over a DSAGraph, starting and ending at the depot.
+
+    Each van carries at most capacity parcels per trip. The calculated priority of each parcel (see DSAHeap.priorityCalculation) is used
+    as a deadline: the highest priority parcel must be driven to straight from the depot, the lowest priority parcel may be reached
+    as late as the end of the shift (shiftLength), and the parcels in between get a deadline in proportion to their priority.
+    Without a shiftLength there are no deadlines and the priorities only decide which trips leave first.
+
+    The trips are built with the Clarke-Wright savings heuristic. Every parcel starts on a trip of its own (depot -> parcel -> depot), then
+    trips are joined end to start in order of the travel time the join saves, d(i, depot) + d(depot, j) - d(i, j), as long as the joined trip fits
+    in the van and no parcel on it misses its deadline. Each trip keeps its load, the time it reaches its last stop and the smallest slack
+    (deadline minus arrival time) of its parcels, so a join is checked and the joined trip updated in O(1): joining shifts every arrival on
+    the second trip by the same amount. The trips are kept in a DSAUnionFind from graphs.py.
+
+    To plan thousands of parcels the savings are only worked out between each parcel and its neighbourCount nearest parcels by travel time,
+    found with one Dijkstra's algorithm per address that stops once enough addresses are settled (DSAGraphSnapshot.nearestTargets),
+    rather than building the full table of travel times between every pair of parcels.
+
+    Finished trips go to the van that is free first, most urgent (least slack) trip first, and a van that has done one trip goes out again.
+    Parcels that are reached after their deadline because of this are reported as late.
+
+    The functions/methods in this file include:
+    - DSADispatchPlanner: Finds the travel times from the depot to every parcel and back and between nearby parcels
+    - plan: Builds the trips with the savings heuristic and shares them out between the vans, returns a DSADispatchPlan object
+    - DSADispatchPlan: The planned routes and parcels of each van with their travel times, the late parcels and the parcels that cannot be delivered
+
+    References:
+
+        Clarke, G., & Wright, J. W. 1964. "Scheduling of Vehicles from a Central Depot to a Number of Delivery Points". Operations Research, 12(4), 568-581.
+'''
+
+
+class DSADispatchPlanner:
+    # parcels is a DSAHeap (its pending entries are read without being extracted) or a list of DSAHeapEntry objects
+    # the address of each entry is the label of a vertex of graph, parcels whose address is not in the graph or cannot be
+    # driven to from the depot and back are left out of the plan and reported by DSADispatchPlan.getUndeliverable
+    def __init__(self, graph, depot, parcels, vehicleCount, capacity, shiftLength=None, neighbourCount=10):
+        if vehicleCount < 1 or capacity < 1:
+            raise Exception("Need at least one vehicle with room for one parcel")
+        if isinstance(parcels, DSAHeap):
+            parcels = parcels.heapArray[:parcels.count]
+        self.graph = graph
+        self.depot = depot
+        self.vehicleCount = vehicleCount
+        self.capacity = capacity
+        self.shiftLength = shiftLength
+        self.neighbourCount = neighbourCount
+
+        snapshot = graph.freeze()
+        self.snapshot = snapshot
+        depotId = snapshot.getId(depot)
+        entries = list(parcels)
+        addressIds = np.full(len(entries), -1, dtype=np.int64)
+        for i, entry in enumerate(entries):
+            try:
+                addressIds[i] = snapshot.getId(entry.address)
+            except Exception:
+                addressIds[i] = -1
+
+        # travel times from the depot to every address and back (a search along the arcs backwards for a directed graph)
+        isAddress = bytearray(snapshot.vertexCount)
+        for addressId in addressIds[addressIds >= 0].tolist():
+            isAddress[addressId] = 1
+        fromDepot = np.full(snapshot.vertexCount, np.inf)
+        toDepot = np.full(snapshot.vertexCount, np.inf)
+        targets, distances = snapshot.nearestTargets(depotId, isAddress)
+        fromDepot[targets] = distances
+        targets, distances = snapshot.nearestTargets(depotId, isAddress, reverse=True)
+        toDepot[targets] = distances
+
+        routable = np.zeros(len(entries), dtype=bool)
+        known = addressIds >= 0
+        routable[known] = np.isfinite(fromDepot[addressIds[known]]) & np.isfinite(toDepot[addressIds[known]])
+        self.undeliverable = [entries[i] for i in np.nonzero(~routable)[0].tolist()]
+        keep = np.nonzero(routable)[0]
+        self.entries = [entries[i] for i in keep.tolist()]
+        self.addressIds = addressIds[keep]
+        self.fromDepot = fromDepot[self.addressIds]
+        self.toDepot = toDepot[self.addressIds]
+        self.priorities = np.array([float(entry.priority) for entry in self.entries], dtype=np.float64)
+        self.deadlines = self._deadlines()
+        self.pairs = self._neighbourPairs()
+
+    # helper method that turns the priorities into deadlines, the time from the start of the shift each parcel has to be reached by
+    # a deadline is never earlier than driving straight to the parcel, so every parcel can be delivered on time on a trip of its own
+    def _deadlines(self):
+        if self.shiftLength is None or len(self.entries) == 0:
+            return np.full(len(self.entries), np.inf)
+        highest = self.priorities.max()
+        urgency = self.priorities / highest if highest > 0 else np.zeros(len(self.entries))
+        return np.maximum(self.fromDepot, self.fromDepot + (self.shiftLength - self.fromDepot) * (1 - urgency))
+
+    # helper method that finds the neighbourCount nearest parcels (by travel time) of every parcel
+    # one search is run per address rather than per parcel, it stops once neighbourCount + 1 addresses are settled
+    # parcels at the same address are each other's nearest neighbours (travel time 0)
+    # it returns the (from parcel, to parcel, travel time) pairs as three numpy arrays
+    def _neighbourPairs(self):
+        snapshot = self.snapshot
+        count = self.neighbourCount
+        addresses, parcelAddress = np.unique(self.addressIds, return_inverse=True)
+        order = np.argsort(parcelAddress, kind='stable')
+        starts = np.searchsorted(parcelAddress[order], np.arange(len(addresses) + 1)).tolist()
+        order = order.tolist()
+        isAddress = bytearray(snapshot.vertexCount)
+        addressIndex = {}
+        for index, addressId in enumerate(addresses.tolist()):
+            isAddress[addressId] = 1
+            addressIndex[addressId] = index
+
+        fromParcels = []
+        toParcels = []
+        travelTimes = []
+        for index, addressId in enumerate(addresses.tolist()):
+            targets, distances = snapshot.nearestTargets(addressId, isAddress, count + 1)
+            atAddress = order[starts[index]:starts[index + 1]]
+            # the nearest parcels are the same for every parcel at this address apart from the parcel itself, so count + 1 are gathered
+            nearest = []
+            nearestTimes = []
+            for target, distance in zip(targets, distances):
+                targetIndex = addressIndex[target]
+                for j in order[starts[targetIndex]:starts[targetIndex + 1]]:
+                    if len(nearest) > count:
+                        break
+                    nearest.append(j)
+                    nearestTimes.append(distance)
+                if len(nearest) > count:
+                    break
+            for i in atAddress:
+                added = 0
+                for j, distance in zip(nearest, nearestTimes):
+                    if j == i:
+                        continue
+                    if added == count:
+                        break
+                    fromParcels.append(i)
+                    toParcels.append(j)
+                    travelTimes.append(distance)
+                    added += 1
+        return np.array(fromParcels, dtype=np.int64), np.array(toParcels, dtype=np.int64), np.array(travelTimes, dtype=np.float64)
+
+    # builds the trips with the savings heuristic and shares them out between the vans
+    # it returns the plan as a DSADispatchPlan object
+    def plan(self):
+        startTime = tme.perf_counter()
+        parcelCount = len(self.entries)
+        fromDepot = self.fromDepot.tolist()
+        deadlines = self.deadlines.tolist()
+        fromParcels, toParcels, travelTimes = self.pairs
+
+        # the savings of every pair, largest first (ties go to the pair found first)
+        savings = self.toDepot[fromParcels] + self.fromDepot[toParcels] - travelTimes
+        order = np.argsort(-savings, kind='stable')
+        order = order[savings[order] > 0]
+
+        # each trip is stored at its root in trips (see DSAUnionFind), nextStop and legTime link the parcels of a trip in order
+        trips = DSAUnionFind(parcelCount)
+        first = list(range(parcelCount))
+        last = list(range(parcelCount))
+        load = [1] * parcelCount
+        endTime = list(fromDepot)
+        slack = [deadline - arrival for deadline, arrival in zip(deadlines, fromDepot)]
+        nextStop = [-1] * parcelCount
+        legTime = [0.0] * parcelCount
+        capacity = self.capacity
+        for i, j, travelTime in zip(fromParcels[order].tolist(), toParcels[order].tolist(), travelTimes[order].tolist()):
+            rootI = trips.find(i)
+            rootJ = trips.find(j)
+            if rootI == rootJ or last[rootI] != i or first[rootJ] != j:
+                continue
+            if load[rootI] + load[rootJ] > capacity:
+                continue
+            # every arrival on j's trip moves back by shift, which must fit in the slack of its parcels
+            shift = endTime[rootI] + travelTime - fromDepot[j]
+            if shift > slack[rootJ] + 1e-9:
+                continue
+            trips.union(rootI, rootJ)
+            root = trips.find(i)
+            nextStop[i] = j
+            legTime[j] = travelTime
+            first[root] = first[rootI]
+            last[root] = last[rootJ]
+            load[root] = load[rootI] + load[rootJ]
+            slack[root] = min(slack[rootI], slack[rootJ] - shift)
+            endTime[root] = endTime[rootJ] + shift
+
+        # the trips leave in order of their slack, each one with the van that gets back to the depot first
+        roots = [i for i in range(parcelCount) if trips.find(i) == i]
+        roots.sort(key=lambda root: slack[root])
+        vans = [(0.0, van) for van in range(self.vehicleCount)]
+        vehicleTrips = [[] for _ in range(self.vehicleCount)]
+        toDepot = self.toDepot.tolist()
+        for root in roots:
+            freeTime, van = heapq.heappop(vans)
+            stops = []
+            arrivals = []
+            stop = first[root]
+            arrival = freeTime + fromDepot[stop]
+            while stop != -1:
+                if stops:
+                    arrival += legTime[stop]
+                stops.append(stop)
+                arrivals.append(arrival)
+                stop = nextStop[stop]
+            vehicleTrips[van].append((stops, arrivals))
+            heapq.heappush(vans, (arrival + toDepot[stops[-1]], van))
+        return DSADispatchPlan(self, vehicleTrips, tme.perf_counter() - startTime)
+
+
+# this class holds the plan made by DSADispatchPlanner.plan
+# trips[van] is the list of trips of each van in the order it drives them, each a (parcel indexes, arrival times) pair
+class DSADispatchPlan:
+    def __init__(self, planner, trips, planTime):
+        self.planner = planner
+        self.trips = trips
+        self.planTime = planTime
+
+    def getVehicleCount(self):
+        return len(self.trips)
+
+    def getTripCount(self, vehicle):
+        return len(self.trips[vehicle])
+
+    def getPlanTime(self):
+        return self.planTime
+
+    # returns the parcels (DSAHeapEntry objects) of a van as a linked list in the order they are delivered
+    def getParcels(self, vehicle):
+        parcelList = DSALinkedList()
+        for stops, _ in self.trips[vehicle]:
+            parcelList.extend(self.planner.entries[stop] for stop in stops)
+        return parcelList
+
+    # returns the stops of a van as a linked list of addresses, starting and ending at the depot and going back to it between trips
+    # parcels for the same address next to each other on a trip are one stop
+    def getStops(self, vehicle):
+        planner = self.planner
+        stopList = DSALinkedList()
+        stopList.insertLast(planner.depot)
+        for stops, _ in self.trips[vehicle]:
+            previous = -1
+            for stop in stops:
+                if planner.addressIds[stop] != previous:
+                    stopList.insertLast(planner.entries[stop].address)
+                    previous = planner.addressIds[stop]
+            stopList.insertLast(planner.depot)
+        return stopList
+
+    # gets the time a van gets back to the depot after its last trip, 0 for a van with no trips
+    def getTravelTime(self, vehicle):
+        if not self.trips[vehicle]:
+            return 0
+        stops, arrivals = self.trips[vehicle][-1]
+        return _travelTime(arrivals[-1] + self.planner.toDepot[stops[-1]])
+
+    # gets the total driving time of every van
+    def getTotalTravelTime(self):
+        return _travelTime(sum(float(self.getTravelTime(vehicle)) for vehicle in range(len(self.trips))))
+
+    # returns the parcels that are reached after their deadline as a linked list of DSAHeapEntry objects
+    def getLateParcels(self):
+        planner = self.planner
+        lateList = DSALinkedList()
+        for vanTrips in self.trips:
+            for stops, arrivals in vanTrips:
+                for stop, arrival in zip(stops, arrivals):
+                    if arrival > planner.deadlines[stop] + 1e-9:
+                        lateList.insertLast(planner.entries[stop])
+        return lateList
+
+    # returns the parcels that were left out of the plan as their address is not in the graph or cannot be reached from the depot and back
+    def getUndeliverable(self):
+        undeliverableList = DSALinkedList()
+        undeliverableList.extend(self.planner.undeliverable)
+        return undeliverableList
+
+    def display(self):
+        print("\n=======================================\nDispatch Plan:\n=======================================")
+        for vehicle in range(len(self.trips)):
+            parcelCount = sum(len(stops) for stops, _ in self.trips[vehicle])
+            print(f"Van {vehicle + 1}: {self.getTripCount(vehicle)} trips, {parcelCount} parcels, back at the depot at {self.getTravelTime(vehicle)}")
+            print("    " + " -> ".join(str(stop) for stop in self.getStops(vehicle)))
+        print(f"Total travel time: {self.getTotalTravelTime()}")
+        print(f"Late parcels: {len(self.getLateParcels())}, undeliverable parcels: {len(self.planner.undeliverable)}")
+        print("=======================================")
@@ -1,32 +1,70 @@
+import bisect
+import gc
+import heapq
+import math
+import os
+import tempfile
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from linkedlists_main import DSALinkedList, DSAListNode
 from stacksandqueues import DSAStack, DSAQueue
 from heaps import *
+from hashes import DSAHashTable
 
 
 '''
     This is the graphs.py module.
-    It contains all of the necessary classes and methods to create and manipulate an undirected graph.
+    It contains all of the necessary classes and methods to create and manipulate an undirected graph, or a directed graph where streets can be one way.
     The graph is represented as an adjacency list and an adjacency matrix.
     The graph can be traversed using BFS, DFS and Dijkstra's algorithm.
     The graph can also be cleared and tested with a sample logistics network graph.
 
     The graph is uses methods from the DSALinkedList class from linkedlists_main.py and the DSAStack, DSAQueue and DijkstraHeap classes from stacksandqueues.py and heaps.py respectively.
     The graph is implemented using the DSAGraphVertex and DSAGraphEdge classes.
+    Vertices are also indexed by label in a DSAHashTable from hashes.py so that getVertex does not have to walk the vertex list.
+    For routing queries the graph can be frozen into a DSAGraphSnapshot, an immutable compressed sparse row (CSR) copy of the graph made of numpy arrays.
+    BFS, DFS and Dijkstra's algorithm run on the snapshot, which is rebuilt lazily after the graph has been edited.
+    Shortest path trees are kept in a least recently used DSARouteCache which is emptied whenever the graph version changes.
+    A graph made with DSAGraph(directed=True) can have one way streets, every search follows the edges in their direction and
+    backward searches (the bidirectional query and the repair of retained trees) follow the reverse CSR arrays of the snapshot.
 
     The functions/methods in this file include:
     - addVertex: Adds a vertex to the graph
-    - getVertex: Gets a vertex from the graph by label
+    - getVertex: Gets a vertex from the graph by label (O(1) through the label index)
     - addEdge: Adds an edge between two vertices in the graph
     - deleteVertex: Deletes a vertex from the graph
     - deleteEdge: Deletes an edge between two vertices in the graph
+    - updateEdgeWeight: Changes the travel time of an edge and repairs the retained shortest path trees
+    - setEdgeProfile: Gives an edge a piecewise linear travel time profile (DSATravelTimeProfile) so its travel time depends on the time of day
+    - retainShortestPathTree/getRetainedTree/releaseShortestPathTree: Keep shortest path trees for chosen hubs up to date across edge weight changes
     - displayAsList: Displays the graph as an adjacency list
-    - displayAsMatrix: Displays the graph as an adjacency matrix
+    - displayAsMatrix: Displays the graph as an adjacency matrix, optionally in pages, rendered from the sparse adjacency matrix
+    - toAdjacencyMatrix: Returns the adjacency matrix as sparse CSR or COO numpy arrays or as a dense numpy array in O(V + E)
+    - fromEdgeList: Builds a graph in one pass from an edge list CSV or from arrays of edges
+    - exportEdgeList: Writes the graph to an edge list CSV that fromEdgeList can read back
+    - save/load: Save the graph to a binary file and load it back, memory mapping the arrays
+    - freeze: Builds (or returns the current) DSAGraphSnapshot of the graph
+    - _graphChanged: Marks the snapshot stale and bumps the graph version which invalidates the route cache
     - BFS: Performs a breadth-first search on the graph
     - DFS: Performs a depth-first search on the graph
-    - dijkstra: Performs Dijkstra's algorithm on the graph to find the shortest path from a given vertex
+    - traverseBFS/traverseDFS: Generators that yield (label, depth, parent) for each vertex found by a BFS/DFS without printing, with a depth limit and stop condition
+    - hasCycle: Tests whether the graph has any cycle in linear time
+    - cycleBasis: Finds a fundamental cycle basis of the graph as lists of vertex ids
+    - isConnected: Tests whether two vertices are in the same connected component in close to O(1), using a union-find kept up to date by addVertex/addEdge
+    - getComponentCount/getComponentIds/getComponentId: The number of connected components and the component id of each vertex
+    - articulationPoints/bridges: Find the vertices and roads whose closure would split the network, with Tarjan's algorithm in O(V + E)
+    - shortestPaths: Performs Dijkstra's algorithm from a given vertex and returns the distances and paths as a DSAShortestPaths object
+    - shortestPath: Finds the shortest path between two vertices, stopping once the target is settled, and returns it as a DSARoute object
+      (both take an optional departure time to route with the edge travel time profiles using time dependent Dijkstra's algorithm)
+    - distanceMatrix: Finds the travel times from a set of source vertices to a set of target vertices as a DSADistanceMatrix
+    - multiSourceBFS/multiSourceDijkstra: Assign every vertex to its nearest hub by hops or travel time in one search, as numpy arrays
+    - routeBatch: Routes a batch of (source, target) queries grouped by source over a pool of worker processes sharing a memory mapped snapshot
+    - aStar: Finds the shortest path between two vertices with A* search guided by a heuristic, returns it as a DSARoute object
+    - dijkstra: Performs Dijkstra's algorithm on the graph to find the shortest path from a given vertex and prints the result
     - clearGraph: Clears the graph by removing all vertices and edges
-    - sortAdjacentList: Sorts the adjacent list of edges for a vertex in alphabetical order
+    - sortAdjacentList: Sorts a list of edges in alphabetical order of the vertex they go to (vertices cache their own sorted edges, see DSAGraphVertex.getSortedEdges)
+    - DSAUnionFind: The union-find (disjoint set forest) behind isConnected
+    - euclideanHeuristic/haversineHeuristic: Make A* heuristics from (x, y) or (latitude, longitude) coordinates stored as vertex values
 
 
     SELF CITING: This code has been adapted from the COMP1002 Practial 06 - Graphs by Muhammad Annas Atif (22224125)
@@ -38,26 +76,58 @@ from heaps import *
 
 class DSAGraph:
     # the graph here represents an undirected graph using an adjacency list
+    # if directed is True it is a directed graph instead, each edge is then one way unless addEdge is told it is a two way street
+    # a two way street in a directed graph is stored as an edge each way like every edge of an undirected graph, a one way street only as the edge from its start
     # each vertex is represented by a DSAGraphVertex object
-    def __init__(self):
+    # the vertexIndex is a hash table that maps the label of each vertex to the DSAGraphVertex object
+    # it is kept in sync with the vertex list by addVertex, deleteVertex and clearGraph
+    # the snapshot is the frozen CSR copy of the graph, it is set back to None (stale) by every method that edits the graph
+    # retainedTrees is a hash table of hub label -> DSAShortestPaths for the shortest path trees kept up to date by updateEdgeWeight
+    # version is bumped by every method that edits the graph, the route cache throws its trees away when it sees a new version
+    # routeCacheBytes is the memory bound of the route cache, 0 turns the cache off
+    # components is a union-find (DSAUnionFind) of the vertices kept up to date by addVertex and addEdge, each vertex holds its element as componentId
+    # deleting a vertex or edge can split a component which a union-find cannot undo, so componentsStale is set and it is rebuilt the next time it is asked for
+    def __init__(self, routeCacheBytes=64 * 1024 * 1024, directed=False):
+        self.directed = directed
         self.vertex = DSALinkedList()
-
+        self.vertexIndex = DSAHashTable(7)
+        self.snapshot = None
+        self.snapshotVertices = None
+        self.retainedTrees = DSAHashTable(7)
+        self.version = 0
+        self.routeCache = DSARouteCache(routeCacheBytes)
+        self.components = DSAUnionFind()
+        self.componentsStale = False
+        self.componentIds = None
+
+    # helper method called by every method that adds or removes vertices or edges
+    # it marks the snapshot stale and bumps the version so cached shortest path trees are not used again
+    def _graphChanged(self):
+        self.snapshot = None
+        self.version += 1
+
+    # gets a vertex from the graph by label using the vertex index
+    # the hash table hashes strings so the label is keyed by its string form
+    # returns None if the vertex does not exist
     def getVertex(self, label):
-        temp = self.vertex.head
-        while temp is not None:
-            if temp.value.getLabel() == label:
-                return temp.value
-            temp = temp.next
-        return None
+        key = str(label)
+        if not self.vertexIndex.hasKey(key):
+            return None
+        return self.vertexIndex.get(key)
     
     # adds a vertex to the graph
     # if the vertex already exists, it raises an exception
+    # the new vertex is added to the vertex list and the vertex index
 
     def addVertex(self, label, value=None):
         if self.getVertex(label) is not None:
             raise Exception("Vertex already exists")
         newVertex = DSAGraphVertex(label, value)
         self.vertex.insertLast(newVertex)
+        self.vertexIndex.put(str(label), newVertex)
+        if not self.componentsStale:
+            newVertex.componentId = self.components.add()
+        self._graphChanged()
 
     # adds an edge between two vertices in the graph
     # if one or both vertices do not exist it raises an exception
@@ -65,26 +135,39 @@ class DSAGraph:
     # if the edge is between the same vertex it raises an exception
     # the edge is initialised as a DSAGraphEdge object
     # the edge is added to the edges list of both vertices
-    def addEdge(self, fromLabel, toLabel, weight=1):
+    # oneWay says whether the edge is a one way street from fromLabel to toLabel, which is only added to the edges list of fromLabel
+    # it defaults to True in a directed graph and False in an undirected graph, an undirected graph cannot have one way edges
+    def addEdge(self, fromLabel, toLabel, weight=1, oneWay=None):
         fromVertex = self.getVertex(fromLabel)
         toVertex = self.getVertex(toLabel)
 
         if fromVertex is None or toVertex is None:
             raise Exception("One or both vertices not found")
+        if oneWay is None:
+            oneWay = self.directed
+        if oneWay and not self.directed:
+            raise Exception("One way edges need a directed graph")
         if fromLabel == toLabel:
             raise Exception("Cannot add edge to itself")
         for edge in fromVertex.getEdges():
             if edge.getToVertex().getLabel() == toLabel:
                 raise Exception("Edge already exists")
-            
+        if self.directed and not oneWay:
+            for edge in toVertex.getEdges():
+                if edge.getToVertex().getLabel() == fromLabel:
+                    raise Exception("Edge already exists")
 
-        newEdge = DSAGraphEdge(fromVertex, toVertex, weight)
+        newEdge = DSAGraphEdge(fromVertex, toVertex, weight, oneWay=oneWay)
         fromVertex.addEdge(newEdge)
-        toVertex.addEdge(DSAGraphEdge(toVertex, fromVertex, weight))  # Add reverse edge for undirected graph otherwise we have a directed graph which is a no no.
+        if not oneWay:
+            toVertex.addEdge(DSAGraphEdge(toVertex, fromVertex, weight))  # Add reverse edge for undirected graph otherwise we have a directed graph which is a no no.
+        if not self.componentsStale:
+            self.components.union(fromVertex.componentId, toVertex.componentId)
+        self._graphChanged()
 
     # deletes a vertex from the graph
     # if the vertex does not exist it raises an exception
-    # uses the _removeEdge method to remove all edges connected to the vertex
+    # uses the removeEdge method of each DSAGraphVertex to remove all edges connected to the vertex
     # uses the _removeVertex method to remove the vertex from the graph
     def deleteVertex(self, label):
         vertex = self.getVertex(label)
@@ -93,13 +176,16 @@ class DSAGraph:
 
         temp = self.vertex.head
         while temp is not None:
-            self._removeEdge(temp.value.getEdges(), label)
+            temp.value.removeEdge(label)
             temp = temp.next
 
         self._removeVertex(label)
+        self.componentsStale = True
+        self._graphChanged()
 
     # deletes an edge between two vertices in the graph
     # if one or both vertices do not exist it raises an exception
+    # in a directed graph a one way edge is only deleted from fromLabel to toLabel, a two way street is deleted both ways
     def deleteEdge(self, fromLabel, toLabel):
         fromVertex = self.getVertex(fromLabel)
         toVertex = self.getVertex(toLabel)
@@ -107,23 +193,112 @@ class DSAGraph:
         if fromVertex is None or toVertex is None:
             raise Exception("One or both vertices not found")
 
-        self._removeEdge(fromVertex.getEdges(), toLabel)
-        self._removeEdge(toVertex.getEdges(), fromLabel)
+        twoWay = not self.directed
+        for edge in fromVertex.getEdges():
+            if edge.getToVertex() is toVertex and not edge.isOneWay():
+                twoWay = True
+        fromVertex.removeEdge(toLabel)
+        if twoWay:
+            toVertex.removeEdge(fromLabel)
+        self.componentsStale = True
+        self._graphChanged()
+
+    # helper method that finds the edge objects that make up the edge from fromVertex to toVertex
+    # that is the edge from fromVertex and, unless it is a one way edge, the edge back from toVertex
+    # if there is no such edge it raises an exception
+    def _edgeArcs(self, fromVertex, toVertex):
+        arcs = []
+        for edge in fromVertex.getEdges():
+            if edge.getToVertex() is toVertex:
+                arcs.append(edge)
+        if len(arcs) == 1 and not arcs[0].isOneWay():
+            for edge in toVertex.getEdges():
+                if edge.getToVertex() is fromVertex:
+                    arcs.append(edge)
+            if len(arcs) != 2:
+                raise Exception("Edge not found")
+        if not arcs:
+            raise Exception("Edge not found")
+        return arcs
+
+    # changes the travel time of the edge between two vertices (both directions unless it is a one way edge of a directed graph)
+    # if one or both vertices do not exist or there is no edge between them it raises an exception
+    # the edges keep their place so the current snapshot is not rebuilt, it is replaced by a copy with the new weights (see DSAGraphSnapshot.withWeights)
+    # each retained shortest path tree is then repaired by re-settling only the vertices whose shortest paths changed
+    # if the snapshot was already stale the retained trees are recomputed the next time they are asked for instead
+    def updateEdgeWeight(self, fromLabel, toLabel, weight):
+        fromVertex = self.getVertex(fromLabel)
+        toVertex = self.getVertex(toLabel)
 
-    # helper method to remove edges from a vertexs edges list
-    # it iterates through the edgelist and removes edges that match the taget label
-    # O(N) Search for each edge unless the edge is at the head of the list or tail of the list
-    def _removeEdge(self, edgeList, targetLabel):
-        temp = DSALinkedList()
-        while not edgeList.isEmpty():
-            edge = edgeList.removeFirst()
-            if edge.getToVertex().getLabel() != targetLabel:
-                temp.insertLast(edge)
-        while not temp.isEmpty():
-            edgeList.insertLast(temp.removeFirst())
+        if fromVertex is None or toVertex is None:
+            raise Exception("One or both vertices not found")
+        edges = self._edgeArcs(fromVertex, toVertex)
+
+        oldWeights = [edge.getWeight() for edge in edges]
+        for edge in edges:
+            edge.setWeight(weight)
+        if all(oldWeight == weight for oldWeight in oldWeights):
+            return
+        self.version += 1
+        if self.snapshot is None:
+            return
+
+        oldSnapshot = self.snapshot
+        arcs = [(edge.getFromVertex().vertexId, edge.getToVertex().vertexId) for edge in edges]
+        self.snapshot = oldSnapshot.withWeights(arcs, weight)
+        for entry in self.retainedTrees.hashArray:
+            if entry.state == 1 and entry.value.snapshot is oldSnapshot:
+                tree = entry.value
+                tree.snapshot = self.snapshot
+                for (fromId, toId), oldWeight in zip(arcs, oldWeights):
+                    self.snapshot.repairShortestPaths(tree.distance, tree.previous, fromId, toId, oldWeight)
+
+    # gives the edge between two vertices (both directions unless it is a one way edge of a directed graph) a travel time profile for time dependent routing
+    # times and travelTimes are the breakpoints of a piecewise linear profile (see DSATravelTimeProfile), passing None for both removes the profile
+    # the static weight of the edge is kept and is still the one used by routing queries that are not given a departure time
+    # if one or both vertices do not exist or there is no edge between them it raises an exception
+    def setEdgeProfile(self, fromLabel, toLabel, times, travelTimes):
+        fromVertex = self.getVertex(fromLabel)
+        toVertex = self.getVertex(toLabel)
+
+        if fromVertex is None or toVertex is None:
+            raise Exception("One or both vertices not found")
+        profile = None if times is None and travelTimes is None else DSATravelTimeProfile(times, travelTimes)
+        for edge in self._edgeArcs(fromVertex, toVertex):
+            edge.setProfile(profile)
+        self._graphChanged()
+
+    # keeps the shortest path tree of a hub so that updateEdgeWeight repairs it instead of it being recomputed
+    # it returns the DSAShortestPaths object, which is updated in place as the graph changes
+    # the tree is its own copy rather than one shared with the route cache as it is changed in place
+    def retainShortestPathTree(self, hub):
+        tree = self._computeShortestPaths(hub)
+        self.retainedTrees.put(str(hub), tree)
+        return tree
+
+    # gets the retained shortest path tree of a hub, making sure it matches the current graph
+    # if vertices or edges were added or deleted since it was last repaired it is recomputed in place
+    def getRetainedTree(self, hub):
+        key = str(hub)
+        if not self.retainedTrees.hasKey(key):
+            raise Exception("No retained shortest path tree for this hub")
+        tree = self.retainedTrees.get(key)
+        snapshot = self.freeze()
+        if tree.snapshot is not snapshot:
+            current = self._computeShortestPaths(hub)
+            tree.snapshot = current.snapshot
+            tree.sourceId = current.sourceId
+            tree.distance = current.distance
+            tree.previous = current.previous
+        return tree
+
+    # stops keeping the shortest path tree of a hub up to date
+    def releaseShortestPathTree(self, hub):
+        self.retainedTrees.remove(str(hub))
 
     # helper method to remove a vertex from the graph
     # it iterates through the vertex list and removes the vertex that matches the target label
+    # the vertex is also removed from the vertex index
     def _removeVertex(self, label):
         temp = DSALinkedList()
         while not self.vertex.isEmpty():
@@ -132,6 +307,7 @@ class DSAGraph:
                 temp.insertLast(v)
         while not temp.isEmpty():
             self.vertex.insertLast(temp.removeFirst())
+        self.vertexIndex.remove(str(label))
 
     # displays the graph as an adjacency list
     # it iterates through the vertex list and prints the label of each vertex and its edges
@@ -151,204 +327,567 @@ class DSAGraph:
             temp = temp.next
 
     # displays the graph as an adjacency matrix
-    # it creates a matrix of size V x V
-    # The matrix is made using a linked list where each row is a linked list of edges
-    # it iterates through the vertex list and for each vertex it iterates through the edges to fill the matrix based on the edge weights
+    # row i and column i are the i-th vertex in the vertex list, each cell is the travel time of the edge from the row vertex to the column vertex
     # if there is no edge the weight is 0
-    # it them prints the matrix by iterating through the rows and columns and extracting the desired values
-    def displayAsMatrix(self):
-        matrix = DSALinkedList()
-
-        rowVertex = self.vertex.head
-        while rowVertex is not None:
-            row = DSALinkedList()
-            colVertex = self.vertex.head
-            while colVertex is not None:
-                edgeTemp = rowVertex.value.getEdges().head
-                found = False
-                while edgeTemp is not None:
-                    edge = edgeTemp.value
-                    if edge.getToVertex() == colVertex.value:
-                        row.insertLast(edge.getWeight())
-                        found = True
-                        break
-                    edgeTemp = edgeTemp.next
-                if not found:
-                    row.insertLast(0)  # No edge, insert 0
-                colVertex = colVertex.next
-            matrix.insertLast(row)
-            rowVertex = rowVertex.next
-
+    # the rows are rendered one at a time from the sparse CSR arrays of toAdjacencyMatrix, so the V x V matrix is never built
+    # and each row only costs its own edges plus the cells printed
+    # if pageSize is given the matrix is printed in pages of at most pageSize rows by pageSize columns, each under a line naming the rows and columns it holds
+    # without a pageSize the whole matrix is printed as a single page with no page line
+    def displayAsMatrix(self, pageSize=None):
+        indptr, indices, weights = self.toAdjacencyMatrix()
+        labels = self.snapshot.labels
+        vertexCount = len(indptr) - 1
+        indptr = indptr.tolist()
         print("\n=======================================\nAdjacency Matrix:\n=======================================")
-        rowNode = matrix.head
-        while rowNode is not None:
-            row = rowNode.value
-            colNode = row.head
-            while colNode is not None:
-                print(colNode.value, end=" ")
-                colNode = colNode.next
-            print()
-            rowNode = rowNode.next
+        if vertexCount == 0:
+            return
+        paged = pageSize is not None
+        if not paged:
+            pageSize = vertexCount
+        for rowStart in range(0, vertexCount, pageSize):
+            rowEnd = min(rowStart + pageSize, vertexCount)
+            for colStart in range(0, vertexCount, pageSize):
+                colEnd = min(colStart + pageSize, vertexCount)
+                if paged:
+                    print(f"Rows {labels[rowStart]} to {labels[rowEnd - 1]}, Columns {labels[colStart]} to {labels[colEnd - 1]}:")
+                for row in range(rowStart, rowEnd):
+                    # the columns of a row are in increasing order so the ones on this page are found with a binary search
+                    rowIndices = indices[indptr[row]:indptr[row + 1]]
+                    first, last = np.searchsorted(rowIndices, (colStart, colEnd))
+                    cells = [0] * (colEnd - colStart)
+                    for col, weight in zip(rowIndices[first:last].tolist(), weights[indptr[row] + first:indptr[row] + last].tolist()):
+                        cells[col - colStart] = _travelTime(weight)
+                    print(" ".join(str(cell) for cell in cells), end=" \n")
+
+    # this function returns the adjacency matrix of the graph with a few numpy passes over the arcs instead of scanning the edge list for every cell
+    # row i and column i are vertex i of the graph's snapshot, which is the i-th vertex in the vertex list (see freeze)
+    # see DSAGraphSnapshot.toAdjacencyMatrix for the formats, by default it is the sparse CSR arrays
+    def toAdjacencyMatrix(self, sparse=True, format="csr"):
+        return self.freeze().toAdjacencyMatrix(sparse, format)
+
+    # this function builds a graph in one pass from an edge list instead of one addVertex/addEdge call at a time
+    # edges is either the filename of an edge list CSV (see exportEdgeList) or a tuple of (from labels, to labels, weights) arrays
+    # the CSV is read a line at a time with each line being from,to,weight (weight defaults to 1), a line holding only a label adds a vertex with no edges
+    # a first line whose weight is not a number (e.g. from,to,weight) is taken as a header and skipped
+    # labels are kept in fixed width string (or integer) arrays rather than object arrays so np.unique sorts them in C
+    # vertices are numbered in the order their labels first appear by np.unique, which also drops self loops and duplicate edges (in either direction)
+    # so the first travel time given for an edge is the one kept, rather than addEdge's linear scan of the edge list for every edge
+    # the vertex index is sized up front so it is never resized and the snapshot is built straight from the arrays instead of by freeze
+    # if directed is True the graph is directed and each line is a one way edge, an edge given both ways is taken as a two way street
+    # duplicates are then only dropped in the same direction
+    @classmethod
+    def fromEdgeList(cls, edges, directed=False):
+        if isinstance(edges, str):
+            fromLabels, toLabels, weights = _readEdgeList(edges)
+        else:
+            fromLabels, toLabels, weights = edges
+            fromLabels = np.asarray(fromLabels)
+            toLabels = np.asarray(toLabels)
+            weights = np.asarray(weights, dtype=np.float64)
+            if not (len(fromLabels) == len(toLabels) == len(weights)):
+                raise Exception("Edge arrays must be the same length")
+
+        # a vertex with no edges is stored as a self loop so it still gets an id, then the self loops are dropped below
+        # the from and to labels are interleaved so that first appearance follows the order of the edges
+        uniqueLabels, firstIndex, inverse = np.unique(np.column_stack((fromLabels, toLabels)).reshape(-1), return_index=True, return_inverse=True)
+        vertexCount = len(uniqueLabels)
+        order = np.argsort(firstIndex, kind='stable')
+        vertexIds = np.empty(vertexCount, dtype=np.int64)
+        vertexIds[order] = np.arange(vertexCount, dtype=np.int64)
+        labelRank = inverse.reshape(-1)
+        fromIds = vertexIds[labelRank[0::2]]
+        toIds = vertexIds[labelRank[1::2]]
+        labels = uniqueLabels[order]
+
+        # keep the first copy of each undirected (or directed) edge, in file order
+        if directed:
+            keys = fromIds * vertexCount + toIds
+        else:
+            keys = np.minimum(fromIds, toIds) * vertexCount + np.maximum(fromIds, toIds)
+        _, keep = np.unique(keys, return_index=True)
+        keep.sort()
+        keep = keep[fromIds[keep] != toIds[keep]]
+        fromIds = fromIds[keep]
+        toIds = toIds[keep]
+        weights = weights[keep]
+
+        # the arcs hold both directions of each edge, edge i being arcs 2i (from -> to) and 2i + 1 (to -> from)
+        # in a directed graph the arcs are the edges themselves
+        if directed:
+            sources = fromIds
+            targets = toIds
+            arcWeights = weights
+            oneWay = _oneWayArcs(sources, targets, vertexCount)
+        else:
+            sources = np.column_stack((fromIds, toIds)).reshape(-1)
+            targets = np.column_stack((toIds, fromIds)).reshape(-1)
+            arcWeights = np.repeat(weights, 2)
+            oneWay = None
+        indptr = np.zeros(vertexCount + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=vertexCount), out=indptr[1:])
+
+        # the arcs are grouped by the vertex they leave, keeping the order addEdge would have added them in
+        graph = cls(directed=directed)
+        group = np.argsort(sources, kind='stable')
+        graph._bulkBuild(labels, None, indptr, targets[group], arcWeights[group], None if oneWay is None else oneWay[group])
+
+        # the snapshot rows are sorted by neighbour label, the same order freeze uses
+        # np.unique sorted the labels so the position of a label in uniqueLabels is its alphabetical rank
+        sortedRank = np.empty(vertexCount, dtype=np.int64)
+        sortedRank[vertexIds] = np.arange(vertexCount, dtype=np.int64)
+        arcOrder = np.lexsort((sortedRank[targets], sources))
+        graph.snapshot = DSAGraphSnapshot(labels, indptr, targets[arcOrder], arcWeights[arcOrder], directed=directed)
+        return graph
+
+    # helper method for fromEdgeList and load that fills an empty graph from arrays in one pass
+    # vertex i gets labels[i] (and values[i] if values is not None) and the edges to targets[indptr[i]:indptr[i + 1]] with the matching weights
+    # oneWay is None or an array saying which of the edges are one way edges of a directed graph
+    # the vertices are given their vertex ids so a snapshot with the same numbering can be set as the current snapshot afterwards
+    # the garbage collector is paused while the vertex, edge and list node objects are made as it would otherwise rescan them over and over
+    def _bulkBuild(self, labels, values, indptr, targets, weights, oneWay=None):
+        vertexCount = len(labels)
+        # the components are worked out from the snapshot the first time they are asked for rather than by a union per edge here
+        self.componentsStale = True
+        # labels such as street numbers or grid positions are close to sequential and cluster under the djb2 hash with linear probing
+        # so the index is sized to be about a quarter full rather than filled up to the 0.7 resize threshold
+        self.vertexIndex = DSAHashTable(4 * vertexCount)
+        self.snapshotVertices = np.empty(vertexCount, dtype=object)
+        vertices = self.snapshotVertices
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for vertexId, label in enumerate(labels.tolist()):
+                vertex = DSAGraphVertex(label, None if values is None else values[vertexId])
+                vertex.vertexId = vertexId
+                self.vertex.insertLast(vertex)
+                self.vertexIndex.put(str(label), vertex)
+                vertices[vertexId] = vertex
+
+            # each edge list is linked in one go
+            weights = np.asarray(weights)
+            if np.all(np.mod(weights, 1) == 0):
+                weights = weights.astype(np.int64).tolist()
+            else:
+                weights = [_travelTime(weight) for weight in weights.tolist()]
+            targets = np.asarray(targets).tolist()
+            bounds = np.asarray(indptr).tolist()
+            oneWay = [False] * len(targets) if oneWay is None else np.asarray(oneWay).tolist()
+            for vertexId in range(vertexCount):
+                vertex = vertices[vertexId]
+                start = bounds[vertexId]
+                end = bounds[vertexId + 1]
+                vertex.addEdges([DSAGraphEdge(vertex, vertices[toId], weight, None, flag)
+                                 for toId, weight, flag in zip(targets[start:end], weights[start:end], oneWay[start:end])])
+        finally:
+            if collecting:
+                gc.enable()
+
+    # this function saves the graph to a binary file that load (or DSAGraphSnapshot.load) reads back
+    # the file holds the frozen snapshot of the graph, see DSAGraphSnapshot.save for the layout
+    def save(self, filename):
+        self.freeze().save(filename)
+
+    # this function replaces the contents of the graph with a graph saved by save
+    # the file is memory mapped (see DSAGraphSnapshot.load) and becomes the graph's snapshot, so routing queries can start without freezing again
+    # the vertices and edges are then made from the snapshot arrays in one pass, labels are loaded back as strings
+    def load(self, filename):
+        snapshot = DSAGraphSnapshot.load(filename)
+        values = None
+        if snapshot.values.dtype != object:
+            values = [tuple(row) for row in snapshot.values.tolist()]
+        oneWay = None
+        if snapshot.directed:
+            oneWay = _oneWayArcs(np.repeat(np.arange(snapshot.vertexCount), np.diff(snapshot.indptr)), snapshot.indices, snapshot.vertexCount)
+        self.directed = snapshot.directed
+        self.vertex = DSALinkedList()
+        self.retainedTrees = DSAHashTable(7)
+        self._graphChanged()
+        self._bulkBuild(snapshot.labels, values, snapshot.indptr, snapshot.indices, snapshot.weights, oneWay)
+        if snapshot.profilePtr is not None:
+            # the edges of each vertex were added in snapshot order, so the k-th edge met here is arc k of the snapshot
+            profileBounds = snapshot.profilePtr.tolist()
+            arc = 0
+            for vertex in self.vertex:
+                for edge in vertex.getEdges():
+                    start, end = profileBounds[arc], profileBounds[arc + 1]
+                    if end > start:
+                        edge.setProfile(DSATravelTimeProfile(snapshot.profileTimes[start:end], snapshot.profileTravelTimes[start:end]))
+                    arc += 1
+        self.snapshot = snapshot
+
+    # this function writes the graph to an edge list CSV that fromEdgeList reads back
+    # the first line is the header from,to,weight and then each undirected edge is written once as from,to,weight
+    # in a directed graph each edge is written in its own direction, so a two way street is written both ways, and fromEdgeList(directed=True) reads it back
+    # vertices with no edges are written as a line holding only their label so they are not lost
+    # labels are written as strings and vertex values are not saved, if a label has a comma in it it raises an exception
+    def exportEdgeList(self, filename):
+        snapshot = self.freeze()
+        indptr, indices, weights = snapshot.adjacencyLists()
+        with open(filename, 'w') as file:
+            file.write("from,to,weight\n")
+            for vertexId in range(snapshot.vertexCount):
+                label = str(snapshot.getLabel(vertexId))
+                if ',' in label:
+                    raise Exception(f"Label {label} cannot be written to a CSV as it has a comma in it")
+                if indptr[vertexId] == indptr[vertexId + 1]:
+                    file.write(f"{label}\n")
+                for index in range(indptr[vertexId], indptr[vertexId + 1]):
+                    if indices[index] > vertexId or snapshot.directed:
+                        file.write(f"{label},{snapshot.getLabel(indices[index])},{_travelTime(weights[index])}\n")
+
+    # this function builds an immutable compressed sparse row (CSR) snapshot of the graph for routing queries
+    # each vertex is given an integer id (vertexId) from 0 to V-1 in the order it appears in the vertex list
+    # the edges of each vertex are written to the snapshot sorted by the label of the neighbour so traversals of the snapshot visit vertices in alphabetical order
+    # the snapshot is kept until the graph is edited, any edit marks it stale and it is rebuilt the next time freeze is called
+    # snapshotVertices maps the vertex ids back to the DSAGraphVertex objects so results can be given back in terms of the graph
+    # editing a vertex value or edge weight directly on the vertex/edge objects is not tracked, use the graph methods instead
+    def freeze(self):
+        if self.snapshot is None:
+            vertexCount = self.vertex.size
+            labels = np.empty(vertexCount, dtype=object)
+            values = np.empty(vertexCount, dtype=object)
+            self.snapshotVertices = np.empty(vertexCount, dtype=object)
+            vertexId = 0
+            for vertex in self.vertex:
+                vertex.vertexId = vertexId
+                labels[vertexId] = vertex.getLabel()
+                values[vertexId] = vertex.getValue()
+                self.snapshotVertices[vertexId] = vertex
+                vertexId += 1
+
+            indptr = [0]
+            indices = []
+            weights = []
+            profiles = []
+            for vertex in self.vertex:
+                for edge in vertex.getSortedEdges():
+                    indices.append(edge.getToVertex().vertexId)
+                    weights.append(edge.getWeight())
+                    profiles.append(edge.profile)
+                indptr.append(len(indices))
+
+            profileArrays = _packProfiles(profiles)
+            self.snapshot = DSAGraphSnapshot(labels, np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(weights, dtype=np.float64), values,
+                                             *profileArrays, directed=self.directed)
+        return self.snapshot
 
     # this function performs a breadth-first search (BFS) on the graph
     # it starts from a given vertex and explores all its adjacent vertices before proceeding to the next level
-    # it uses a queue to keep track of the vertices to be visited (Q) and a depth list made from a linked list to keep track of the depth of each vertex given from (D) (needed in the required output)
-    # there is also a temporary queue to keep track of the visited vertices (T).
-    # it marks each vertex as visited to avoid cycles and infinite loops
-    # it also uses teh sortAdjacentList function to sort the edges of each vertex in alphabetical order
+    # the search itself runs on the frozen CSR snapshot of the graph (see DSAGraphSnapshot.bfs) which returns the visit order, depth and parent of each vertex
+    # the pairs of (parent, vertex) make up the traversal (T) and the depth of each vertex in visit order makes up the depth list (D)
+    # adjacent vertices are visited in alphabetical order as the snapshot stores the edges of each vertex sorted by label
     # the BFS treaversal and Depth list are then printed in a formatted manner
     def BFS(self, reference):
-        T = DSAQueue()
-        Q = DSAQueue()
-        D = DSAQueue()
-        depthList = DSALinkedList()
-
-
-        for vertex in self.vertex:
-            vertex.clearVisited()
-
         v = self.getVertex(reference)
         if v is None:
             raise Exception("Vertex not found")
-        v.setVisited(True)
-        Q.enqueue(v)
-        D.enqueue(0)
-
-        while not Q.isEmpty():
-            v = Q.dequeue()
-            d = D.dequeue()
-
-            depthList.insertLast(f"{v.getLabel()} | {d}")
-            for each in sortAdjacentList(v.getEdges()):
-                if not each.getToVertex().getVisited():
-                    T.enqueue(v)
-                    T.enqueue(each.getToVertex())
-                    each.getToVertex().setVisited(True)
-                    D.enqueue(d + 1)
-                    Q.enqueue(each.getToVertex())
-    
+        snapshot = self.freeze()
+        order, depth, parent = snapshot.bfs(v.vertexId)
+
         print("\n=======================================\nBFS Traversal (Reachable Zones):\n")
-        count = 0
         formatted_output = ""
-        while not T.isEmpty():
-            v = T.dequeue()
-            if count > 0 and count % 2 == 0:
+        for count, vertexId in enumerate(order[1:]):
+            if count > 0:
                 formatted_output += " , "
-            formatted_output += v.getLabel()
-            if count % 2 == 0:
-                formatted_output += " "
-            count += 1
+            formatted_output += f"{snapshot.getLabel(parent[vertexId])} {snapshot.getLabel(vertexId)}"
         print(formatted_output.strip())
         print("=======================================\nDepth List (Hops Between Each Hub Intersection):\n")
-        count = 0
-        while not depthList.isEmpty():
-            v = depthList.removeFirst()
+        for count, vertexId in enumerate(order):
             if count > 0:
                 print(", ", end="")
-            print(v, end=" ")
-            count += 1
+            print(f"{snapshot.getLabel(vertexId)} | {depth[vertexId]}", end=" ")
         print("\n=======================================\n")
 
     # this function performs a depth-first search (DFS) on the graph
     # it starts from a given vertex and explores as far as possible along each branch before backtracking
-    # it uses a stack to keep track of the vertices to be visited (S) and a queue to keep track of the visited vertices (T)
-    # it also uses a linked list to keep track of the visited vertices in order to detect cycles
+    # the search itself runs on the frozen CSR snapshot of the graph (see DSAGraphSnapshot.dfs) which returns the visit order, the parent of each vertex and the detected cycles
+    # a cycle is detected when a vertex on the current search path has an edge back to the start vertex and the path has more than 2 vertices
+    # the pairs of (parent, vertex) make up the traversal (T) and each cycle is printed as the path of labels back to the start vertex
     def DFS(self, reference):
-        T = DSAQueue()
-        S = DSAStack()
-        cycleList = DSALinkedList() # this is the list that will store detected cycles
-        visitedList = DSALinkedList() # the visited list is separate from teh cycle list to avoid the DFS algorithm from detecting cycles in the visited list itself
-
-        for vertex in self.vertex: # clears the visited status of all vertices incase the DFS is run multiple times or BFS is run before DFS
-            vertex.clearVisited()
-        
-        # get the starting vertex and raise an exception if it does not exist
-        # mark it as visited and push it onto the stack
-        # # also insert it into the visited list
         v = self.getVertex(reference)
         if v is None:
             raise Exception("Vertex not found")
-        v.setVisited(True)
-        S.push(v)
-        visitedList.insertLast(v)
-
-        # while the stack is not empty pop the top vertex and explore its adjacent vertices by iterating through its edges
-        # if an adjacent vertex is not visitied mark it as visited, enqueue it to the queue, push it onto the stack and insert it into the visited list
-        # if a cycle is detected, it is added to the cycle list if it is not already present
-        # if the cycle is already present, it is not added again
-
-        while S.isEmpty() == False:
-            v = S.top()
-            foundUnvisited = False
-            for each in sortAdjacentList(v.getEdges()):
-                u = each.getToVertex()
-                
-                # Cycle Detection
-                # if the current vertex is the same as the head of the visited list and that list has more than 2 vertices it means a cycle is detected
-                # we then create a cycle string that contains the labels of the vertices in the cycle
-                if u == visitedList.head.value and visitedList.size > 2:
-                    cycleStr = ""
-                    temp = visitedList.head
-                    while temp is not None:
-                        cycleStr += temp.value.getLabel() + " -> "
-                        temp = temp.next
-                    cycleStr += u.getLabel()
-
-                    # Check if the cycle is already in the list
-                    # this is done by itereating through the cycle list and checking if the string is already present
-                    # if it is not present it is added to teh cycle list
-                    isDuplicate = False
-                    tempCycle = cycleList.head
-                    while tempCycle is not None:
-                        if tempCycle.value == cycleStr:
-                            isDuplicate = True
-                            break
-                        tempCycle = tempCycle.next
-
-                    if not isDuplicate:
-                        cycleList.insertLast(cycleStr)
-                
-                # 
-                if not u.getVisited():
-                    T.enqueue(v)
-                    T.enqueue(u)
-                    u.setVisited(True)
-                    S.push(u)
-                    visitedList.insertLast(u)
-                    foundUnvisited = True
-                    break
-            # if no unvistited adjacent vertices found pop the top vertex from the stack and remove it from the visited list
-            # this is done to backtrack and explore other branches of the graph and it is done until stack is empty
-            if not foundUnvisited:
-                S.pop()
-                visitedList.removeLast()
+        snapshot = self.freeze()
+        order, parent, cycles = snapshot.dfs(v.vertexId)
         
         # this prints the DFS traversal and the detected cycles
         print("\n=======================================\nDFS Traversal:\n")
-        count = 0
         formatted_output = ""
-        while not T.isEmpty():
-            v = T.dequeue()
-            if count > 0 and count % 2 == 0:
+        for count, vertexId in enumerate(order[1:]):
+            if count > 0:
                 formatted_output += " , "
-            formatted_output += v.getLabel()
-            if count % 2 == 0:
-                formatted_output += " "
-            count += 1
+            formatted_output += f"{snapshot.getLabel(parent[vertexId])} {snapshot.getLabel(vertexId)}"
         print(formatted_output.strip())
 
         print("=======================================\nDetected Cycles:\n")
-        temp = cycleList.head
-        while temp is not None:
-            print(temp.value)
-            temp = temp.next
-        if cycleList.isEmpty():
+        for cycle in cycles:
+            print(" -> ".join(str(snapshot.getLabel(vertexId)) for vertexId in cycle))
+        if len(cycles) == 0:
             print("No cycles detected.")
             print()
         print("=======================================\n")
-        
 
+    # this function returns a generator that performs a breadth-first search from a given vertex without printing anything
+    # it yields a (label, depth, parent label) tuple for each vertex as it is found, the parent of the start vertex is None
+    # vertices deeper than maxDepth are not searched for and stop is an optional function stop(label, depth, parentLabel)
+    # that ends the search after the first vertex it returns True for, e.g. to stop at the first depot found
+    # the search runs on the snapshot the graph had when it was called (see DSAGraphSnapshot.traverseBFS), later edits do not change it
+    def traverseBFS(self, reference, maxDepth=None, stop=None):
+        v = self.getVertex(reference)
+        if v is None:
+            raise Exception("Vertex not found")
+        snapshot = self.freeze()
+        return _labelledTraversal(snapshot, snapshot.traverseBFS(v.vertexId, maxDepth), stop)
+
+    # this function returns a generator that performs a depth-first search from a given vertex without printing anything
+    # it yields (label, depth, parent label) tuples in the same way as traverseBFS, see DSAGraphSnapshot.traverseDFS for how maxDepth limits the search
+    def traverseDFS(self, reference, maxDepth=None, stop=None):
+        v = self.getVertex(reference)
+        if v is None:
+            raise Exception("Vertex not found")
+        snapshot = self.freeze()
+        return _labelledTraversal(snapshot, snapshot.traverseDFS(v.vertexId, maxDepth), stop)
+
+    # this function tests whether the graph has any cycle in O(V + E), see DSAGraphSnapshot.hasCycle
+    # unlike DFS it looks at the whole graph and at every cycle, not just the cycles back to one start vertex
+    def hasCycle(self):
+        return self.freeze().hasCycle()
+
+    # this function finds a fundamental cycle basis of the graph, see DSAGraphSnapshot.cycleBasis
+    # it returns a list of cycles, each one a list of vertex ids, use freeze().getLabel to turn the ids back into labels
+    def cycleBasis(self):
+        return self.freeze().cycleBasis()
+
+    # helper method that returns the union-find of the graph's components, rebuilding it first if a deletion has made it stale
+    # the rebuild gives each vertex its snapshot vertex id as its element and unions the two ends of every arc in O(V + E)
+    def _componentIndex(self):
+        if self.componentsStale:
+            snapshot = self.freeze()
+            indptr, indices, _ = snapshot.adjacencyLists()
+            components = DSAUnionFind(snapshot.vertexCount)
+            for u in range(snapshot.vertexCount):
+                for k in range(indptr[u], indptr[u + 1]):
+                    if snapshot.directed or indices[k] > u:
+                        components.union(u, indices[k])
+            for vertex in self.vertex:
+                vertex.componentId = vertex.vertexId
+            self.components = components
+            self.componentsStale = False
+        return self.components
+
+    # this function tests whether two vertices are in the same connected component, in close to O(1) with the union-find
+    # in an undirected graph this is whether the target can be reached from the source at all, so it can be checked before any routing is attempted
+    # in a directed graph the components ignore the direction of the edges, vertices in different components can never reach each other
+    # but vertices in the same component may still be cut off by one way streets
+    def isConnected(self, source, target):
+        sourceVertex = self.getVertex(source)
+        targetVertex = self.getVertex(target)
+        if sourceVertex is None or targetVertex is None:
+            raise Exception("One or both vertices not found")
+        components = self._componentIndex()
+        return components.find(sourceVertex.componentId) == components.find(targetVertex.componentId)
+
+    # this function returns the number of connected components of the graph (ignoring edge directions in a directed graph)
+    def getComponentCount(self):
+        return self._componentIndex().count
+
+    # this function returns the component id of every vertex as a numpy array indexed by snapshot vertex id
+    # components are numbered from 0 in the order their first vertex appears in the vertex list, so the ids stay the same until the graph is edited
+    # the array is kept until the graph version changes
+    def getComponentIds(self):
+        if self.componentIds is None or self.componentIds[0] != self.version:
+            components = self._componentIndex()
+            snapshot = self.freeze()
+            roots = np.array([components.find(vertex.componentId) for vertex in self.snapshotVertices], dtype=np.int64)
+            _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+            order = np.empty(len(first), dtype=np.int64)
+            order[np.argsort(first, kind='stable')] = np.arange(len(first), dtype=np.int64)
+            componentIds = order[inverse.reshape(-1)]
+            componentIds.flags.writeable = False
+            self.componentIds = (self.version, componentIds)
+        return self.componentIds[1]
+
+    # this function gets the component id of a vertex by label, see getComponentIds
+    def getComponentId(self, label):
+        vertex = self.getVertex(label)
+        if vertex is None:
+            raise Exception("Vertex not found")
+        componentIds = self.getComponentIds()
+        return int(componentIds[vertex.vertexId])
+
+    # this function finds the articulation points of the graph, the vertices whose closure would split their component in two or more
+    # it returns a list of their labels, see DSAGraphSnapshot.articulationPoints
+    def articulationPoints(self):
+        snapshot = self.freeze()
+        return [snapshot.getLabel(vertexId) for vertexId in snapshot.articulationPoints().tolist()]
+
+    # this function finds the bridges of the graph, the single roads whose closure would split their component in two
+    # it returns a list of (label, label) tuples, see DSAGraphSnapshot.bridges
+    def bridges(self):
+        snapshot = self.freeze()
+        return [(snapshot.getLabel(u), snapshot.getLabel(v)) for u, v in snapshot.bridges().tolist()]
+
+    # this function finds the shortest paths from a given vertex to every other vertex using Dijkstra's algorithm
+    # the search runs on the frozen CSR snapshot of the graph (see DSAGraphSnapshot.dijkstra)
+    # it returns a DSAShortestPaths object holding the distance and previous vertex arrays keyed by vertex id
+    # nothing is stored on the vertices and nothing is printed, so any number of queries can be in use at the same time
+    # the tree is kept in the route cache so asking again from the same source before the graph changes does not search again
+    # if a departureTime is given the travel times of edges with a profile are taken at the time they are reached (see DSAGraphSnapshot.timeDependentDijkstra)
+    # and the distances are the travel times from leaving the source at departureTime, these trees are not cached
+    def shortestPaths(self, source, departureTime=None):
+        if departureTime is not None:
+            sourceVertex = self.getVertex(source)
+            if sourceVertex is None:
+                raise Exception("Start vertex not found")
+            snapshot = self.freeze()
+            distance, previous = snapshot.timeDependentDijkstra(sourceVertex.vertexId, departureTime)
+            return DSAShortestPaths(snapshot, sourceVertex.vertexId, distance, previous)
+        key = str(source)
+        tree = self.routeCache.get(key, self.version)
+        if tree is None:
+            tree = self._computeShortestPaths(source)
+            self.routeCache.put(key, tree, self.version)
+        return tree
+
+    # helper method that runs Dijkstra's algorithm for shortestPaths without going through the route cache
+    def _computeShortestPaths(self, source):
+        sourceVertex = self.getVertex(source)
+        if sourceVertex is None:
+            raise Exception("Start vertex not found")
+        snapshot = self.freeze()
+        distance, previous = snapshot.dijkstra(sourceVertex.vertexId)
+        return DSAShortestPaths(snapshot, sourceVertex.vertexId, distance, previous)
+
+    # this function finds the shortest path between two vertices
+    # unlike shortestPaths the search stops as soon as the target is settled, so only the part of the graph closer to the source than the target is searched
+    # if bidirectional is True a second search is run backwards from the target at the same time and the path is found where the two searches meet
+    # if a departureTime is given the route is the fastest one leaving the source at that time, using the edge travel time profiles (see DSAGraphSnapshot.timeDependentPointToPoint)
+    # the backward search would need the arrival time at the target, which is not known, so a departureTime cannot be used with bidirectional
+    # a target in a different component to the source (see isConnected) is given back as unreachable without searching at all
+    # it returns a DSARoute object holding the travel time, the path and the number of vertices each search settled
+    def shortestPath(self, source, target, bidirectional=False, departureTime=None):
+        sourceVertex = self.getVertex(source)
+        targetVertex = self.getVertex(target)
+        if sourceVertex is None or targetVertex is None:
+            raise Exception("One or both vertices not found")
+        snapshot = self.freeze()
+        if not self.isConnected(source, target):
+            return DSARoute(snapshot, float('inf'), [], 0)
+        if departureTime is not None:
+            if bidirectional:
+                raise Exception("Bidirectional search cannot be used with a departure time")
+            distance, pathIds, settled = snapshot.timeDependentPointToPoint(sourceVertex.vertexId, targetVertex.vertexId, departureTime)
+        elif bidirectional:
+            distance, pathIds, settled = snapshot.bidirectionalPointToPoint(sourceVertex.vertexId, targetVertex.vertexId)
+        else:
+            distance, pathIds, settled = snapshot.pointToPoint(sourceVertex.vertexId, targetVertex.vertexId)
+        return DSARoute(snapshot, distance, pathIds, settled)
+
+    # this function finds the travel time from every source vertex to every target vertex (a many to many distance table)
+    # sources and targets are lists of labels, if targets is None the travel times between the sources themselves are found
+    # one Dijkstra's algorithm is run per source on the frozen CSR snapshot and each one stops once all of the targets are settled
+    # it returns a DSADistanceMatrix whose matrix[i][j] is the travel time from sources[i] to targets[j] (inf if unreachable)
+    def distanceMatrix(self, sources, targets=None):
+        if targets is None:
+            targets = sources
+        snapshot = self.freeze()
+        sourceIds = self._vertexIds(sources)
+        targetIds = self._vertexIds(targets)
+
+        matrix = np.empty((len(sources), len(targets)), dtype=np.float64)
+        for i, sourceId in enumerate(sourceIds.tolist()):
+            matrix[i] = snapshot.distancesTo(sourceId, targetIds)
+        return DSADistanceMatrix(snapshot.labels[sourceIds], snapshot.labels[targetIds], matrix)
+
+    # this function assigns every vertex to its nearest hub by the number of hops, to make delivery zones
+    # hubs is a list of labels and one multi-source BFS is run from all of them at once (see DSAGraphSnapshot.multiSourceBFS)
+    # it returns two numpy arrays indexed by vertex id (see freeze): the index into hubs of the nearest hub and the number of hops to it
+    # both are -1 for vertices that no hub can reach
+    def multiSourceBFS(self, hubs):
+        snapshot = self.freeze()
+        return snapshot.multiSourceBFS(self._vertexIds(hubs))
+
+    # this function assigns every vertex to its nearest hub by travel time, to make delivery zones
+    # hubs is a list of labels and one multi-source Dijkstra's algorithm is run from all of them at once (see DSAGraphSnapshot.multiSourceDijkstra)
+    # it returns two numpy arrays indexed by vertex id (see freeze): the index into hubs of the nearest hub (-1 if unreachable) and the travel time to it (inf if unreachable)
+    def multiSourceDijkstra(self, hubs):
+        snapshot = self.freeze()
+        return snapshot.multiSourceDijkstra(self._vertexIds(hubs))
+
+    # this function routes a batch of (source, target) label queries, e.g. every parcel at the end of the day
+    # the queries are grouped by source and each group is answered by one Dijkstra's algorithm that stops once all of its targets are settled
+    # (see DSAGraphSnapshot.pathsTo), the groups are shared out over a pool of worker processes
+    # the snapshot is saved to a temporary binary file (see DSAGraphSnapshot.save) that every worker memory maps when it starts
+    # so the workers share one read only copy of the graph instead of each being sent its own
+    # workers is the number of processes (the number of CPUs by default), with 1 worker or a single source the batch is routed in this process
+    # it returns a list of DSARoute objects in the same order as the queries
+    def routeBatch(self, queries, workers=None):
+        snapshot = self.freeze()
+        sourceIds = self._vertexIds([source for source, _ in queries]).tolist()
+        targetIds = self._vertexIds([target for _, target in queries]).tolist()
+
+        # groups holds the query indexes of each source in the order they were asked
+        groups = {}
+        for queryIndex, sourceId in enumerate(sourceIds):
+            groups.setdefault(sourceId, []).append(queryIndex)
+        tasks = [(sourceId, [targetIds[queryIndex] for queryIndex in queryIndexes]) for sourceId, queryIndexes in groups.items()]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(tasks))
+        if workers <= 1:
+            results = [snapshot.pathsTo(sourceId, groupTargets) for sourceId, groupTargets in tasks]
+        else:
+            directory = tempfile.mkdtemp()
+            filename = os.path.join(directory, "snapshot.bin")
+            try:
+                snapshot.save(filename)
+                with ProcessPoolExecutor(max_workers=workers, initializer=_initRouteWorker, initargs=(filename,)) as executor:
+                    results = list(executor.map(_routeGroup, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+            finally:
+                os.remove(filename)
+                os.rmdir(directory)
+
+        routes = [None] * len(queries)
+        for queryIndexes, groupResults in zip(groups.values(), results):
+            for queryIndex, (distance, pathIds, settled) in zip(queryIndexes, groupResults):
+                routes[queryIndex] = DSARoute(snapshot, distance, pathIds, settled)
+        return routes
+
+    # helper method that turns a list of labels into a numpy array of their vertex ids in the current snapshot
+    # it raises an exception if a label is not in the graph, freeze must be called first
+    def _vertexIds(self, labels):
+        vertexIds = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            vertex = self.getVertex(label)
+            if vertex is None:
+                raise Exception(f"Vertex {label} not found")
+            vertexIds[i] = vertex.vertexId
+        return vertexIds
+
+    # this function finds the shortest path between two vertices using A* search
+    # the heuristic is a function heuristic(value, targetValue) that takes the values of a vertex and the target and returns a lower bound on the travel time between them
+    # euclideanHeuristic and haversineHeuristic make heuristics from coordinates stored as the vertex values
+    # the heuristic must never overestimate and must be consistent (as straight line distance is) or the route found may not be the shortest
+    # without a heuristic the search is the same as the early exit shortestPath
+    # as with shortestPath a target in a different component to the source is given back as unreachable without searching
+    # it returns a DSARoute object holding the travel time, the path and the number of settled vertices
+    def aStar(self, source, target, heuristic=None):
+        sourceVertex = self.getVertex(source)
+        targetVertex = self.getVertex(target)
+        if sourceVertex is None or targetVertex is None:
+            raise Exception("One or both vertices not found")
+        snapshot = self.freeze()
+        if not self.isConnected(source, target):
+            return DSARoute(snapshot, float('inf'), [], 0)
+        if heuristic is None:
+            distance, pathIds, settled = snapshot.pointToPoint(sourceVertex.vertexId, targetVertex.vertexId)
+        else:
+            distance, pathIds, settled = snapshot.aStar(sourceVertex.vertexId, targetVertex.vertexId, heuristic)
+        return DSARoute(snapshot, distance, pathIds, settled)
 
+    # this function prints the shortest path from a given vertex to every other vertex in the graph
+    # it is shortestPaths with the result printed, the DSAShortestPaths result is also returned
     def dijkstra(self, startLabel):
         '''
 
@@ -356,78 +895,21 @@ class DSAGraph:
             https://www.geeksforgeeks.org/introduction-to-dijkstras-shortest-path-algorithm/
 
         '''
-        if self.getVertex(startLabel) is None:
-            raise Exception("Start vertex not found")
-        else:
-            for each in self.vertex:
-                each.distance = float('inf')
-                each.previous = None # by setting the previous vertex to None it allows us avpid cycles in path
-                each.setVisited(False) # clears visited status of all vertices incase BFS or DFS is run before Dijkstra's algorithm
-
-            startVertex = self.getVertex(startLabel) 
-            startVertex.distance = 0 # distance from start vertex to itself is 0
-
-            heap = DijkstraHeap()
-            heap.add(0, startVertex) # we add the start vertex to the heap with distance of 0
-
-            
-            while heap.isEmpty() == False: 
-
-                entry = heap.remove() # removes the vertex with the smallest distance from the heap
-                currentVertex = entry.getValue() # gets the vertex from the entry
-                
-                # if the vertex has been visited we skip it or else we mark it as visited
-                # this is to avoid cycles and infinite loops
-                if currentVertex.getVisited() == True:
-                    continue
-
-                currentVertex.setVisited(True) 
-
-                # iterate throug the edges of the current vertex
-                # for each edge we get the to vertex and check if it has been visited
-                # if it has been visited we skip it
-                # if it has not been visited we calculate the new distance from the current vertex to the to vertex
-                # if the new distance is less than the current distance of the to vertex we update the distance and previous vertex
-                # and add the to vertex to the heap with the new distance
-                for each in currentVertex.getEdges():
-                    n = each.getToVertex()
-                    if n.getVisited():
-                        continue
-
-                    newDistance = currentVertex.distance + each.getWeight()
-                    if newDistance < n.distance:
-                        n.distance = newDistance
-                        n.previous = currentVertex
-                        heap.add(newDistance, n)
-                    
-            print("========================================\nDijkstra's Algorithm Result (Shortest Path)\n========================================")
-        
-            # this prints the shortest path from the start vertex to each vertex in the graph
-            for each in self.vertex:
-                if each.distance == float('inf'):
-                    print(f"Hub/Intersection {each.getLabel()} is unreachable from {startLabel}")
-                else:
-                    pathList = DSALinkedList()
-                    temp = each
-                    while temp is not None:
-                        pathList.insertFirst(temp.getLabel())
-                        temp = temp.previous
-                if each.distance > 0 and each.distance != float('inf'):
-                    print(f"Shortest path from {startLabel} to {each.getLabel()} is of time {each.distance} minutes, with path: ", end="")
-                    count = 0
-                    while not pathList.isEmpty():
-                        v = pathList.removeFirst()
-                        if count > 0:
-                            print(",", end="")
-                        print(v, end="")
-                        count += 1
-                    print()
-            print("========================================")
+        result = self.shortestPaths(startLabel)
+        result.display()
+        return result
 
     # this function clears the graph by removing all vertices, edges and restting the visited status of all vertices
     # it also resets the distance and previous vertex of all vertices to their initial values
+    # the vertex index is replaced with a new empty hash table
     def clearGraph(self):
         self.vertex = DSALinkedList()
+        self.vertexIndex = DSAHashTable(7)
+        self.components = DSAUnionFind()
+        self.componentsStale = False
+        self._graphChanged()
+        self.snapshotVertices = None
+        self.retainedTrees = DSAHashTable(7)
         for vertex in self.vertex:
             vertex.clearVisited()
             vertex.distance = float('inf')
@@ -435,30 +917,132 @@ class DSAGraph:
             vertex.setVisited(False)
         print("Graph cleared successfully.")
     
+# the first bytes of a file written by DSAGraphSnapshot.save, followed by the rest of the header
+_SNAPSHOT_MAGIC = b"DSAGRAPH"
+_SNAPSHOT_FORMAT_VERSION = 2 # version 2 added the travel time profile sections and the directed flag, version 1 files are still read
+_SNAPSHOT_HEADER_SIZE = 128
+
+# distances are stored as floats in the snapshot so they can hold infinity for unreachable vertices
+# whole number distances are given back as ints so that travel times print the same way as the edge weights they were added with
+def _travelTime(value):
+    value = float(value)
+    if value != float('inf') and value.is_integer():
+        return int(value)
+    return value
+
+# packs the travel time profiles of the arcs of a snapshot (None for an arc without one) into the three profile arrays of DSAGraphSnapshot
+# if no arc has a profile it returns three Nones so the snapshot of a graph without profiles carries nothing extra
+def _packProfiles(profiles):
+    counts = [0 if profile is None else len(profile.times) for profile in profiles]
+    if not any(counts):
+        return None, None, None
+    profilePtr = np.zeros(len(profiles) + 1, dtype=np.int64)
+    np.cumsum(counts, out=profilePtr[1:])
+    present = [profile for profile in profiles if profile is not None]
+    return profilePtr, np.concatenate([profile.times for profile in present]), np.concatenate([profile.travelTimes for profile in present])
+
+# works out which arcs of a directed graph are one way, an arc is one way unless the arc back the other way is also in the graph
+# sources and targets are the ends of each arc as vertex ids, it returns a boolean numpy array in the same order
+def _oneWayArcs(sources, targets, vertexCount):
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    return ~np.isin(targets * vertexCount + sources, sources * vertexCount + targets)
+
+# reads an edge list CSV for DSAGraph.fromEdgeList a line at a time
+# a line holding only a label is returned as a self loop on that label, which fromEdgeList drops after giving the label an id
+# returns the from labels, to labels and weights as numpy arrays
+def _readEdgeList(filename):
+    fromLabels = []
+    toLabels = []
+    weights = []
+    with open(filename, 'r') as file:
+        for lineNumber, line in enumerate(file, 1):
+            parts = line.strip().split(',')
+            if parts == ['']:
+                continue
+            if len(parts) == 1:
+                parts = [parts[0], parts[0], 0]
+            elif len(parts) == 2:
+                parts.append(1)
+            elif len(parts) != 3:
+                raise Exception(f"Line {lineNumber} of {filename} is not from,to,weight")
+            try:
+                weight = float(parts[2])
+            except ValueError:
+                if lineNumber == 1:
+                    continue
+                raise Exception(f"Line {lineNumber} of {filename} has a travel time that is not a number")
+            fromLabels.append(parts[0])
+            toLabels.append(parts[1])
+            weights.append(weight)
+    return np.array(fromLabels), np.array(toLabels), np.array(weights, dtype=np.float64)
+
+# the snapshot a routeBatch worker process answers its groups of queries from, it is memory mapped once when the process starts
+_routeWorkerSnapshot = None
+
+# initializer of the routeBatch worker processes, loads the snapshot saved by routeBatch
+def _initRouteWorker(filename):
+    global _routeWorkerSnapshot
+    _routeWorkerSnapshot = DSAGraphSnapshot.load(filename)
+
+# answers one routeBatch group of (source id, target ids) in a worker process
+def _routeGroup(task):
+    sourceId, targetIds = task
+    return _routeWorkerSnapshot.pathsTo(sourceId, targetIds)
+
+# helper generator for DSAGraph.traverseBFS/traverseDFS that turns the (vertex id, depth, parent id) tuples of a snapshot traversal into labels
+# and ends the traversal after the first tuple that stop returns True for
+def _labelledTraversal(snapshot, traversal, stop):
+    for vertexId, depth, parentId in traversal:
+        label = snapshot.getLabel(vertexId)
+        parent = None if parentId == -1 else snapshot.getLabel(parentId)
+        yield label, depth, parent
+        if stop is not None and stop(label, depth, parent):
+            return
+
+# follows a dict of previous vertex ids back from vertexId to the start of a search (previous of -1)
+# returns the path as a list of vertex ids from the start of the search to vertexId
+def _tracePath(previous, vertexId):
+    path = []
+    while vertexId != -1:
+        path.append(vertexId)
+        vertexId = previous[vertexId]
+    path.reverse()
+    return path
+
+# this function makes an A* heuristic for vertices whose values are (x, y) coordinates
+# the straight line distance is divided by speed (distance units per minute) to give a travel time
+# speed must be at least the fastest speed on any road or the heuristic can overestimate
+def euclideanHeuristic(speed=1.0):
+    def heuristic(value, targetValue):
+        return math.hypot(value[0] - targetValue[0], value[1] - targetValue[1]) / speed
+    return heuristic
+
+# this function makes an A* heuristic for vertices whose values are (latitude, longitude) coordinates in degrees
+# the great circle distance in km from the haversine formula is divided by speed (km per minute) to give a travel time
+# speed must be at least the fastest speed on any road or the heuristic can overestimate
+def haversineHeuristic(speed=1.0, earthRadius=6371.0):
+    def heuristic(value, targetValue):
+        lat1 = math.radians(value[0])
+        lat2 = math.radians(targetValue[0])
+        dLat = lat2 - lat1
+        dLon = math.radians(targetValue[1] - value[1])
+        a = math.sin(dLat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dLon / 2) ** 2
+        return 2 * earthRadius * math.asin(min(1.0, math.sqrt(a))) / speed
+    return heuristic
+
 # this function sorts the adjacent list of edges for a vertex in alphabetical order based on the label of the to vertex
-# it uses a temporary linked list to store the edges in sorted order
+# the edges are sorted with python's sort (O(d log d)) and copied into a new linked list, edges with the same label keep their order
+# vertices keep a cached sorted copy of their own edges (see DSAGraphVertex.getSortedEdges) so this is only needed for other edge lists
 def sortAdjacentList(adjList):
     sortedList = DSALinkedList()
-
-    for current in adjList:
-        inserted = False
-        tempList = DSALinkedList()
-
-        while not sortedList.isEmpty():
-            v = sortedList.removeFirst()
-            if not inserted and current.getToVertex().getLabel() < v.getToVertex().getLabel():
-                tempList.insertLast(current)
-                inserted = True
-            tempList.insertLast(v)
-
-        if not inserted:
-            tempList.insertLast(current)
-
-        while not tempList.isEmpty():
-            sortedList.insertLast(tempList.removeFirst())
-
+    sortedList.extend(sorted(adjList, key=_neighbourLabel))
     return sortedList
 
+# the key edges are sorted by, the label of the vertex the edge goes to
+def _neighbourLabel(edge):
+    return edge.getToVertex().getLabel()
+
 
 class DSAGraphVertex:
     def __init__(self, label, value=None):
@@ -468,6 +1052,9 @@ class DSAGraphVertex:
         self.visited = False
         self.distance = float('inf')
         self.previous = None
+        self.vertexId = None # the id of the vertex in the graph's most recent snapshot
+        self.componentId = None # the element of the vertex in the graph's component union-find
+        self.sortedEdges = None # cached list of the edges sorted by neighbour label, None when the edges have changed since it was made
     
     def getLabel(self):
         return self.label
@@ -489,15 +1076,47 @@ class DSAGraphVertex:
 
     def addEdge(self, edge):
         self.edges.insertLast(edge)
+        self.sortedEdges = None
+
+    # adds a list of edges to the end of the edge list in one go
+    def addEdges(self, edges):
+        self.edges.extend(edges)
+        self.sortedEdges = None
+
+    # removes edges from the edges list that go to the vertex with the target label
+    # it iterates through the edgelist and keeps the edges that do not match the target label
+    # the sorted view is only thrown away if an edge was removed
+    def removeEdge(self, targetLabel):
+        temp = DSALinkedList()
+        removed = False
+        while not self.edges.isEmpty():
+            edge = self.edges.removeFirst()
+            if edge.getToVertex().getLabel() != targetLabel:
+                temp.insertLast(edge)
+            else:
+                removed = True
+        while not temp.isEmpty():
+            self.edges.insertLast(temp.removeFirst())
+        if removed:
+            self.sortedEdges = None
+
+    # returns the edges sorted by the label of the vertex they go to, as a python list that must not be changed
+    # the sorted list is made once (O(d log d)) and kept until an edge is added or removed, so traversals and freeze can use it directly
+    def getSortedEdges(self):
+        if self.sortedEdges is None:
+            self.sortedEdges = sorted(self.edges, key=_neighbourLabel)
+        return self.sortedEdges
 
     def toString(self):
         return f"Label: {self.label}, Value: {self.value}"
 
 class DSAGraphEdge:
-    def __init__(self, fromVertex, toVertex, weight=1):
+    def __init__(self, fromVertex, toVertex, weight=1, profile=None, oneWay=False):
         self.fromVertex = fromVertex
         self.toVertex = toVertex
         self.weight = weight
+        self.profile = profile
+        self.oneWay = oneWay # True for a one way street of a directed graph, which has no edge back the other way
 
     def getFromVertex(self):
         return self.fromVertex
@@ -511,7 +1130,1284 @@ class DSAGraphEdge:
     def setWeight(self, weight):
         self.weight = weight
 
+    def isOneWay(self):
+        return self.oneWay
+
+    # the travel time profile of the edge (a DSATravelTimeProfile), None if the travel time does not change with the time of day
+    def getProfile(self):
+        return self.profile
+
+    def setProfile(self, profile):
+        self.profile = profile
+
+    # gets the travel time of the edge when it is entered at the given time, the static weight if it has no profile
+    def getWeightAt(self, time):
+        if self.profile is None:
+            return self.weight
+        return self.profile.evaluate(time)
+
     def toString(self):
         return f"From: {self.fromVertex.getLabel()}, To: {self.toVertex.getLabel()}, Weight: {self.weight}"
 
 
+# this class is a piecewise linear travel time profile of an edge, e.g. the travel time of a road through the day
+# times are the breakpoints in increasing order and travelTimes[i] is the travel time of the edge when it is entered at times[i]
+# between two breakpoints the travel time is interpolated linearly, before the first and after the last breakpoint it stays at the first/last travel time
+# both are kept as float64 numpy arrays so a snapshot can concatenate the profiles of all of its edges into two arrays
+# the travel time may not fall faster than time passes (a slope below -1), otherwise leaving later could mean arriving earlier
+# and time dependent Dijkstra's algorithm would no longer find the fastest route, so such a profile raises an exception
+class DSATravelTimeProfile:
+    def __init__(self, times, travelTimes):
+        self.times = np.array(times, dtype=np.float64).reshape(-1)
+        self.travelTimes = np.array(travelTimes, dtype=np.float64).reshape(-1)
+        if len(self.times) == 0 or len(self.times) != len(self.travelTimes):
+            raise Exception("A travel time profile needs the same number of times and travel times, at least one of each")
+        if not (np.all(np.isfinite(self.times)) and np.all(np.isfinite(self.travelTimes))):
+            raise Exception("Travel time profile times and travel times must be finite")
+        if np.any(self.travelTimes < 0):
+            raise Exception("Travel times cannot be negative")
+        gaps = np.diff(self.times)
+        if np.any(gaps <= 0):
+            raise Exception("Travel time profile times must be in increasing order")
+        if np.any(np.diff(self.travelTimes) < -gaps):
+            raise Exception("Travel time profile falls faster than time passes, leaving later would arrive earlier")
+        self.times.flags.writeable = False
+        self.travelTimes.flags.writeable = False
+
+    def getTimes(self):
+        return self.times
+
+    def getTravelTimes(self):
+        return self.travelTimes
+
+    # gets the travel time when the edge is entered at time, time may also be a numpy array of times
+    def evaluate(self, time):
+        travelTime = np.interp(time, self.times, self.travelTimes)
+        if np.ndim(travelTime) == 0:
+            return float(travelTime)
+        return travelTime
+
+
+# this class is an immutable compressed sparse row (CSR) snapshot of a DSAGraph, it is built by DSAGraph.freeze
+# vertices are numbered with integer ids from 0 to V-1 and labels[i] is the label of vertex i
+# the edges leaving vertex i are indices[indptr[i]:indptr[i + 1]] with the matching travel times in weights[indptr[i]:indptr[i + 1]]
+# values[i] is the value of vertex i (e.g. its coordinates), it is only read by A* heuristics
+# arcs can also have a travel time profile for time dependent routing, the profiles of all arcs are packed into three arrays:
+# the breakpoints of arc k are profileTimes[profilePtr[k]:profilePtr[k + 1]] with the matching travel times in profileTravelTimes, an empty range means the arc keeps its static weight
+# the profile arrays are None if no arc has a profile
+# an undirected snapshot holds every edge as an arc each way, a directed one (directed is True) holds the one way edges as a single arc
+# backward searches of a directed snapshot follow the arcs into each vertex, which are kept as reverse CSR arrays (see reverseAdjacencyLists)
+# the numpy arrays are made read only as the snapshot may be shared, a graph that is edited builds a new snapshot instead
+# the searches only index plain integer/float sequences in their inner loops and never touch the vertex, edge or linked list objects of the graph
+class DSAGraphSnapshot:
+    def __init__(self, labels, indptr, indices, weights, values=None, profilePtr=None, profileTimes=None, profileTravelTimes=None, directed=False):
+        self.labels = labels
+        self.directed = bool(directed)
+        self.values = values if values is not None else np.empty(len(labels), dtype=object)
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.profilePtr = profilePtr
+        self.profileTimes = profileTimes
+        self.profileTravelTimes = profileTravelTimes
+        for array in (self.indptr, self.indices, self.weights, self.profilePtr, self.profileTimes, self.profileTravelTimes):
+            if array is not None:
+                array.flags.writeable = False
+        self.vertexCount = len(labels)
+        self.edgeCount = len(indices)
+        self.labelIndex = None
+        self.adjacency = None
+        self.reverse = None # the reverse CSR arrays of a directed snapshot, made the first time a backward search needs them
+        self.reverseAdjacency = None
+        self.undirectedView = None
+        self.cuts = None # the articulation points and bridges, found the first time they are asked for
+        self.profiles = None # the profile arrays as python lists, made the first time _travelTimeAt needs them
+        self.pieces = None # the profile pieces of the last time dependent search and the times they are valid between, see _profilePieces
+
+    def getLabel(self, vertexId):
+        return self.labels[vertexId]
+
+    # gets the id of a vertex by label
+    # the label index is only built the first time a label is looked up, DSAGraph itself does not need it as each vertex keeps its id from the last freeze
+    # as the snapshot never changes the index is built in one go as a python dict instead of a DSAHashTable, which would cost a put per vertex every time the graph is frozen
+    # labels are keyed by their string form the same way as the graph's vertex index
+    def getId(self, label):
+        if self.labelIndex is None:
+            self.labelIndex = dict(zip((str(label) for label in self.labels), range(self.vertexCount)))
+        vertexId = self.labelIndex.get(str(label))
+        if vertexId is None:
+            raise Exception("Vertex not found")
+        return vertexId
+
+    # returns a new snapshot with the weight of each (fromId, toId) arc in arcs set to weight
+    # the vertices and edges are the same so the labels, values, indptr and indices arrays (and their python lists) are shared with this snapshot
+    # only the weights are copied, this snapshot is left unchanged
+    def withWeights(self, arcs, weight):
+        weights = self.weights.copy()
+        weightList = list(self.adjacency[2]) if self.adjacency is not None else None
+        for fromId, toId in arcs:
+            for k in range(self.indptr[fromId], self.indptr[fromId + 1]):
+                if self.indices[k] == toId:
+                    weights[k] = weight
+                    if weightList is not None:
+                        weightList[k] = float(weight)
+        snapshot = DSAGraphSnapshot(self.labels, self.indptr, self.indices, weights, self.values, self.profilePtr, self.profileTimes, self.profileTravelTimes, self.directed)
+        snapshot.labelIndex = self.labelIndex
+        snapshot.profiles = self.profiles
+        snapshot.reverse = self.reverse
+        snapshot.cuts = self.cuts
+        if weightList is not None:
+            snapshot.adjacency = (self.adjacency[0], self.adjacency[1], weightList)
+        return snapshot
+
+    # saves the snapshot to filename in a binary format that load memory maps
+    # the file starts with a 128 byte header: the magic bytes DSAGRAPH then little endian int64s holding the format version,
+    # the vertex count, the edge (arc) count, the label width in characters, whether coordinates are stored and the byte offset of each section
+    # the sections are the label string table (fixed width UTF-32 strings, labels are saved as strings), the indptr, indices and weights arrays
+    # and, if every vertex value is an (x, y) pair of numbers, a V x 2 array of coordinates so A* heuristics still work after loading
+    # if any arc has a travel time profile the header also holds the number of profile breakpoints and the offsets of the three profile arrays, which follow
+    # the last header value says whether the snapshot is directed
+    # each section starts on an 8 byte boundary so it can be mapped straight into a numpy array
+    def save(self, filename):
+        labels = np.array([str(label) for label in self.labels], dtype=str)
+        labels = labels.astype('<U%d' % (labels.dtype.itemsize // 4))
+        coordinates = None
+        try:
+            if self.vertexCount > 0 and all(len(value) == 2 for value in self.values):
+                coordinates = np.array([(float(value[0]), float(value[1])) for value in self.values], dtype='<f8')
+        except (TypeError, ValueError):
+            coordinates = None
+
+        sections = [labels, np.ascontiguousarray(self.indptr, dtype='<i8'), np.ascontiguousarray(self.indices, dtype='<i8'),
+                    np.ascontiguousarray(self.weights, dtype='<f8'), coordinates]
+        if self.profilePtr is not None:
+            sections += [np.ascontiguousarray(self.profilePtr, dtype='<i8'), np.ascontiguousarray(self.profileTimes, dtype='<f8'),
+                         np.ascontiguousarray(self.profileTravelTimes, dtype='<f8')]
+        offsets = []
+        offset = _SNAPSHOT_HEADER_SIZE
+        for array in sections:
+            if array is None:
+                offsets.append(0)
+            else:
+                offsets.append(offset)
+                offset += -(-array.nbytes // 8) * 8
+        sections = [array for array in sections if array is not None]
+
+        header = np.zeros(15, dtype='<i8')
+        header[:5] = (_SNAPSHOT_FORMAT_VERSION, self.vertexCount, self.edgeCount, labels.dtype.itemsize // 4, coordinates is not None)
+        header[5:10] = offsets[:5]
+        if self.profilePtr is not None:
+            header[10:14] = (len(self.profileTimes), offsets[5], offsets[6], offsets[7])
+        header[14] = self.directed
+        with open(filename, 'wb') as file:
+            file.write(_SNAPSHOT_MAGIC)
+            file.write(header.tobytes())
+            for array in sections:
+                data = array.tobytes()
+                file.write(data)
+                file.write(bytes(-len(data) % 8))
+
+    # loads a snapshot saved by save with every section memory mapped read only
+    # nothing is copied or decoded, so loading takes about the same time whatever the size of the graph and
+    # processes that load the same file share one copy of it in the operating system's page cache
+    # if coordinates were saved the values of the snapshot are the V x 2 coordinates array, otherwise they are all None
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as file:
+            magic = file.read(len(_SNAPSHOT_MAGIC))
+            header = np.frombuffer(file.read(15 * 8), dtype='<i8')
+        if magic != _SNAPSHOT_MAGIC or len(header) != 15:
+            raise Exception(f"{filename} is not a saved graph")
+        if not 1 <= header[0] <= _SNAPSHOT_FORMAT_VERSION:
+            raise Exception(f"{filename} was saved in graph format version {header[0]} which is not supported")
+        vertexCount, edgeCount, labelWidth, hasCoordinates = (int(value) for value in header[1:5])
+        labelsOffset, indptrOffset, indicesOffset, weightsOffset, coordinatesOffset = (int(value) for value in header[5:10])
+        profileCount, profilePtrOffset, profileTimesOffset, profileTravelTimesOffset = (int(value) for value in header[10:14])
+        directed = bool(header[14])
+
+        def section(dtype, offset, shape):
+            if np.prod(shape) == 0:
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+        labels = section('<U%d' % labelWidth, labelsOffset, (vertexCount,))
+        values = section('<f8', coordinatesOffset, (vertexCount, 2)) if hasCoordinates else None
+        profiles = (None, None, None)
+        if profilePtrOffset:
+            profiles = (section('<i8', profilePtrOffset, (edgeCount + 1,)), section('<f8', profileTimesOffset, (profileCount,)),
+                        section('<f8', profileTravelTimesOffset, (profileCount,)))
+        return cls(labels, section('<i8', indptrOffset, (vertexCount + 1,)), section('<i8', indicesOffset, (edgeCount,)),
+                   section('<f8', weightsOffset, (edgeCount,)), values, *profiles, directed=directed)
+
+    # returns the CSR arrays as python lists for the searches that have to step through the graph one vertex at a time
+    # indexing a numpy array one element at a time creates a new numpy scalar on every access, the lists are made once per snapshot
+    def adjacencyLists(self):
+        if self.adjacency is None:
+            self.adjacency = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self.adjacency
+
+    # this function returns the adjacency matrix of the snapshot, the travel time of the arc from vertex i to vertex j is at row i column j
+    # if sparse is False it is a dense V x V numpy array with 0 where there is no arc, which takes 8 V^2 bytes so it is only for small graphs
+    # otherwise only the arcs are returned, with format "csr" as (indptr, indices, weights) arrays where the arcs of row i are at indptr[i]:indptr[i + 1]
+    # or with format "coo" as (rows, columns, weights) arrays with one entry per arc, the columns of each row are in increasing order in both
+    # the snapshot is already stored row by row so the rows are not moved, only the arcs inside each row are put in column order
+    # the arrays are new copies that can be changed freely
+    def toAdjacencyMatrix(self, sparse=True, format="csr"):
+        if format not in ("csr", "coo"):
+            raise Exception("Adjacency matrix format must be csr or coo")
+        rows = np.repeat(np.arange(self.vertexCount, dtype=np.int64), np.diff(self.indptr))
+        if not sparse:
+            matrix = np.zeros((self.vertexCount, self.vertexCount), dtype=np.float64)
+            matrix[rows, self.indices] = self.weights
+            return matrix
+        order = np.lexsort((self.indices, rows))
+        if format == "coo":
+            return rows, self.indices[order], self.weights[order]
+        return np.array(self.indptr, dtype=np.int64), self.indices[order], self.weights[order]
+
+    # returns the arcs coming into each vertex as python lists (indptr, sources, weights) for backward searches
+    # the arcs into vertex i come from sources[indptr[i]:indptr[i + 1]] with the matching travel times in weights
+    # an undirected snapshot has every arc both ways so the arcs into a vertex are the same as the arcs out of it and adjacencyLists is returned
+    # a directed snapshot keeps the reverse CSR as numpy arrays of the in arc offsets, the source of each in arc and its position in indices/weights (reverseArcs)
+    # the travel times are looked up through reverseArcs rather than stored twice, and the arrays are shared by withWeights as the arcs do not change
+    def reverseAdjacencyLists(self):
+        if not self.directed:
+            return self.adjacencyLists()
+        if self.reverseAdjacency is None:
+            if self.reverse is None:
+                # 32 bit ints are used when the graph is small enough, which halves the size of the reverse arrays
+                dtype = np.int32 if self.edgeCount < 2 ** 31 else np.int64
+                reverseArcs = np.argsort(self.indices, kind='stable').astype(dtype)
+                reverseIndptr = np.zeros(self.vertexCount + 1, dtype=dtype)
+                np.cumsum(np.bincount(self.indices, minlength=self.vertexCount), out=reverseIndptr[1:])
+                sources = np.repeat(np.arange(self.vertexCount, dtype=dtype), np.diff(self.indptr))[reverseArcs]
+                for array in (reverseIndptr, sources, reverseArcs):
+                    array.flags.writeable = False
+                self.reverse = (reverseIndptr, sources, reverseArcs)
+            reverseIndptr, sources, reverseArcs = self.reverse
+            self.reverseAdjacency = (reverseIndptr.tolist(), sources.tolist(), self.weights[reverseArcs].tolist())
+        return self.reverseAdjacency
+
+    # returns an undirected snapshot of the street layout of a directed snapshot, every pair of vertices joined by an arc either way is joined both ways
+    # the travel time of a pair joined both ways is the shorter of the two, an undirected snapshot is returned as it is
+    # it is used for the questions about the layout of the streets rather than the way traffic can flow, such as hasCycle and cycleBasis
+    def getUndirectedView(self):
+        if not self.directed:
+            return self
+        if self.undirectedView is None:
+            sources = np.repeat(np.arange(self.vertexCount, dtype=np.int64), np.diff(self.indptr))
+            allSources = np.concatenate((sources, self.indices))
+            allTargets = np.concatenate((self.indices, sources))
+            allWeights = np.concatenate((self.weights, self.weights))
+            order = np.lexsort((allWeights, allTargets, allSources))
+            keys = allSources[order] * self.vertexCount + allTargets[order]
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = keys[1:] != keys[:-1]
+            order = order[first]
+            indptr = np.zeros(self.vertexCount + 1, dtype=np.int64)
+            np.cumsum(np.bincount(allSources[order], minlength=self.vertexCount), out=indptr[1:])
+            self.undirectedView = DSAGraphSnapshot(self.labels, indptr, allTargets[order], allWeights[order], self.values)
+            self.undirectedView.labelIndex = self.labelIndex
+        return self.undirectedView
+
+    # helper method that gathers every edge leaving a set of vertices (the frontier) with numpy
+    # it returns the neighbours and the frontier vertex each one was reached from, in frontier order and then edge order
+    def _expand(self, frontier):
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        edgeIdx = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        return self.indices[edgeIdx], np.repeat(frontier, counts)
+
+    # this function performs a breadth-first search from sourceId one whole level (frontier) at a time
+    # each level is expanded with numpy instead of a queue, a vertex found more than once on a level keeps its first parent
+    # which gives the same visit order as a queue based BFS
+    # it returns the visit order, the depth (hops) of each vertex and the parent of each vertex, -1 for vertices that were not reached
+    def bfs(self, sourceId):
+        depth = np.full(self.vertexCount, -1, dtype=np.int64)
+        parent = np.full(self.vertexCount, -1, dtype=np.int64)
+        depth[sourceId] = 0
+        frontier = np.array([sourceId], dtype=np.int64)
+        levels = [frontier]
+        level = 0
+        while frontier.size > 0:
+            neighbours, parents = self._expand(frontier)
+            fresh = depth[neighbours] == -1
+            neighbours = neighbours[fresh]
+            parents = parents[fresh]
+            first = np.unique(neighbours, return_index=True)[1]
+            first.sort()
+            frontier = neighbours[first]
+            level += 1
+            depth[frontier] = level
+            parent[frontier] = parents[first]
+            levels.append(frontier)
+        return np.concatenate(levels), depth, parent
+
+    # this function performs a depth-first search from sourceId
+    # the search path is kept as a stack of vertex ids with a matching stack of the next edge to check for each vertex
+    # so every edge is only checked once instead of rescanning the edges of a vertex each time it is back on top of the stack
+    # a cycle is recorded when a vertex on the path has an edge back to the source and the path has more than 2 vertices
+    # it returns the visit order, the parent of each vertex (-1 if not reached) and the list of cycles as lists of vertex ids
+    def dfs(self, sourceId):
+        indptr, indices, _ = self.adjacencyLists()
+        visited = bytearray(self.vertexCount)
+        parent = np.full(self.vertexCount, -1, dtype=np.int64)
+        order = [sourceId]
+        cycles = []
+        path = [sourceId]
+        nextEdge = [indptr[sourceId]]
+        visited[sourceId] = 1
+        while path:
+            v = path[-1]
+            k = nextEdge[-1]
+            end = indptr[v + 1]
+            foundUnvisited = False
+            while k < end:
+                u = indices[k]
+                k += 1
+                if u == sourceId and len(path) > 2:
+                    cycles.append(path + [sourceId])
+                if not visited[u]:
+                    visited[u] = 1
+                    parent[u] = v
+                    order.append(u)
+                    nextEdge[-1] = k
+                    path.append(u)
+                    nextEdge.append(indptr[u])
+                    foundUnvisited = True
+                    break
+            if not foundUnvisited:
+                path.pop()
+                nextEdge.pop()
+        return np.array(order, dtype=np.int64), parent, cycles
+
+    # this generator performs a breadth-first search from sourceId lazily, one level (frontier) at a time
+    # it yields a (vertex id, depth, parent id) tuple for each vertex as it is found, the parent of sourceId is -1
+    # vertices are found in the same order as bfs, vertices deeper than maxDepth are not searched for
+    # stop is an optional function stop(vertexId, depth, parentId), the search ends after the first vertex it returns True for
+    # only the current and next levels are held as lists, along with one byte per vertex to mark the vertices that have been found
+    def traverseBFS(self, sourceId, maxDepth=None, stop=None):
+        indptr, indices, _ = self.adjacencyLists()
+        seen = bytearray(self.vertexCount)
+        seen[sourceId] = 1
+        yield sourceId, 0, -1
+        if stop is not None and stop(sourceId, 0, -1):
+            return
+        frontier = [sourceId]
+        depth = 0
+        while frontier and (maxDepth is None or depth < maxDepth):
+            depth += 1
+            nextFrontier = []
+            for v in frontier:
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if not seen[u]:
+                        seen[u] = 1
+                        nextFrontier.append(u)
+                        yield u, depth, v
+                        if stop is not None and stop(u, depth, v):
+                            return
+            frontier = nextFrontier
+
+    # this generator performs a depth-first search from sourceId lazily
+    # it yields a (vertex id, depth, parent id) tuple for each vertex as it is found, the parent of sourceId is -1
+    # vertices are found in the same order as dfs, the depth is the length of the search path from sourceId
+    # the search does not go further than maxDepth edges down the path, so with maxDepth a vertex that was first found down a long path
+    # is not searched again from a shorter one and some vertices within maxDepth edges of sourceId may not be found (use traverseBFS for that)
+    # stop is an optional function stop(vertexId, depth, parentId), the search ends after the first vertex it returns True for
+    # only the search path is held, along with one byte per vertex to mark the vertices that have been found
+    def traverseDFS(self, sourceId, maxDepth=None, stop=None):
+        indptr, indices, _ = self.adjacencyLists()
+        seen = bytearray(self.vertexCount)
+        seen[sourceId] = 1
+        yield sourceId, 0, -1
+        if stop is not None and stop(sourceId, 0, -1):
+            return
+        path = [sourceId]
+        nextEdge = [indptr[sourceId]]
+        while path:
+            v = path[-1]
+            k = nextEdge[-1]
+            end = indptr[v + 1]
+            if maxDepth is not None and len(path) > maxDepth:
+                k = end
+            while k < end and seen[indices[k]]:
+                k += 1
+            if k < end:
+                u = indices[k]
+                nextEdge[-1] = k + 1
+                seen[u] = 1
+                depth = len(path)
+                yield u, depth, v
+                if stop is not None and stop(u, depth, v):
+                    return
+                path.append(u)
+                nextEdge.append(indptr[u])
+            else:
+                path.pop()
+                nextEdge.pop()
+
+    # this function builds a breadth-first spanning forest of the whole graph, one tree for each connected component
+    # it returns the parent of each vertex (-1 for the root of each tree), the depth of each vertex in its tree and the number of trees
+    def spanningForest(self):
+        indptr, indices, _ = self.adjacencyLists()
+        parent = [-1] * self.vertexCount
+        depth = [-1] * self.vertexCount
+        components = 0
+        for root in range(self.vertexCount):
+            if depth[root] != -1:
+                continue
+            components += 1
+            depth[root] = 0
+            queue = [root]
+            for v in queue:
+                nextDepth = depth[v] + 1
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if depth[u] == -1:
+                        depth[u] = nextDepth
+                        parent[u] = v
+                        queue.append(u)
+        return parent, depth, components
+
+    # this function tests whether the graph has any cycle in O(V + E)
+    # a breadth-first search of each component stops as soon as it meets an edge to an already found vertex that is not the parent of the current vertex
+    # as the graph is undirected with no duplicate edges every such edge closes a cycle
+    # a directed snapshot is tested on its street layout (see getUndirectedView), so a two way street on its own is not a cycle
+    def hasCycle(self):
+        if self.directed:
+            return self.getUndirectedView().hasCycle()
+        indptr, indices, _ = self.adjacencyLists()
+        parent = [-1] * self.vertexCount
+        seen = bytearray(self.vertexCount)
+        for root in range(self.vertexCount):
+            if seen[root]:
+                continue
+            seen[root] = 1
+            queue = [root]
+            for v in queue:
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if not seen[u]:
+                        seen[u] = 1
+                        parent[u] = v
+                        queue.append(u)
+                    elif u != parent[v]:
+                        return True
+        return False
+
+    # this function finds a fundamental cycle basis of the graph in O(V + E + total length of the cycles)
+    # every edge that is not in the breadth-first spanning forest closes exactly one cycle with the tree paths from its two ends up to their
+    # lowest common ancestor, and these E - V + (number of components) cycles together make up every cycle of the graph
+    # as the forest is breadth-first no cycle is longer than twice the depth of its tree plus one
+    # the work beyond O(V + E) is writing out the cycles themselves, which on a grid like road network averages about the width of the grid per cycle
+    # each cycle is returned as a list of vertex ids u, ..., ancestor, ..., v where the edge (v, u) closes the cycle
+    # the cycles of a directed snapshot are those of its street layout (see getUndirectedView) and may go against one way streets
+    def cycleBasis(self):
+        if self.directed:
+            return self.getUndirectedView().cycleBasis()
+        indptr, indices, _ = self.adjacencyLists()
+        parent, depth, _ = self.spanningForest()
+        cycles = []
+        for u in range(self.vertexCount):
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if u > v or parent[v] == u or parent[u] == v:
+                    continue
+                left = [u]
+                right = [v]
+                a = u
+                b = v
+                while depth[a] > depth[b]:
+                    a = parent[a]
+                    left.append(a)
+                while depth[b] > depth[a]:
+                    b = parent[b]
+                    right.append(b)
+                while a != b:
+                    a = parent[a]
+                    b = parent[b]
+                    left.append(a)
+                    right.append(b)
+                right.pop()
+                right.reverse()
+                cycles.append(left + right)
+        return cycles
+
+    # this function returns the articulation points of the graph as a numpy array of vertex ids in increasing order
+    # an articulation point is a vertex whose removal leaves its component in two or more pieces
+    def articulationPoints(self):
+        return self._cutIndex()[0]
+
+    # this function returns the bridges of the graph as an n x 2 numpy array of (u, v) vertex id pairs with u < v, sorted
+    # a bridge is an edge whose removal leaves its component in two pieces
+    def bridges(self):
+        return self._cutIndex()[1]
+
+    # helper method that finds the articulation points and bridges together with Tarjan's algorithm in O(V + E)
+    # a depth-first search numbers the vertices in the order it finds them (found) and low[v] is the smallest number reachable from the subtree of v
+    # using one edge that is not in the tree. A tree edge p -> v is a bridge if low[v] > found[p], and p is an articulation point if low[v] >= found[p]
+    # (a root is an articulation point only if it has more than one child). The search keeps an explicit stack and the next edge of each vertex
+    # instead of recursing, so long roads do not hit python's recursion limit
+    # a directed snapshot is searched on its street layout (see getUndirectedView) as closing a road cuts it both ways
+    # the result is kept as the snapshot never changes, snapshots made by withWeights share it
+    def _cutIndex(self):
+        if self.cuts is None:
+            if self.directed:
+                self.cuts = self.getUndirectedView()._cutIndex()
+                return self.cuts
+            indptr, indices, _ = self.adjacencyLists()
+            found = [-1] * self.vertexCount
+            low = [0] * self.vertexCount
+            parent = [-1] * self.vertexCount
+            nextEdge = indptr[:self.vertexCount]
+            isCut = bytearray(self.vertexCount)
+            bridges = []
+            counter = 0
+            for root in range(self.vertexCount):
+                if found[root] != -1:
+                    continue
+                found[root] = low[root] = counter
+                counter += 1
+                rootChildren = 0
+                stack = [root]
+                while stack:
+                    u = stack[-1]
+                    k = nextEdge[u]
+                    if k < indptr[u + 1]:
+                        nextEdge[u] = k + 1
+                        v = indices[k]
+                        if found[v] == -1:
+                            found[v] = low[v] = counter
+                            counter += 1
+                            parent[v] = u
+                            stack.append(v)
+                            if u == root:
+                                rootChildren += 1
+                        elif v != parent[u] and found[v] < low[u]:
+                            low[u] = found[v]
+                    else:
+                        stack.pop()
+                        p = parent[u]
+                        if p != -1:
+                            if low[u] < low[p]:
+                                low[p] = low[u]
+                            if low[u] > found[p]:
+                                bridges.append((min(p, u), max(p, u)))
+                            if low[u] >= found[p] and p != root:
+                                isCut[p] = 1
+                if rootChildren > 1:
+                    isCut[root] = 1
+            bridges.sort()
+            articulation = np.flatnonzero(np.frombuffer(bytes(isCut), dtype=np.uint8)).astype(np.int64)
+            bridgeArray = np.array(bridges, dtype=np.int64).reshape(-1, 2)
+            articulation.flags.writeable = False
+            bridgeArray.flags.writeable = False
+            self.cuts = (articulation, bridgeArray)
+        return self.cuts
+
+    # this function performs Dijkstra's algorithm from sourceId
+    # it uses an indexed min heap of vertex ids (DSAIndexedMinHeap from heaps.py), a shorter distance to a vertex already in the heap lowers its key in place
+    # so each vertex is in the heap at most once and the heap never holds more than V vertices
+    # a vertex whose heap position is -2 has been removed from the heap, which means it is settled
+    # it returns the distance to each vertex (inf if unreachable) and the previous vertex on its shortest path (-1 for the source and unreachable vertices)
+    def dijkstra(self, sourceId):
+        indptr, indices, weights = self.adjacencyLists()
+        distance = [float('inf')] * self.vertexCount
+        previous = [-1] * self.vertexCount
+        heap = DSAIndexedMinHeap(self.vertexCount)
+        position = heap.position
+        distance[sourceId] = 0.0
+        heap.add(sourceId, 0.0)
+        while heap.count > 0:
+            u, d = heap.remove()
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                state = position[v]
+                if state == -2:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance[v]:
+                    distance[v] = newDistance
+                    previous[v] = u
+                    if state == -1:
+                        heap.add(v, newDistance)
+                    else:
+                        heap.decreaseKey(v, newDistance)
+        return np.array(distance, dtype=np.float64), np.array(previous, dtype=np.int64)
+
+    # this function performs one breadth-first search from all of the vertices in sourceIds at once
+    # every source starts in the first frontier and each vertex is claimed by the source whose search reaches it first (the fewest hops)
+    # a vertex reached by more than one source in the same level goes to the source that comes first in the frontier, the same tie break as bfs
+    # each level is expanded with numpy (see _expand) so the whole graph is covered in one pass whatever the number of sources
+    # it returns the nearest source of each vertex as an index into sourceIds and the number of hops to it, both -1 for vertices no source reaches
+    def multiSourceBFS(self, sourceIds):
+        sourceIds = np.asarray(sourceIds, dtype=np.int64)
+        nearest = np.full(self.vertexCount, -1, dtype=np.int64)
+        hops = np.full(self.vertexCount, -1, dtype=np.int64)
+        first = np.unique(sourceIds, return_index=True)[1]
+        first.sort()
+        frontier = sourceIds[first]
+        nearest[frontier] = first
+        hops[frontier] = 0
+        level = 0
+        while frontier.size > 0:
+            neighbours, parents = self._expand(frontier)
+            fresh = hops[neighbours] == -1
+            neighbours = neighbours[fresh]
+            parents = parents[fresh]
+            first = np.unique(neighbours, return_index=True)[1]
+            first.sort()
+            frontier = neighbours[first]
+            level += 1
+            hops[frontier] = level
+            nearest[frontier] = nearest[parents[first]]
+        return nearest, hops
+
+    # this function performs one Dijkstra's algorithm from all of the vertices in sourceIds at once
+    # every source starts in the heap at distance 0 and each vertex is claimed by the source with the shortest travel time to it
+    # it is the same as Dijkstra's algorithm from a single extra vertex joined to every source by a 0 minute edge, so it costs one search
+    # it returns the nearest source of each vertex as an index into sourceIds (-1 if no source reaches it) and the travel time to it (inf if unreachable)
+    def multiSourceDijkstra(self, sourceIds):
+        indptr, indices, weights = self.adjacencyLists()
+        distance = [float('inf')] * self.vertexCount
+        nearest = [-1] * self.vertexCount
+        settled = bytearray(self.vertexCount)
+        heap = []
+        for index, sourceId in enumerate(np.asarray(sourceIds, dtype=np.int64).tolist()):
+            if nearest[sourceId] == -1:
+                distance[sourceId] = 0.0
+                nearest[sourceId] = index
+                heap.append((0.0, sourceId))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            source = nearest[u]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if settled[v]:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance[v]:
+                    distance[v] = newDistance
+                    nearest[v] = source
+                    heapq.heappush(heap, (newDistance, v))
+        return np.array(nearest, dtype=np.int64), np.array(distance, dtype=np.float64)
+
+    # this function repairs a shortest path tree (the distance and previous arrays of DSAShortestPaths) in place
+    # after the weight of the arc fromId -> toId has changed from oldWeight to the weight it has in this snapshot
+    # if the arc got cheaper and now gives toId a shorter path, toId is updated and the improvement is spread with Dijkstra's algorithm
+    # if the arc got dearer and it is in the tree, the subtree hanging from it is invalidated, each vertex in it takes its best path
+    # from a vertex outside the subtree and Dijkstra's algorithm is run inside the subtree only
+    # in any other case the tree is still correct
+    # the best path into each subtree vertex is found from the arcs into it (see reverseAdjacencyLists), which for an undirected graph are its own arcs
+    # it returns the number of vertices that were re-settled
+    def repairShortestPaths(self, distance, previous, fromId, toId, oldWeight):
+        indptr, indices, weights = self.adjacencyLists()
+        newWeight = None
+        for k in range(indptr[fromId], indptr[fromId + 1]):
+            if indices[k] == toId:
+                newWeight = weights[k]
+        if newWeight is None or newWeight == oldWeight:
+            return 0
+
+        if newWeight < oldWeight:
+            if distance[fromId] + newWeight >= distance[toId]:
+                return 0
+            distance[toId] = distance[fromId] + newWeight
+            previous[toId] = fromId
+            return self._settleFrom(distance, previous, [(distance[toId], toId)], None)
+
+        if previous[toId] != fromId:
+            return 0
+        subtree = {toId}
+        stack = [toId]
+        while stack:
+            z = stack.pop()
+            for k in range(indptr[z], indptr[z + 1]):
+                c = indices[k]
+                if previous[c] == z and c not in subtree:
+                    subtree.add(c)
+                    stack.append(c)
+        for z in subtree:
+            distance[z] = float('inf')
+            previous[z] = -1
+        heap = []
+        reverseIndptr, sources, reverseWeights = self.reverseAdjacencyLists()
+        for z in subtree:
+            for k in range(reverseIndptr[z], reverseIndptr[z + 1]):
+                p = sources[k]
+                if p not in subtree and distance[p] + reverseWeights[k] < distance[z]:
+                    distance[z] = distance[p] + reverseWeights[k]
+                    previous[z] = p
+            if distance[z] != float('inf'):
+                heap.append((distance[z], z))
+        heapq.heapify(heap)
+        return self._settleFrom(distance, previous, heap, subtree)
+
+    # helper method that runs Dijkstra's algorithm from the entries already on heap, updating distance and previous in place
+    # if region is given only vertices in region are relaxed, the distances of every other vertex are known to be correct
+    # it returns the number of settled vertices
+    def _settleFrom(self, distance, previous, heap, region):
+        indptr, indices, weights = self.adjacencyLists()
+        settled = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in settled or d > distance[u]:
+                continue
+            settled.add(u)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if region is not None and v not in region:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance[v]:
+                    distance[v] = newDistance
+                    previous[v] = u
+                    heapq.heappush(heap, (newDistance, v))
+        return len(settled)
+
+    # this function performs Dijkstra's algorithm from sourceId and stops as soon as every vertex in targetIds is settled
+    # it returns a numpy array of the distance to each target in the same order as targetIds (inf if unreachable)
+    def distancesTo(self, sourceId, targetIds):
+        distance, _, _ = self._searchTargets(sourceId, targetIds)
+        return np.array(distance, dtype=np.float64)[targetIds]
+
+    # this function finds the shortest path from sourceId to every vertex in targetIds with one Dijkstra's algorithm that stops once they are all settled
+    # it returns a list with a (distance, path as a list of vertex ids, settled vertices) tuple for each target in the same order as targetIds
+    # the distance is inf and the path is empty for unreachable targets, the settled count is the same for every target as they share the search
+    def pathsTo(self, sourceId, targetIds):
+        distance, previous, settledCount = self._searchTargets(sourceId, targetIds)
+        paths = []
+        for targetId in targetIds:
+            if distance[targetId] == float('inf'):
+                paths.append((float('inf'), [], settledCount))
+            else:
+                paths.append((distance[targetId], _tracePath(previous, targetId), settledCount))
+        return paths
+
+    # helper method for distancesTo and pathsTo that runs Dijkstra's algorithm from sourceId until every vertex in targetIds is settled
+    # it returns the distance and previous vertex lists and the number of settled vertices
+    def _searchTargets(self, sourceId, targetIds):
+        indptr, indices, weights = self.adjacencyLists()
+        distance = [float('inf')] * self.vertexCount
+        previous = [-1] * self.vertexCount
+        settled = bytearray(self.vertexCount)
+        isTarget = bytearray(self.vertexCount)
+        remaining = 0
+        settledCount = 0
+        for targetId in np.asarray(targetIds).tolist():
+            if not isTarget[targetId]:
+                isTarget[targetId] = 1
+                remaining += 1
+        distance[sourceId] = 0.0
+        heap = [(0.0, sourceId)]
+        while heap and remaining > 0:
+            d, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            settledCount += 1
+            if isTarget[u]:
+                remaining -= 1
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if settled[v]:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance[v]:
+                    distance[v] = newDistance
+                    previous[v] = u
+                    heapq.heappush(heap, (newDistance, v))
+        return distance, previous, settledCount
+
+    # this function performs Dijkstra's algorithm from sourceId until count of the vertices marked in isTarget (a bytearray indexed by vertex id) are settled
+    # count None settles every target the search can reach, if reverse is True the arcs are followed backwards so the distances are to sourceId
+    # the distances are kept in a dict so a search that stops early only costs the vertices it reaches
+    # it returns the settled targets in order of distance and their distances as two lists, sourceId is included if it is a target
+    def nearestTargets(self, sourceId, isTarget, count=None, reverse=False):
+        indptr, indices, weights = self.reverseAdjacencyLists() if reverse else self.adjacencyLists()
+        distance = {sourceId: 0.0}
+        settled = set()
+        targets = []
+        targetDistances = []
+        heap = [(0.0, sourceId)]
+        while heap and (count is None or len(targets) < count):
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if isTarget[u]:
+                targets.append(u)
+                targetDistances.append(d)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                newDistance = d + weights[k]
+                if newDistance < distance.get(v, float('inf')):
+                    distance[v] = newDistance
+                    heapq.heappush(heap, (newDistance, v))
+        return targets, targetDistances
+
+    # this function performs Dijkstra's algorithm from sourceId and stops as soon as targetId is settled
+    # the distances and previous vertices are kept in dicts so only the vertices the search reaches cost anything, not the whole graph
+    # it returns the distance to the target (inf if unreachable), the path as a list of vertex ids and the number of settled vertices
+    def pointToPoint(self, sourceId, targetId):
+        indptr, indices, weights = self.adjacencyLists()
+        distance = {sourceId: 0.0}
+        previous = {sourceId: -1}
+        settled = set()
+        heap = [(0.0, sourceId)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if u == targetId:
+                return d, _tracePath(previous, targetId), len(settled)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if v in settled:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance.get(v, float('inf')):
+                    distance[v] = newDistance
+                    previous[v] = u
+                    heapq.heappush(heap, (newDistance, v))
+        return float('inf'), [], len(settled)
+
+    # this function performs A* search from sourceId to targetId
+    # it is the same as pointToPoint except the heap is ordered by the distance so far plus the heuristic estimate of the distance left to the target
+    # so vertices in the direction of the target are settled first
+    # the heuristic is only called once for each vertex the search reaches, the estimates are kept in a dict
+    # it returns the distance to the target (inf if unreachable), the path as a list of vertex ids and the number of settled vertices
+    def aStar(self, sourceId, targetId, heuristic):
+        indptr, indices, weights = self.adjacencyLists()
+        values = self.values
+        targetValue = values[targetId]
+        estimate = {}
+        distance = {sourceId: 0.0}
+        previous = {sourceId: -1}
+        settled = set()
+        heap = [(heuristic(values[sourceId], targetValue), 0.0, sourceId)]
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if u == targetId:
+                return d, _tracePath(previous, targetId), len(settled)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if v in settled:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < distance.get(v, float('inf')):
+                    distance[v] = newDistance
+                    previous[v] = u
+                    remaining = estimate.get(v)
+                    if remaining is None:
+                        remaining = heuristic(values[v], targetValue)
+                        estimate[v] = remaining
+                    heapq.heappush(heap, (newDistance + remaining, newDistance, v))
+        return float('inf'), [], len(settled)
+
+    # this function performs a bidirectional Dijkstra's algorithm between sourceId and targetId
+    # a forward search from the source and a backward search from the target take turns, the one with the smaller heap goes next
+    # every edge that is scanned checks whether it joins the two searches and keeps the shortest joined path found so far (best)
+    # the searches stop once the smallest distances left in the two heaps add up to at least best, as no path found after that can be shorter
+    # the backward search follows the arcs into each vertex (see reverseAdjacencyLists), which are the same as the arcs out of it in an undirected graph
+    # it returns the distance to the target (inf if unreachable), the path as a list of vertex ids and the number of settled vertices in both searches
+    def bidirectionalPointToPoint(self, sourceId, targetId):
+        if sourceId == targetId:
+            return 0.0, [sourceId], 1
+        searches = (self.adjacencyLists(), self.reverseAdjacencyLists())
+        distance = ({sourceId: 0.0}, {targetId: 0.0})
+        previous = ({sourceId: -1}, {targetId: -1})
+        settled = (set(), set())
+        heaps = ([(0.0, sourceId)], [(0.0, targetId)])
+        best = float('inf')
+        meeting = -1
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            sideDistance = distance[side]
+            otherDistance = distance[1 - side]
+            indptr, indices, weights = searches[side]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if v in settled[side]:
+                    continue
+                newDistance = d + weights[k]
+                if newDistance < sideDistance.get(v, float('inf')):
+                    sideDistance[v] = newDistance
+                    previous[side][v] = u
+                    heapq.heappush(heaps[side], (newDistance, v))
+                if v in otherDistance and newDistance + otherDistance[v] < best:
+                    best = newDistance + otherDistance[v]
+                    meeting = v
+        settledCount = len(settled[0]) + len(settled[1])
+        if meeting == -1:
+            return float('inf'), [], settledCount
+        forwardPath = _tracePath(previous[0], meeting)
+        backwardPath = _tracePath(previous[1], meeting)
+        backwardPath.reverse()
+        return best, forwardPath + backwardPath[1:], settledCount
+
+    # this function gives the travel time of every arc when it is entered at time, as a numpy array in arc order
+    # arcs without a profile keep their static weight, the profiles are all evaluated at once with numpy (see _pieceArrays)
+    def travelTimesAt(self, time):
+        _, _, intercept, slope = self._pieceArrays(time)
+        return intercept + slope * time
+
+    # helper method that finds, for every arc at once, the straight piece of its travel time profile in use at time
+    # the travel time of arc k is intercept[k] + slope[k] * t for any t with start[k] <= t < end[k]
+    # for an arc without a profile the piece is its static weight from -inf to inf, before the first or after the last breakpoint it is a flat piece
+    # the number of breakpoints at or before time in each profile is found from one cumulative sum over all of the breakpoints, so there is no python loop over the arcs
+    def _pieceArrays(self, time):
+        start = np.full(self.edgeCount, -np.inf)
+        end = np.full(self.edgeCount, np.inf)
+        intercept = np.array(self.weights, dtype=np.float64)
+        slope = np.zeros(self.edgeCount)
+        if self.profilePtr is None:
+            return start, end, intercept, slope
+        counts = np.diff(self.profilePtr)
+        arcs = np.flatnonzero(counts)
+        first = self.profilePtr[arcs]
+        pointCounts = counts[arcs]
+        passed = np.zeros(len(self.profileTimes) + 1, dtype=np.int64)
+        np.cumsum(self.profileTimes <= time, out=passed[1:])
+        passedCounts = passed[first + pointCounts] - passed[first]
+        left = first + np.clip(passedCounts - 1, 0, pointCounts - 1)
+        right = first + np.clip(passedCounts, 0, pointCounts - 1)
+        leftTime = self.profileTimes[left]
+        rightTime = self.profileTimes[right]
+        leftTravelTime = self.profileTravelTimes[left]
+        inside = (passedCounts > 0) & (passedCounts < pointCounts)
+        pieceSlope = np.zeros(len(arcs))
+        pieceSlope[inside] = (self.profileTravelTimes[right[inside]] - leftTravelTime[inside]) / (rightTime[inside] - leftTime[inside])
+        slope[arcs] = pieceSlope
+        intercept[arcs] = leftTravelTime - pieceSlope * leftTime
+        start[arcs] = np.where(passedCounts > 0, leftTime, -np.inf)
+        end[arcs] = np.where(passedCounts < pointCounts, rightTime, np.inf)
+        return start, end, intercept, slope
+
+    # helper method that gives the profile pieces in use at time as python lists for the inner loop of _timeDependentSearch
+    # the pieces are kept with the times between which every one of them stays in use, so searches leaving in the same window of the day reuse them
+    # for a snapshot without profiles that window is the whole day and the pieces are only made once
+    def _profilePieces(self, time):
+        if self.pieces is None or not self.pieces[0] <= time < self.pieces[1]:
+            start, end, intercept, slope = self._pieceArrays(time)
+            windowStart = float(start.max()) if self.edgeCount > 0 else -np.inf
+            windowEnd = float(end.min()) if self.edgeCount > 0 else np.inf
+            self.pieces = (windowStart, windowEnd, (start.tolist(), end.tolist(), intercept.tolist(), slope.tolist()))
+        return self.pieces[2]
+
+    # helper method that gives the travel time of one arc entered at time, for arcs whose piece from _profilePieces has run out by the time the search reaches them
+    # the breakpoint is found with a binary search of the python list of breakpoints, which costs less than a numpy call for the few breakpoints of one profile
+    def _travelTimeAt(self, arc, time):
+        if self.profiles is None:
+            self.profiles = (self.profilePtr.tolist(), self.profileTimes.tolist(), self.profileTravelTimes.tolist())
+        profilePtr, times, travelTimes = self.profiles
+        first = profilePtr[arc]
+        last = profilePtr[arc + 1]
+        i = bisect.bisect_right(times, time, first, last)
+        if i == first:
+            return travelTimes[first]
+        if i == last:
+            return travelTimes[last - 1]
+        return travelTimes[i - 1] + (travelTimes[i] - travelTimes[i - 1]) * (time - times[i - 1]) / (times[i] - times[i - 1])
+
+    # this function performs time dependent Dijkstra's algorithm from sourceId leaving at departureTime
+    # the travel time of each arc is taken from its profile at the time the search reaches the start of the arc, arcs without a profile use their static weight
+    # it returns the travel time from the departure to each vertex (inf if unreachable) and the previous vertex on its fastest path (-1 for the source and unreachable vertices)
+    def timeDependentDijkstra(self, sourceId, departureTime):
+        arrival, previous, _ = self._timeDependentSearch(sourceId, departureTime, -1)
+        return np.array(arrival, dtype=np.float64) - departureTime, np.array(previous, dtype=np.int64)
+
+    # this function performs time dependent Dijkstra's algorithm from sourceId leaving at departureTime and stops as soon as targetId is settled
+    # it returns the travel time to the target (inf if unreachable), the path as a list of vertex ids and the number of settled vertices
+    def timeDependentPointToPoint(self, sourceId, targetId, departureTime):
+        arrival, previous, settledCount = self._timeDependentSearch(sourceId, departureTime, targetId)
+        if arrival[targetId] == float('inf'):
+            return float('inf'), [], settledCount
+        return arrival[targetId] - departureTime, _tracePath(previous, targetId), settledCount
+
+    # helper method for timeDependentDijkstra and timeDependentPointToPoint, the heap is ordered by arrival time instead of distance
+    # as no profile falls faster than time passes, arriving at a vertex earlier never means leaving it later, so a vertex is settled with its earliest arrival the same way as in dijkstra
+    # the inner loop reads the arc's piece from _profilePieces (found for every arc at once with numpy at the departure time)
+    # and only evaluates the profile itself when the search reaches the arc after that piece has ended, so it costs little more than a static search
+    # it stops once targetId is settled (-1 searches the whole graph) and returns the arrival time and previous vertex lists and the number of settled vertices
+    def _timeDependentSearch(self, sourceId, departureTime, targetId):
+        indptr, indices, _ = self.adjacencyLists()
+        start, end, intercept, slope = self._profilePieces(departureTime)
+        arrival = [float('inf')] * self.vertexCount
+        previous = [-1] * self.vertexCount
+        settled = bytearray(self.vertexCount)
+        settledCount = 0
+        departureTime = float(departureTime)
+        arrival[sourceId] = departureTime
+        heap = [(departureTime, sourceId)]
+        while heap:
+            t, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            settledCount += 1
+            if u == targetId:
+                break
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                if settled[v]:
+                    continue
+                if start[k] <= t < end[k]:
+                    newArrival = t + intercept[k] + slope[k] * t
+                else:
+                    newArrival = t + self._travelTimeAt(k, t)
+                if newArrival < arrival[v]:
+                    arrival[v] = newArrival
+                    previous[v] = u
+                    heapq.heappush(heap, (newArrival, v))
+        return arrival, previous, settledCount
+
+
+# this class holds the result of a single source shortest path query (DSAGraph.shortestPaths)
+# distance[i] is the shortest travel time from the source to vertex i (inf if it is unreachable)
+# previous[i] is the vertex before vertex i on that path (-1 for the source and unreachable vertices)
+# vertex ids are the ids of the snapshot the query ran on, so the result stays valid after the graph is edited
+# paths are only rebuilt from the previous array when they are asked for
+class DSAShortestPaths:
+    def __init__(self, snapshot, sourceId, distance, previous):
+        self.snapshot = snapshot
+        self.sourceId = sourceId
+        self.distance = distance
+        self.previous = previous
+
+    def getSource(self):
+        return self.snapshot.getLabel(self.sourceId)
+
+    # gets the shortest travel time to a vertex by label, inf if the vertex is unreachable from the source
+    def getDistance(self, label):
+        return _travelTime(self.distance[self.snapshot.getId(label)])
+
+    def isReachable(self, label):
+        return self.distance[self.snapshot.getId(label)] != float('inf')
+
+    # rebuilds the shortest path from the source to a vertex by following the previous array back from the target
+    # the path is returned as a linked list of labels from the source to the target, it is empty if the target is unreachable
+    def getPath(self, label):
+        return self.getPathById(self.snapshot.getId(label))
+
+    def getPathById(self, targetId):
+        pathList = DSALinkedList()
+        if self.distance[targetId] == float('inf'):
+            return pathList
+        vertexId = targetId
+        while vertexId != -1:
+            pathList.insertFirst(self.snapshot.getLabel(vertexId))
+            vertexId = self.previous[vertexId]
+        return pathList
+
+    # prints the shortest path from the source to every other vertex in the graph
+    def display(self):
+        sourceLabel = self.getSource()
+        print("========================================\nDijkstra's Algorithm Result (Shortest Path)\n========================================")
+        for vertexId in range(self.snapshot.vertexCount):
+            distance = _travelTime(self.distance[vertexId])
+            if distance == float('inf'):
+                print(f"Hub/Intersection {self.snapshot.getLabel(vertexId)} is unreachable from {sourceLabel}")
+            elif distance > 0:
+                path = ",".join(str(label) for label in self.getPathById(vertexId))
+                print(f"Shortest path from {sourceLabel} to {self.snapshot.getLabel(vertexId)} is of time {distance} minutes, with path: {path}")
+        print("========================================")
+
+
+# this class holds the result of a point to point shortest path query (DSAGraph.shortestPath)
+# pathIds is the list of vertex ids from the source to the target, it is empty if the target is unreachable
+# settled is the number of vertices the search had to settle before it could stop
+class DSARoute:
+    def __init__(self, snapshot, distance, pathIds, settled):
+        self.snapshot = snapshot
+        self.distance = distance
+        self.pathIds = pathIds
+        self.settled = settled
+
+    # gets the travel time of the route, inf if the target is unreachable
+    def getDistance(self):
+        return _travelTime(self.distance)
+
+    def isReachable(self):
+        return self.distance != float('inf')
+
+    # returns the route as a linked list of labels from the source to the target
+    def getPath(self):
+        pathList = DSALinkedList()
+        for vertexId in self.pathIds:
+            pathList.insertLast(self.snapshot.getLabel(vertexId))
+        return pathList
+
+    def getSettled(self):
+        return self.settled
+
+
+# this class holds a many to many travel time table (DSAGraph.distanceMatrix)
+# matrix[i][j] is the travel time from sourceLabels[i] to targetLabels[j], inf if the target is unreachable
+# the table can be saved with np.save and loaded back memory mapped, so a new process can read it without running any searches
+# the saved table is not tied to the graph, it has to be recomputed if the graph is edited
+class DSADistanceMatrix:
+    def __init__(self, sourceLabels=None, targetLabels=None, matrix=None):
+        self.sourceLabels = sourceLabels
+        self.targetLabels = targetLabels
+        self.matrix = matrix
+        self.sourceIndex = None
+        self.targetIndex = None
+
+    # gets the travel time between a source and a target by label
+    # the label to row/column indexes are built the first time they are needed
+    def getDistance(self, source, target):
+        if self.sourceIndex is None:
+            self.sourceIndex = dict(zip((str(label) for label in self.sourceLabels), range(len(self.sourceLabels))))
+            self.targetIndex = dict(zip((str(label) for label in self.targetLabels), range(len(self.targetLabels))))
+        row = self.sourceIndex.get(str(source))
+        col = self.targetIndex.get(str(target))
+        if row is None or col is None:
+            raise Exception("Source or target not in distance matrix")
+        return _travelTime(self.matrix[row, col])
+
+    # saves the matrix to filename with np.save, the source and target labels are saved next to it as string arrays
+    # e.g. hubs.npy, hubs_sources.npy and hubs_targets.npy
+    def save(self, filename):
+        base = filename[:-4] if filename.endswith(".npy") else filename
+        np.save(base + ".npy", self.matrix)
+        np.save(base + "_sources.npy", np.array([str(label) for label in self.sourceLabels]))
+        np.save(base + "_targets.npy", np.array([str(label) for label in self.targetLabels]))
+
+    # loads a matrix saved by save, the matrix is memory mapped (read only) unless mmap is False
+    # labels are loaded back as strings
+    def load(self, filename, mmap=True):
+        base = filename[:-4] if filename.endswith(".npy") else filename
+        self.matrix = np.load(base + ".npy", mmap_mode="r" if mmap else None)
+        self.sourceLabels = np.load(base + "_sources.npy").astype(object)
+        self.targetLabels = np.load(base + "_targets.npy").astype(object)
+        self.sourceIndex = None
+        self.targetIndex = None
+
+
+# this class is a least recently used (LRU) cache of shortest path trees (DSAShortestPaths) keyed by source label
+# the trees are kept in a linked list from least to most recently used with a hash table from the key to its list node
+# so a lookup, moving a tree to the most recently used end and evicting from the least recently used end are all O(1)
+# maxBytes bounds the memory of the distance and previous arrays of the cached trees, the least recently used trees are evicted to stay under it
+# every lookup passes in the graph version, if it differs from the version the trees were cached at they are all thrown away
+# hits, misses, evictions and invalidations are counted for monitoring (see getStats)
+class DSARouteCache:
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.usedBytes = 0
+        self.version = 0
+        self.order = DSALinkedList()
+        self.index = DSAHashTable(7)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # gets the cached tree for a key, None on a miss
+    # a hit moves the tree to the most recently used end of the list
+    def get(self, key, version):
+        self._checkVersion(version)
+        if not self.index.hasKey(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry = self.order.removeNode(self.index.get(key))
+        self.index.put(key, self.order.insertLast(entry))
+        return entry[1]
+
+    # caches a tree under a key as the most recently used tree
+    # least recently used trees are evicted until the cache is within maxBytes, a tree larger than maxBytes is not cached at all
+    def put(self, key, tree, version):
+        self._checkVersion(version)
+        size = tree.distance.nbytes + tree.previous.nbytes
+        if size > self.maxBytes:
+            return
+        if self.index.hasKey(key):
+            oldEntry = self.order.removeNode(self.index.get(key))
+            self.usedBytes -= oldEntry[2]
+        while self.usedBytes + size > self.maxBytes:
+            evictedKey, _, evictedSize = self.order.removeFirst()
+            self.index.remove(evictedKey)
+            self.usedBytes -= evictedSize
+            self.evictions += 1
+        self.index.put(key, self.order.insertLast((key, tree, size)))
+        self.usedBytes += size
+
+    # throws away every cached tree if the graph has changed since they were cached
+    def _checkVersion(self, version):
+        if version != self.version:
+            if not self.order.isEmpty():
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+
+    def clear(self):
+        self.order = DSALinkedList()
+        self.index = DSAHashTable(7)
+        self.usedBytes = 0
+
+    # returns the monitoring counters and the current size of the cache
+    def getStats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations,
+                "trees": self.order.size, "usedBytes": self.usedBytes, "maxBytes": self.maxBytes}
+
+
+# this class is a union-find (disjoint set forest) of elements numbered from 0, used by DSAGraph to keep track of its connected components
+# parent[i] is the element above i in its tree and size[i] is the number of elements in the tree of a root i
+# union joins the smaller tree under the root of the larger one and find halves the path it walks, so both take close to O(1) amortised
+# count is the number of sets, elements are added one at a time as vertices are added to the graph
+class DSAUnionFind:
+    def __init__(self, size=0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+        self.count = size
+
+    # adds a new element in a set of its own and returns its number
+    def add(self):
+        element = len(self.parent)
+        self.parent.append(element)
+        self.size.append(1)
+        self.count += 1
+        return element
+
+    # returns the root of the set holding element, pointing every other element on the way at its grandparent
+    def find(self, element):
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    # joins the sets holding a and b, returns False if they were already in the same set
+    def union(self, a, b):
+        rootA = self.find(a)
+        rootB = self.find(b)
+        if rootA == rootB:
+            return False
+        if self.size[rootA] < self.size[rootB]:
+            rootA, rootB = rootB, rootA
+        self.parent[rootB] = rootA
+        self.size[rootA] += self.size[rootB]
+        self.count -= 1
+        return True
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
@@ -49,6 +49,7 @@ class DSAHashEntry:
 class DSAHashTable:
     def __init__(self, tableSize):
         self.count = 0
+        self.deletedCount = 0 # number of formerly used slots, these still lengthen probe sequences
         self.actualSize = self._nextPrime(tableSize)
         self.hashArray = np.empty(self.actualSize, dtype=object)
         for i in range(self.actualSize):
@@ -56,9 +57,13 @@ class DSAHashTable:
 
     # put method to add a new entry or update an entry
     # if the load factor exceeds 0.7 the table is resized to double its size
+    # if formerly used slots push the table over 0.7 it is rehashed at the same size to clear them out
+    # otherwise repeated put/remove calls could leave no never used slots, so a miss would probe the whole table and put could overwrite a used slot
     def put(self, key, value, address=None, priority=None, deliveryStatus=None, time=None):
         if (self.count + 1) / self.actualSize > 0.7:
             self._resize(self.actualSize * 2)
+        elif (self.count + self.deletedCount + 1) / self.actualSize > 0.7:
+            self._resize(self.actualSize)
 
         # Find the index for the key
         index = self._findSlot(key)
@@ -102,6 +107,7 @@ class DSAHashTable:
             self.hashArray[index].deliveryStatus = None
             self.hashArray[index].time = None
             self.count -= 1
+            self.deletedCount += 1
             if self.count / self.actualSize < 0.3:
                 self._resize(max(7, self.actualSize // 2))
 
@@ -152,6 +158,7 @@ class DSAHashTable:
         self.actualSize = self._nextPrime(newSize)
         self.hashArray = np.empty(self.actualSize, dtype=object)
         self.count = 0
+        self.deletedCount = 0
         for i in range(self.actualSize):
             self.hashArray[i] = DSAHashEntry()
 
@@ -204,6 +211,7 @@ class DSAHashTable:
     # clears the hash table by resetting the count and reinitialising the hash array
     def clear(self):
         self.count = 0
+        self.deletedCount = 0
         self.actualSize = 0
         self.actualSize = self._nextPrime(self.actualSize)
         self.hashArray = np.empty(self.actualSize, dtype=object)
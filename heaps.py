@@ -32,7 +32,8 @@ from linkedlists_main import *
     - decreasePriority: Decrease the priority of an entry in the heap
     - increasePriority: Increase the priority of an entry in the heap
 
-    Additionally there is a DijkstraHeap class that is inherited from DSAHeap and is implemented for Dijkstra's algorithm.
+    Additionally there is a DijkstraHeap class, a min heap of float distances and vertex ids kept in numpy arrays, which is implemented for Dijkstra's algorithm.
+    The DSAIndexedMinHeap class is a min heap of integer items (vertex ids) with a decrease-key operation, used by the graph's Dijkstra's algorithm.
 
     SELF CITING: This code has been adapted from the COMP1002 Practical 08 - Heaps by Muhammad Annas Atif (22224125)
 
@@ -293,51 +294,205 @@ class DSAHeap:
         except Exception as e:
             print(f"Error saving to CSV: {e}")
 
-# this class is a class inheritance of DSAHeap and is used for Dijkstra's algorithm
-class DijkstraHeap(DSAHeap):
+# this class is the min heap used for Dijkstra's algorithm, the entry with the smallest key (tentative distance) is removed first
+# it is its own class rather than a DSAHeap as DSAHeap is a max heap of parcel entries
+# keys (float distances, not truncated to ints) and values (vertex ids) are kept in two parallel numpy arrays instead of an array of entry objects
+# the arrays double in size when they are full instead of raising "Heap is full", initialSize only sets the starting capacity
+# the sift up and sift down loops are iterative and move the entry being sifted into place once instead of swapping at every level
+# addCount, removeCount and siftSteps (the number of levels entries are moved by sifting) count the work done, see resetCounters
+class DijkstraHeap:
+    def __init__(self, initialSize=1024, valueDtype=np.int64):
+        self.keys = np.empty(max(1, initialSize), dtype=np.float64)
+        self.values = np.empty(max(1, initialSize), dtype=valueDtype)
+        self.count = 0
+        self.addCount = 0
+        self.removeCount = 0
+        self.siftSteps = 0
+
+    def isEmpty(self):
+        return self.count == 0
+
+    def getCount(self):
+        return self.count
+
+    # adds a value with a float priority (key)
     def add(self, priority, value):
-        try:
-            if self.count == self.max_size:
-                raise Exception("Heap is full")
-            priority = int(priority)
-            newEntry = DSAHeapEntryDijkstra(priority, value)
-            self.heapArray[self.count] = newEntry
-            self.count += 1
-            self.trickleUp(self.heapArray, self.count - 1)
-        except ValueError:
-            print("Error: Priority must be a number.")
-        except Exception as e:
-            print(f"Error adding to heap: {e}")
+        if self.count == len(self.keys):
+            self._grow()
+        self.addCount += 1
+        self.count += 1
+        self._siftUp(float(priority), value, self.count - 1)
 
+    # removes the entry with the smallest priority and returns it as a (priority, value) tuple
     def remove(self):
-        try:
-            if self.count == 0:
-                raise Exception("Heap is empty")
-            root = self.heapArray[0]
-            self.count -= 1
-            self.heapArray[0] = self.heapArray[self.count]
-            self.trickleDown(self.heapArray, 0, self.count)
-            return root
-        except Exception as e:
-            print(f"Error removing from heap: {e}")
+        if self.count == 0:
+            raise Exception("Heap is empty")
+        priority = float(self.keys[0])
+        value = self.values[0]
+        self.removeCount += 1
+        self.count -= 1
+        if self.count > 0:
+            self._siftDown(self.keys[self.count], self.values[self.count], 0)
+        return priority, value
+
+    # returns the entry with the smallest priority as a (priority, value) tuple without removing it
+    def peek(self):
+        if self.count == 0:
+            raise Exception("Heap is empty")
+        return float(self.keys[0]), self.values[0]
+
+    def resetCounters(self):
+        self.addCount = 0
+        self.removeCount = 0
+        self.siftSteps = 0
+
+    # doubles the size of the key and value arrays
+    def _grow(self):
+        size = len(self.keys) * 2
+        keys = np.empty(size, dtype=self.keys.dtype)
+        values = np.empty(size, dtype=self.values.dtype)
+        keys[:self.count] = self.keys[:self.count]
+        values[:self.count] = self.values[:self.count]
+        self.keys = keys
+        self.values = values
+
+    # moves the entry (key, value) up from index i while its key is smaller than its parent's key
+    def _siftUp(self, key, value, i):
+        keys = self.keys
+        values = self.values
+        steps = 0
+        while i > 0:
+            parentIdx = (i - 1) >> 1
+            if keys[parentIdx] <= key:
+                break
+            keys[i] = keys[parentIdx]
+            values[i] = values[parentIdx]
+            i = parentIdx
+            steps += 1
+        keys[i] = key
+        values[i] = value
+        self.siftSteps += steps
+
+    # moves the entry (key, value) down from index i while its key is larger than the smaller of its children's keys
+    def _siftDown(self, key, value, i):
+        keys = self.keys
+        values = self.values
+        count = self.count
+        steps = 0
+        while True:
+            childIdx = 2 * i + 1
+            if childIdx >= count:
+                break
+            if childIdx + 1 < count and keys[childIdx + 1] < keys[childIdx]:
+                childIdx += 1
+            if keys[childIdx] >= key:
+                break
+            keys[i] = keys[childIdx]
+            values[i] = values[childIdx]
+            i = childIdx
+            steps += 1
+        keys[i] = key
+        values[i] = value
+        self.siftSteps += steps
+
+# this class is an indexed binary min heap of the integer items 0 to capacity - 1 (e.g. vertex ids) each with a float key
+# unlike a heap of (key, item) entries an item is only ever in the heap once, so a shorter distance found for an item already in the heap
+# lowers its key in place (decreaseKey) instead of adding a duplicate entry, and the heap never holds more than capacity items
+# heap holds the items in heap order, position[item] is where the item is in heap (-1 if it has never been added, -2 once it has been removed)
+# and keys[item] is the key of the item, all three are python lists made once so adding an item does not create any entry objects
+# the sift up and sift down loops are iterative and move the item being sifted into place once instead of swapping at every level
+# peakCount is the largest number of items that have been in the heap at once
+class DSAIndexedMinHeap:
+    def __init__(self, capacity):
+        self.heap = [0] * capacity
+        self.position = [-1] * capacity
+        self.keys = [0.0] * capacity
+        self.count = 0
+        self.peakCount = 0
 
-# this is a class inheritance of DSAHeapEntry which is used for Dijkstra's algorithm
-class DSAHeapEntryDijkstra():
-    def __init__(self, priority=None, value=None):
-        self.priority = priority
-        self.value = value
+    def isEmpty(self):
+        return self.count == 0
 
-    def getPriority(self):
-        return self.priority
-    
-    def setPriority(self, priority):
-        self.priority = priority
-    
-    def getValue(self):
-        return self.value
-    
-    def setValue(self, value):
-        self.value = value
+    # checks if an item is in the heap now
+    def contains(self, item):
+        return self.position[item] >= 0
+
+    # checks if an item has been removed from the heap
+    def wasRemoved(self, item):
+        return self.position[item] == -2
+
+    def getKey(self, item):
+        return self.keys[item]
+
+    # adds an item that is not in the heap with the given key
+    def add(self, item, key):
+        if self.position[item] >= 0:
+            raise Exception("Item is already in the heap")
+        self.keys[item] = key
+        self.count += 1
+        if self.count > self.peakCount:
+            self.peakCount = self.count
+        self._siftUp(item, self.count - 1)
+
+    # lowers the key of an item that is in the heap and moves it up to its new place
+    def decreaseKey(self, item, key):
+        if self.position[item] < 0:
+            raise Exception("Item is not in the heap")
+        if key > self.keys[item]:
+            raise Exception("New key is larger than the current key")
+        self.keys[item] = key
+        self._siftUp(item, self.position[item])
+
+    # removes the item with the smallest key and returns it with its key as a tuple (item, key)
+    def remove(self):
+        if self.count == 0:
+            raise Exception("Heap is empty")
+        heap = self.heap
+        top = heap[0]
+        self.position[top] = -2
+        self.count -= 1
+        if self.count > 0:
+            self._siftDown(heap[self.count], 0)
+        return top, self.keys[top]
+
+    # moves item up from index i while its key is smaller than its parent's key
+    def _siftUp(self, item, i):
+        heap = self.heap
+        position = self.position
+        keys = self.keys
+        key = keys[item]
+        while i > 0:
+            parentIdx = (i - 1) >> 1
+            parent = heap[parentIdx]
+            if keys[parent] <= key:
+                break
+            heap[i] = parent
+            position[parent] = i
+            i = parentIdx
+        heap[i] = item
+        position[item] = i
+
+    # moves item down from index i while its key is larger than the smaller of its children's keys
+    def _siftDown(self, item, i):
+        heap = self.heap
+        position = self.position
+        keys = self.keys
+        key = keys[item]
+        count = self.count
+        while True:
+            childIdx = 2 * i + 1
+            if childIdx >= count:
+                break
+            if childIdx + 1 < count and keys[heap[childIdx + 1]] < keys[heap[childIdx]]:
+                childIdx += 1
+            child = heap[childIdx]
+            if keys[child] >= key:
+                break
+            heap[i] = child
+            position[child] = i
+            i = childIdx
+        heap[i] = item
+        position[item] = i
 
 
 class DSAHeapEntry:
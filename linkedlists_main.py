@@ -62,6 +62,7 @@ class DSALinkedList:
             self.head.setPrev(newNode)
             self.head = newNode
         self.size += 1
+        return newNode
     
     def insertLast(self, newItem):
         newNode = DSAListNode(newItem)
@@ -74,6 +75,7 @@ class DSALinkedList:
             newNode.setPrev(self.tail)
             self.tail = newNode
         self.size += 1
+        return newNode
     
     def removeFirst(self):
         if self.isEmpty():
@@ -101,6 +103,32 @@ class DSALinkedList:
         self.size -= 1
         return removedValue
 
+    # appends every item of an iterable to the end of the list
+    # it links the nodes directly so bulk loads do not pay for an insertLast call per item
+    def extend(self, items):
+        for item in items:
+            newNode = DSAListNode(item)
+            if self.tail is None:
+                self.head = newNode
+            else:
+                self.tail.next = newNode
+                newNode.prev = self.tail
+            self.tail = newNode
+            self.size += 1
+
+    # removes a node returned by insertFirst/insertLast from anywhere in the list in O(1)
+    def removeNode(self, node):
+        if node is self.head:
+            return self.removeFirst()
+        if node is self.tail:
+            return self.removeLast()
+        node.getPrev().setNext(node.getNext())
+        node.getNext().setPrev(node.getPrev())
+        node.setNext(None)
+        node.setPrev(None)
+        self.size -= 1
+        return node.getValue()
+
     def __len__(self):
         return self.size
 
@@ -0,0 +1,238 @@
+import time as tme
+import numpy as np
+from linkedlists_main import DSALinkedList
+from graphs import _travelTime
+
+'''
+    This is the tours.py module.
+    It contains the DSATourPlanner class which plans the order a delivery van visits many addresses in one run, starting and ending at the depot.
+
+    The travel time between every pair of stops (and the depot) is found once with DSAGraph.distanceMatrix, one Dijkstra's algorithm per stop
+    that stops once every other stop is settled. The tour is then planned on this table alone, without going back to the road graph:
+    - Nearest neighbour construction: from the depot, always drive to the closest stop not yet visited.
+    - 2-opt: reverse a section of the tour when that shortens it (this removes the tour crossing over itself).
+    - Or-opt: move a run of 1 to 3 consecutive stops (either way round) to a better place in the tour.
+    The two local searches are repeated until neither finds an improvement or the time budget runs out, so the tour is never worse than
+    the nearest neighbour tour and a larger budget can only help.
+
+    For each move the change in tour cost is worked out for every possible second position at once with numpy, rather than one position at a time.
+    The change in cost of reversing a section uses running totals of the tour driven forwards and backwards, so it is also right for a
+    directed graph where a one way street makes the travel time from a to b differ from b to a.
+
+    The functions/methods in this file include:
+    - DSATourPlanner: Builds the travel time table for a depot and a list of stops
+    - nearestNeighbour: Builds a tour with the nearest neighbour rule
+    - twoOpt: Improves a tour with 2-opt moves
+    - orOpt: Improves a tour with Or-opt moves
+    - plan: Builds a tour and improves it with 2-opt and Or-opt within a time budget, returns it as a DSATour object
+    - tourCost: Returns the travel time of a tour
+    - DSATour: The planned tour with its stops, travel time and the street path of the whole run
+
+    References:
+
+        Croes, G. A. 1958. "A Method for Solving Traveling-Salesman Problems". Operations Research, 6(6), 791-812.
+
+        Or, I. 1976. "Traveling Salesman-Type Combinatorial Problems and Their Relation to the Logistics of Regional Blood Banking".
+            PhD thesis, Northwestern University.
+'''
+
+
+# a tour is a numpy array of indexes into the travel time table (0 is the depot, stop i is i + 1)
+# it starts and ends at the depot, so a tour of n stops has n + 2 entries
+class DSATourPlanner:
+    # depot is the label the van starts and ends at, stops is a list of the labels of the addresses to visit
+    # the travel time table is built here, a stop that cannot be reached from the depot (or cannot get back to it) raises an exception
+    def __init__(self, graph, depot, stops):
+        self.graph = graph
+        self.depot = depot
+        self.stops = list(stops)
+        if len(self.stops) == 0:
+            raise Exception("Tour has no stops")
+        table = graph.distanceMatrix([depot] + self.stops)
+        self.labels = table.sourceLabels
+        self.matrix = np.ascontiguousarray(table.matrix, dtype=np.float64)
+        # the stop named is the one with the most missing travel times, the depot is only named if no stop has as many
+        missing = (~np.isfinite(self.matrix)).sum(axis=0) + (~np.isfinite(self.matrix)).sum(axis=1)
+        if missing.any():
+            worst = len(missing) - 1 - int(np.argmax(missing[::-1]))
+            raise Exception(f"Stop {self.labels[worst]} cannot be reached from every other stop")
+        self.twoOptMoves = 0
+        self.orOptMoves = 0
+
+    # returns the travel time of a tour
+    def tourCost(self, tour):
+        tour = np.asarray(tour)
+        return float(self.matrix[tour[:-1], tour[1:]].sum())
+
+    # builds a tour from the depot by always driving to the closest stop that has not been visited yet
+    # ties go to the stop given first, it takes O(n^2) time with one numpy argmin per stop
+    def nearestNeighbour(self):
+        size = len(self.matrix)
+        tour = np.zeros(size + 1, dtype=np.int64)
+        visited = np.zeros(size, dtype=bool)
+        visited[0] = True
+        current = 0
+        for position in range(1, size):
+            times = np.where(visited, np.inf, self.matrix[current])
+            current = int(np.argmin(times))
+            visited[current] = True
+            tour[position] = current
+        return tour
+
+    # improves a tour with 2-opt moves until none shortens it or the deadline (a time.perf_counter value) passes
+    # reversing tour[i..j] swaps the roads (tour[i - 1], tour[i]) and (tour[j], tour[j + 1]) for (tour[i - 1], tour[j]) and (tour[i], tour[j + 1])
+    # and drives tour[i..j] backwards, forward[k]/backward[k] are the travel times of the first k roads of the tour driven forwards/backwards
+    # for each i the best j is found in one numpy pass and taken if it shortens the tour
+    # it returns the improved tour and whether any move was made
+    def twoOpt(self, tour, deadline=None):
+        matrix = self.matrix
+        tour = np.array(tour, dtype=np.int64)
+        last = len(tour) - 2
+        improved = False
+        changed = True
+        while changed:
+            changed = False
+            forward = np.concatenate(([0.0], np.cumsum(matrix[tour[:-1], tour[1:]])))
+            backward = np.concatenate(([0.0], np.cumsum(matrix[tour[1:], tour[:-1]])))
+            for i in range(1, last):
+                if deadline is not None and tme.perf_counter() > deadline:
+                    return tour, improved
+                j = np.arange(i + 1, last + 1)
+                before = tour[i - 1]
+                after = tour[j + 1]
+                oldCost = matrix[before, tour[i]] + (forward[j] - forward[i]) + matrix[tour[j], after]
+                newCost = matrix[before, tour[j]] + (backward[j] - backward[i]) + matrix[tour[i], after]
+                gains = oldCost - newCost
+                best = int(np.argmax(gains))
+                if gains[best] > 1e-9:
+                    j = i + 1 + best
+                    tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                    self.twoOptMoves += 1
+                    improved = True
+                    changed = True
+                    forward = np.concatenate(([0.0], np.cumsum(matrix[tour[:-1], tour[1:]])))
+                    backward = np.concatenate(([0.0], np.cumsum(matrix[tour[1:], tour[:-1]])))
+        return tour, improved
+
+    # improves a tour with Or-opt moves until none shortens it or the deadline passes
+    # a run of length 1 to maxLength stops starting at tour[i] is taken out and put back between tour[k] and tour[k + 1]
+    # either the same way round or reversed, for each run every place it could go is costed in one numpy pass
+    # it returns the improved tour and whether any move was made
+    def orOpt(self, tour, deadline=None, maxLength=3):
+        matrix = self.matrix
+        tour = np.array(tour, dtype=np.int64)
+        stopCount = len(tour) - 2
+        improved = False
+        changed = True
+        while changed:
+            changed = False
+            for length in range(1, min(maxLength, stopCount - 1) + 1):
+                i = 1
+                while i + length <= stopCount + 1:
+                    if deadline is not None and tme.perf_counter() > deadline:
+                        return tour, improved
+                    run = tour[i:i + length]
+                    first = run[0]
+                    end = run[-1]
+                    before = tour[i - 1]
+                    after = tour[i + length]
+                    removeGain = matrix[before, first] + matrix[end, after] - matrix[before, after]
+                    runForward = matrix[run[:-1], run[1:]].sum()
+                    runBackward = matrix[run[1:], run[:-1]].sum()
+
+                    # the tour without the run, the run goes back between rest[k] and rest[k + 1]
+                    rest = np.concatenate((tour[:i], tour[i + length:]))
+                    left = rest[:-1]
+                    right = rest[1:]
+                    baseCost = matrix[left, right]
+                    forwardCost = matrix[left, first] + matrix[end, right] - baseCost
+                    reverseCost = matrix[left, end] + matrix[first, right] - baseCost + (runBackward - runForward)
+                    # putting the run back where it was is not a move
+                    forwardCost[i - 1] = np.inf
+                    reverseCost[i - 1] = np.inf if length == 1 else reverseCost[i - 1]
+
+                    bestForward = int(np.argmin(forwardCost))
+                    bestReverse = int(np.argmin(reverseCost))
+                    reverse = reverseCost[bestReverse] < forwardCost[bestForward]
+                    k = bestReverse if reverse else bestForward
+                    gain = removeGain - (reverseCost[k] if reverse else forwardCost[k])
+                    if gain > 1e-9:
+                        moved = run[::-1] if reverse else run
+                        tour = np.concatenate((rest[:k + 1], moved, rest[k + 1:]))
+                        self.orOptMoves += 1
+                        improved = True
+                        changed = True
+                    else:
+                        i += 1
+        return tour, improved
+
+    # builds a tour with nearestNeighbour and then takes turns improving it with twoOpt and orOpt
+    # until neither makes a move or timeBudget seconds have passed (building the travel time table is not counted)
+    # timeBudget None means there is no limit
+    # it returns the tour as a DSATour object
+    def plan(self, timeBudget=1.0):
+        startTime = tme.perf_counter()
+        deadline = None if timeBudget is None else startTime + timeBudget
+        self.twoOptMoves = 0
+        self.orOptMoves = 0
+        tour = self.nearestNeighbour()
+        initialCost = self.tourCost(tour)
+        if len(tour) > 3:
+            improved = True
+            while improved and (deadline is None or tme.perf_counter() <= deadline):
+                tour, twoOptImproved = self.twoOpt(tour, deadline)
+                tour, orOptImproved = self.orOpt(tour, deadline)
+                improved = twoOptImproved or orOptImproved
+        return DSATour(self, tour, initialCost, tme.perf_counter() - startTime)
+
+
+# this class holds a tour planned by DSATourPlanner.plan
+# order is the tour as indexes into the planner's travel time table, starting and ending at the depot (index 0)
+class DSATour:
+    def __init__(self, planner, order, initialCost, planTime):
+        self.planner = planner
+        self.order = order
+        self.cost = planner.tourCost(order)
+        self.initialCost = initialCost
+        self.planTime = planTime
+        self.twoOptMoves = planner.twoOptMoves
+        self.orOptMoves = planner.orOptMoves
+
+    # gets the travel time of the whole run
+    def getCost(self):
+        return _travelTime(self.cost)
+
+    # gets the travel time of the nearest neighbour tour the local search started from
+    def getInitialCost(self):
+        return _travelTime(self.initialCost)
+
+    def getPlanTime(self):
+        return self.planTime
+
+    # returns the stops as a linked list of labels in the order they are visited, starting and ending with the depot
+    def getStops(self):
+        stopList = DSALinkedList()
+        for index in self.order.tolist():
+            stopList.insertLast(self.planner.labels[index])
+        return stopList
+
+    # returns the street path of the whole run as a linked list of labels
+    # each leg between two stops is routed with DSAGraph.routeBatch, the stop that ends one leg is not repeated at the start of the next
+    def getPath(self):
+        labels = self.planner.labels
+        order = self.order.tolist()
+        legs = [(labels[order[k]], labels[order[k + 1]]) for k in range(len(order) - 1)]
+        pathList = DSALinkedList()
+        pathList.insertLast(labels[order[0]])
+        for route in self.planner.graph.routeBatch(legs, workers=1):
+            path = iter(route.getPath())
+            next(path, None)
+            pathList.extend(path)
+        return pathList
+
+    def display(self):
+        print("\n=======================================\nDelivery Tour:\n=======================================")
+        print(" -> ".join(str(label) for label in self.getStops()))
+        print(f"Travel time: {self.getCost()} (nearest neighbour tour: {self.getInitialCost()})")
+        print(f"2-opt moves: {self.twoOptMoves}, Or-opt moves: {self.orOptMoves}, planned in {self.planTime:.3f} s")
+        print("=======================================")